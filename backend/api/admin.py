@@ -1,4 +1,7 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin import helpers
+from django.template.response import TemplateResponse
 
 from api import models
 
@@ -8,17 +11,77 @@ admin.site.register(models.Category)
 admin.site.register(models.Course)
 admin.site.register(models.Variant)
 admin.site.register(models.VariantItem)
+admin.site.register(models.MediaMetadata)
+admin.site.register(models.UploadSession)
 admin.site.register(models.QuestionAnswer)
 admin.site.register(models.QuestionAnswerMessage)
+admin.site.register(models.CourseQASummary)
 admin.site.register(models.Cart)
 admin.site.register(models.CartOrder)
 admin.site.register(models.CartOrderItem)
+admin.site.register(models.TeacherDailyStats)
 admin.site.register(models.Certificate)
 admin.site.register(models.CompletedLesson)
+admin.site.register(models.LessonPlayback)
 admin.site.register(models.EnrolledCourse)
+admin.site.register(models.EnrollmentProgress)
+admin.site.register(models.TeacherStudent)
 admin.site.register(models.Note)
-admin.site.register(models.Review)
+admin.site.register(models.NoteToken)
 admin.site.register(models.Notification)
+admin.site.register(models.NotificationCounter)
 admin.site.register(models.Coupon)
 admin.site.register(models.Wishlist)
 admin.site.register(models.Country)
+
+
+class ReviewReplyForm(forms.Form):
+    reply = forms.CharField(widget=forms.Textarea)
+
+
+@admin.register(models.Review)
+class ReviewAdmin(admin.ModelAdmin):
+    """
+    Review admin with bulk approve, reject and reply actions.
+
+    The actions go through `moderate_reviews`, so a selection of any size is
+    one UPDATE plus one refresh of the affected courses' ratings. Replying
+    first asks for the reply text on an intermediate page.
+    """
+
+    list_display = ["course", "user", "rating", "active", "date"]
+    list_filter = ["active", "rating"]
+    actions = ["approve_reviews", "reject_reviews", "reply_reviews"]
+
+    @admin.action(description="Approve selected reviews")
+    def approve_reviews(self, request, queryset):
+        updated = models.moderate_reviews(queryset, "approve")
+        self.message_user(request, f"Approved {updated} reviews.")
+
+    @admin.action(description="Reject selected reviews")
+    def reject_reviews(self, request, queryset):
+        updated = models.moderate_reviews(queryset, "reject")
+        self.message_user(request, f"Rejected {updated} reviews.")
+
+    @admin.action(description="Reply to selected reviews")
+    def reply_reviews(self, request, queryset):
+        form = ReviewReplyForm(request.POST if "apply" in request.POST else None)
+        if form.is_valid():
+            updated = models.moderate_reviews(
+                queryset, "reply", form.cleaned_data["reply"]
+            )
+            self.message_user(request, f"Replied to {updated} reviews.")
+            return None
+
+        return TemplateResponse(
+            request,
+            "admin/api/review/reply_reviews.html",
+            {
+                **self.admin_site.each_context(request),
+                "title": "Reply to reviews",
+                "opts": self.model._meta,
+                "form": form,
+                "reviews": queryset,
+                "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+            },
+        )
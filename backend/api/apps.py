@@ -2,5 +2,11 @@ from django.apps import AppConfig
 
 
 class ApiConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'api'
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "api"
+
+    def ready(self):
+        from api import (
+            checks,
+            tasks,
+        )  # noqa: F401 - registers system checks and job handlers
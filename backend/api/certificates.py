@@ -0,0 +1,162 @@
+from functools import lru_cache
+from io import BytesIO
+
+from django.conf import settings
+
+# Pillow is imported inside the functions below, as in `api.images`, so web
+# workers that only issue certificates and enqueue renders never load it.
+
+BACKGROUND = (252, 250, 245)
+INK = (33, 37, 41)
+ACCENT = (176, 141, 87)
+
+
+def certificate_names(certificate_id):
+    """
+    Returns the storage names of a certificate's rendered files.
+
+    Names only depend on the certificate id, so a render that already exists
+    is reused instead of being drawn again.
+
+    Args:
+        certificate_id (str): The public certificate id.
+
+    Returns:
+        dict: {"image": "certificates/<id>.png", "pdf": "certificates/<id>.pdf"}.
+    """
+    return {
+        "image": f"certificates/{certificate_id}.png",
+        "pdf": f"certificates/{certificate_id}.pdf",
+    }
+
+
+@lru_cache(maxsize=16)
+def font(size, bold=False):
+    from PIL import ImageFont
+
+    path = settings.CERTIFICATE_BOLD_FONT if bold else settings.CERTIFICATE_FONT
+    if path:
+        return ImageFont.truetype(path, size)
+
+    return ImageFont.load_default(size)
+
+
+@lru_cache(maxsize=1)
+def template():
+    """
+    Draws the parts of the certificate that are the same for everyone.
+
+    Cached per worker process, so rendering a cohort only draws the
+    per-student text on a copy of this image.
+
+    Returns:
+        Image: The blank certificate.
+    """
+    from PIL import Image, ImageDraw
+
+    width, height = settings.CERTIFICATE_SIZE
+    image = Image.new("RGB", (width, height), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    margin = height // 20
+    draw.rectangle(
+        (margin, margin, width - margin, height - margin), outline=ACCENT, width=8
+    )
+    draw.rectangle(
+        (margin + 20, margin + 20, width - margin - 20, height - margin - 20),
+        outline=ACCENT,
+        width=2,
+    )
+    draw.text(
+        (width // 2, height * 0.2),
+        "CERTIFICATE OF COMPLETION",
+        font=font(height // 16, bold=True),
+        fill=INK,
+        anchor="mm",
+    )
+    draw.text(
+        (width // 2, height * 0.33),
+        "This certifies that",
+        font=font(height // 32),
+        fill=INK,
+        anchor="mm",
+    )
+    draw.text(
+        (width // 2, height * 0.53),
+        "has successfully completed the course",
+        font=font(height // 32),
+        fill=INK,
+        anchor="mm",
+    )
+
+    return image
+
+
+def fit_text(draw, text, max_width, size, bold=False):
+    """Returns the largest font no bigger than `size` that fits `text` in `max_width`."""
+    while size > 12 and draw.textlength(text, font=font(size, bold)) > max_width:
+        size = int(size * 0.9)
+
+    return font(size, bold)
+
+
+def render(student, course, teacher, date, certificate_id, verify_url=""):
+    """
+    Renders a certificate as PNG and PDF.
+
+    Args:
+        student (str): The student's name.
+        course (str): The course title.
+        teacher (str): The teacher's name.
+        date (date): The completion date.
+        certificate_id (str): The public certificate id.
+        verify_url (str, optional): Where the certificate can be verified.
+
+    Returns:
+        tuple: (PNG bytes, PDF bytes).
+    """
+    from PIL import ImageDraw
+
+    image = template().copy()
+    draw = ImageDraw.Draw(image)
+    width, height = image.size
+    text_width = width * 0.8
+
+    draw.text(
+        (width // 2, height * 0.43),
+        student,
+        font=fit_text(draw, student, text_width, height // 12, bold=True),
+        fill=INK,
+        anchor="mm",
+    )
+    draw.text(
+        (width // 2, height * 0.63),
+        course,
+        font=fit_text(draw, course, text_width, height // 18, bold=True),
+        fill=ACCENT,
+        anchor="mm",
+    )
+    small = font(height // 40)
+    for x, text in ((0.25, date.strftime("%B %d, %Y")), (0.75, teacher)):
+        draw.text((width * x, height * 0.8), text, font=small, fill=INK, anchor="mm")
+        draw.line(
+            (width * (x - 0.1), height * 0.77, width * (x + 0.1), height * 0.77),
+            fill=INK,
+            width=2,
+        )
+    footer = f"Certificate ID: {certificate_id}"
+    if verify_url:
+        footer = f"{footer}  ·  Verify at {verify_url}"
+    draw.text(
+        (width // 2, height * 0.9),
+        footer,
+        font=font(height // 56),
+        fill=INK,
+        anchor="mm",
+    )
+
+    png = BytesIO()
+    image.save(png, "PNG", optimize=False, compress_level=6)
+    pdf = BytesIO()
+    image.save(pdf, "PDF", resolution=settings.CERTIFICATE_DPI)
+
+    return png.getvalue(), pdf.getvalue()
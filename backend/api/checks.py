@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+@register()
+def check_playback_cache(app_configs, **kwargs):
+    """
+    Warns when `PLAYBACK_CACHE` names a cache that is not configured.
+
+    Returns:
+        list: A warning if the alias is missing from `CACHES`.
+    """
+    if settings.PLAYBACK_CACHE in settings.CACHES:
+        return []
+
+    return [
+        Warning(
+            f"PLAYBACK_CACHE {settings.PLAYBACK_CACHE!r} is not defined in CACHES.",
+            id="api.W002",
+        )
+    ]
+
+
+@register(deploy=True)
+def check_playback_cache_is_shared(app_configs, **kwargs):
+    """
+    Warns when playback heartbeats cannot be buffered because `PLAYBACK_CACHE` is per process.
+
+    Only run by `check --deploy`, as the per-process default is fine in development.
+
+    Returns:
+        list: A warning for a LocMemCache or DummyCache `PLAYBACK_CACHE`.
+    """
+    from api import playback
+
+    if settings.PLAYBACK_CACHE not in settings.CACHES or playback.is_shared_cache():
+        return []
+
+    return [
+        Warning(
+            f"PLAYBACK_CACHE {settings.PLAYBACK_CACHE!r} is a per-process cache.",
+            hint=(
+                "Playback heartbeats are written to the database on every report and "
+                "flush_playback will refuse to run. Point PLAYBACK_CACHE at a shared "
+                "cache such as Redis to buffer them."
+            ),
+            id="api.W001",
+        )
+    ]
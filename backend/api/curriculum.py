@@ -0,0 +1,250 @@
+import json
+import os
+import zipfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connection, transaction
+
+from api import models as api_models
+from api.media import format_duration, hash_file
+from core import jobs
+
+
+class CurriculumImportError(Exception):
+    """Raised when a curriculum manifest or its files are invalid."""
+
+
+def read_archive(archive):
+    """
+    Reads a curriculum ZIP containing `manifest.json` and the lecture files.
+
+    The archive is refused before anything is extracted if it has more than
+    `CURRICULUM_ARCHIVE_MAX_FILES` entries, declares more than
+    `CURRICULUM_ARCHIVE_MAX_SIZE` uncompressed bytes or a manifest larger than
+    `CURRICULUM_MANIFEST_MAX_SIZE`. `zipfile` never reads past an entry's
+    declared size, so the declared sizes bound what is decompressed.
+
+    Args:
+        archive (file): A ZIP file path or binary file object.
+
+    Returns:
+        tuple: (manifest dict, {member name: File}). The files stay readable until
+        the returned ZipFile-backed objects are garbage collected.
+    """
+    try:
+        zip_file = zipfile.ZipFile(archive)
+    except zipfile.BadZipFile:
+        raise CurriculumImportError("The archive is not a ZIP file.")
+
+    infos = [info for info in zip_file.infolist() if not info.is_dir()]
+    if len(infos) > settings.CURRICULUM_ARCHIVE_MAX_FILES:
+        raise CurriculumImportError(
+            f"The archive may hold at most {settings.CURRICULUM_ARCHIVE_MAX_FILES} files."
+        )
+    if sum(info.file_size for info in infos) > settings.CURRICULUM_ARCHIVE_MAX_SIZE:
+        raise CurriculumImportError(
+            f"The archive may expand to at most {settings.CURRICULUM_ARCHIVE_MAX_SIZE} bytes."
+        )
+
+    try:
+        manifest_info = zip_file.getinfo("manifest.json")
+    except KeyError:
+        raise CurriculumImportError("The archive has no manifest.json.")
+    if manifest_info.file_size > settings.CURRICULUM_MANIFEST_MAX_SIZE:
+        raise CurriculumImportError(
+            f"manifest.json may be at most {settings.CURRICULUM_MANIFEST_MAX_SIZE} bytes."
+        )
+    try:
+        manifest = json.loads(zip_file.read(manifest_info))
+    except (ValueError, zipfile.BadZipFile):
+        raise CurriculumImportError("manifest.json is not valid JSON.")
+
+    files = {
+        info.filename: File(zip_file.open(info), name=os.path.basename(info.filename))
+        for info in infos
+        if info.filename != "manifest.json"
+    }
+
+    return manifest, files
+
+
+def validate_manifest(manifest):
+    """
+    Checks that a manifest has the shape `import_curriculum` expects.
+
+    Args:
+        manifest (dict): The curriculum description.
+
+    Returns:
+        list: The manifest's variants.
+
+    Raises:
+        CurriculumImportError: Naming the first variant or item that is malformed.
+    """
+    variants = manifest.get("variants") if isinstance(manifest, dict) else None
+    if not isinstance(variants, list):
+        raise CurriculumImportError("The manifest must contain a 'variants' list.")
+
+    for number, variant in enumerate(variants):
+        if not isinstance(variant, dict) or not isinstance(variant.get("title"), str):
+            raise CurriculumImportError(
+                f"Variant {number} must be an object with a 'title'."
+            )
+        items = variant.setdefault("items", [])
+        if not isinstance(items, list):
+            raise CurriculumImportError(
+                f"The items of variant {number} must be a list."
+            )
+        for position, item in enumerate(items):
+            if not isinstance(item, dict) or not isinstance(item.get("title"), str):
+                raise CurriculumImportError(
+                    f"Item {position} of variant {number} must be an object with a 'title'."
+                )
+            if not isinstance(item.get("file") or "", str):
+                raise CurriculumImportError(
+                    f"The file of item {position} of variant {number} must be a name."
+                )
+            if not isinstance(item.get("description") or "", str):
+                raise CurriculumImportError(
+                    f"The description of item {position} of variant {number} must be text."
+                )
+
+    return variants
+
+
+def import_curriculum(course, manifest, files, progress=None):
+    """
+    Creates a course curriculum from a manifest and its lecture files in bulk.
+
+    Files are hashed and stored once (content already in `MediaMetadata` reuses
+    the stored copy) and the `Variant` and `VariantItem` rows are inserted with
+    `bulk_create`. Lectures whose content was never probed get a "probe_media"
+    job, so the import does not wait for the videos to be read. The course
+    totals are refreshed once at the end rather than per lecture. If the
+    import fails, the files it stored are deleted again.
+
+    The manifest looks like::
+
+        {"variants": [{"title": "Intro", "items": [
+            {"title": "Welcome", "file": "intro/welcome.mp4", "preview": true}
+        ]}]}
+
+    Args:
+        course (Course): The course receiving the curriculum.
+        manifest (dict): The curriculum description.
+        files (dict): {name referenced by the manifest: File}.
+        progress (callable, optional): Called as `progress(stage, done, total)`.
+
+    Returns:
+        dict: Counts of created variants and lectures and of queued probes.
+    """
+    variants_data = validate_manifest(manifest)
+
+    file_field = api_models.VariantItem._meta.get_field("file")
+    storage = file_field.storage
+    stored = {}
+    saved = []
+
+    referenced = [
+        item["file"]
+        for variant in variants_data
+        for item in variant["items"]
+        if item.get("file")
+    ]
+    missing = sorted(set(referenced) - set(files))
+    if missing:
+        raise CurriculumImportError(f"Files missing from the upload: {missing}")
+
+    hashes = {name: hash_file(files[name]) for name in set(referenced)}
+    metadata = {
+        entry.content_hash: entry
+        for entry in api_models.MediaMetadata.objects.filter(
+            content_hash__in=set(hashes.values())
+        )
+    }
+
+    try:
+        for done, name in enumerate(sorted(hashes), start=1):
+            known = metadata.get(hashes[name])
+            if known and storage.exists(known.file):
+                stored[name] = known.file
+            else:
+                upload_name = file_field.generate_filename(None, files[name].name)
+                stored[name] = storage.save(upload_name, files[name])
+                saved.append(stored[name])
+            if progress:
+                progress("store", done, len(hashes))
+
+        with transaction.atomic():
+            variants = api_models.Variant.objects.bulk_create(
+                [
+                    api_models.Variant(course=course, title=variant["title"])
+                    for variant in variants_data
+                ]
+            )
+            if not connection.features.can_return_rows_from_bulk_insert:
+                ids = dict(
+                    api_models.Variant.objects.filter(
+                        variant_id__in=[variant.variant_id for variant in variants]
+                    ).values_list("variant_id", "id")
+                )
+                for variant in variants:
+                    variant.pk = ids[variant.variant_id]
+
+            items = []
+            for variant, variant_data in zip(variants, variants_data):
+                for item in variant_data["items"]:
+                    entry = metadata.get(hashes.get(item.get("file")))
+                    items.append(
+                        api_models.VariantItem(
+                            variant=variant,
+                            title=item["title"],
+                            description=item.get("description"),
+                            preview=bool(item.get("preview", False)),
+                            file=stored.get(item.get("file")),
+                            content_hash=hashes.get(item.get("file")),
+                            duration=timedelta(seconds=entry.duration)
+                            if entry
+                            else None,
+                            content_duration=(
+                                format_duration(entry.duration) if entry else None
+                            ),
+                        )
+                    )
+            api_models.VariantItem.objects.bulk_create(items)
+            if not connection.features.can_return_rows_from_bulk_insert:
+                ids = dict(
+                    api_models.VariantItem.objects.filter(
+                        variant_item_id__in=[item.variant_item_id for item in items]
+                    ).values_list("variant_item_id", "id")
+                )
+                for item in items:
+                    item.pk = ids[item.variant_item_id]
+            api_models.refresh_variant_totals(variant.pk for variant in variants)
+
+            # The probe job reuses the MediaMetadata of a file another item's
+            # job probed first, so shared files are only read once.
+            probes = jobs.enqueue_many(
+                "probe_media",
+                [
+                    {"variant_item_id": item.pk}
+                    for item in items
+                    if item.file and item.duration is None
+                ],
+            )
+            jobs.enqueue_many(
+                "package_hls",
+                [{"variant_item_id": item.pk} for item in items if item.file],
+            )
+    except BaseException:
+        for name in saved:
+            storage.delete(name)
+        raise
+
+    return {
+        "variants": len(variants),
+        "lectures": len(items),
+        "probes_queued": len(probes),
+    }
@@ -0,0 +1,135 @@
+from itertools import islice
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import get_template
+
+from api import models as api_models
+
+
+def render_email(template_name, context):
+    """
+    Renders an email template with the given context.
+
+    Compiled templates are cached by Django's cached template loader (enabled
+    by default), which also picks up edited templates under the autoreloader.
+
+    Args:
+        template_name (str): Template path, e.g. "email/password_reset.html".
+        context (dict): Template context.
+
+    Returns:
+        str: The rendered HTML body.
+    """
+    return get_template(template_name).render(context)
+
+
+def merge_field(name):
+    """
+    Returns the provider placeholder for a per-recipient variable.
+
+    Args:
+        name (str): Key of the variable in `merge_data`.
+
+    Returns:
+        str: The placeholder, e.g. "%recipient.username%" for Mailgun.
+    """
+    return settings.EMAIL_MERGE_FIELD_FORMAT.format(name)
+
+
+def send_templated_email(template_name, subject, to, context, connection=None):
+    """
+    Renders a cached template and sends it as an HTML email.
+
+    Args:
+        template_name (str): Template path, e.g. "email/password_reset.html".
+        subject (str): Email subject.
+        to (list): Recipient addresses.
+        context (dict): Template context.
+        connection (optional): An open email backend connection to reuse.
+
+    Returns:
+        int: The number of messages sent.
+    """
+    msg = EmailMultiAlternatives(
+        subject=subject,
+        body="",
+        from_email=settings.FROM_EMAIL,
+        to=to,
+        connection=connection,
+    )
+    msg.attach_alternative(render_email(template_name, context), "text/html")
+
+    return msg.send()
+
+
+def send_course_announcement(
+    course,
+    subject,
+    template_name="email/course_published.html",
+    context=None,
+    batch_size=None,
+):
+    """
+    Sends an announcement to every student enrolled in a course.
+
+    The template is rendered once with provider placeholders for the
+    per-recipient values, recipients are streamed from `EnrolledCourse` with an
+    iterator, and each batch goes out as a single batch-send message whose
+    `merge_data` carries the recipient variables. Anymail delivers a batch send
+    to each recipient individually, so addresses are never exposed to each other.
+
+    Args:
+        course (Course): The course whose students are notified.
+        subject (str): Email subject.
+        template_name (str, optional): Template path. Defaults to "email/course_published.html".
+        context (dict, optional): Extra template context shared by all recipients.
+        batch_size (int, optional): Recipients per message. Defaults to `settings.EMAIL_BATCH_SIZE`.
+
+    Returns:
+        int: The number of recipients the announcement was sent to.
+    """
+    batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+
+    html_body = render_email(
+        template_name,
+        {
+            "course_title": course.title,
+            "teacher_name": course.teacher.full_name,
+            **(context or {}),
+            "username": merge_field("username"),
+        },
+    )
+
+    recipients = (
+        api_models.EnrolledCourse.objects.filter(course=course, user__isnull=False)
+        .order_by("user__email")
+        .values_list("user__email", "user__username")
+        .distinct()
+        .iterator(chunk_size=batch_size)
+    )
+
+    sent = 0
+    with get_connection() as connection:
+        while True:
+            batch = list(islice(recipients, batch_size))
+            if not batch:
+                break
+
+            msg = EmailMultiAlternatives(
+                subject=subject,
+                body="",
+                from_email=settings.FROM_EMAIL,
+                to=[email for email, _ in batch],
+                connection=connection,
+            )
+            msg.attach_alternative(html_body, "text/html")
+            msg.merge_data = {
+                email: {"username": username} for email, username in batch
+            }
+            msg.merge_global_data = {}
+            msg.send()
+
+            sent += len(batch)
+
+    return sent
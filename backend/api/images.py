@@ -0,0 +1,158 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+from api.media import hash_file
+
+# Pillow (and the numpy it loads when installed) is imported inside the
+# functions below so that web workers, which only enqueue derivative jobs,
+# never pay for it.
+
+
+class ImageDerivativeError(Exception):
+    """Raised when an image file is missing or cannot be decoded."""
+
+
+DERIVATIVE_FORMATS = {
+    "webp": ("WEBP", "webp"),
+    "jpeg": ("JPEG", "jpg"),
+}
+
+
+def derivative_name(content_hash, width, fmt):
+    """
+    Returns the content-addressed storage name of one derivative.
+
+    The name only depends on the source content, so identical uploads (and the
+    shared default images) share one set of derivatives and the files can be
+    cached forever.
+
+    Args:
+        content_hash (str): SHA-256 of the source image.
+        width (int): Target width in pixels.
+        fmt (str): A key of `DERIVATIVE_FORMATS`.
+
+    Returns:
+        str: e.g. "derivatives/ab/ab12.../320.webp".
+    """
+    extension = DERIVATIVE_FORMATS[fmt][1]
+
+    return f"derivatives/{content_hash[:2]}/{content_hash}/{width}.{extension}"
+
+
+def derivative_widths(width):
+    """
+    Returns the width buckets generated for an image `width` pixels wide.
+
+    Buckets wider than the source are skipped; a source narrower than the largest
+    bucket also gets a derivative at its own width so the best quality is available.
+
+    Args:
+        width (int): Width of the source image.
+
+    Returns:
+        list: Target widths in ascending order.
+    """
+    widths = [bucket for bucket in settings.IMAGE_DERIVATIVE_WIDTHS if bucket < width]
+    if width <= max(settings.IMAGE_DERIVATIVE_WIDTHS):
+        widths.append(width)
+
+    return widths
+
+
+def encode(image, fmt):
+    """
+    Encodes an image as WebP or JPEG without metadata.
+
+    Args:
+        image (Image): The resized image.
+        fmt (str): A key of `DERIVATIVE_FORMATS`.
+
+    Returns:
+        bytes: The encoded image.
+    """
+    from PIL import Image
+
+    if fmt == "jpeg" and image.mode != "RGB":
+        background = Image.new("RGB", image.size, "white")
+        rgba = image.convert("RGBA")
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        image = background
+
+    output = BytesIO()
+    image.save(
+        output,
+        DERIVATIVE_FORMATS[fmt][0],
+        quality=settings.IMAGE_DERIVATIVE_QUALITY,
+        optimize=True,
+        progressive=fmt == "jpeg",
+        method=4,
+    )
+
+    return output.getvalue()
+
+
+def generate_derivatives(field_file):
+    """
+    Writes width-bucketed WebP and JPEG copies of an image to its storage.
+
+    Derivatives that already exist are not generated again, and the source is
+    only decoded if at least one is missing.
+
+    Args:
+        field_file (FieldFile): The stored source image.
+
+    Returns:
+        dict: {format: {width: storage name}}, e.g. {"webp": {"320": "derivatives/..."}}.
+
+    Raises:
+        ImageDerivativeError: If the file is missing or is not an image.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    storage = field_file.storage
+    if not field_file or not storage.exists(field_file.name):
+        raise ImageDerivativeError(f"{field_file.name} does not exist.")
+
+    with storage.open(field_file.name, "rb") as source:
+        content_hash = hash_file(source)
+        source.seek(0)
+        try:
+            image = Image.open(source)
+            width, height = image.size
+            # EXIF rotation swaps the dimensions of portrait photos.
+            if image.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+                width, height = height, width
+
+            derivatives = {fmt: {} for fmt in DERIVATIVE_FORMATS}
+            missing = []
+            for target in derivative_widths(width):
+                for fmt in DERIVATIVE_FORMATS:
+                    name = derivative_name(content_hash, target, fmt)
+                    derivatives[fmt][str(target)] = name
+                    if not storage.exists(name):
+                        missing.append((target, fmt, name))
+            if not missing:
+                return derivatives
+
+            # Let JPEG decode at a reduced scale when the largest target allows it.
+            largest = max(target for target, _, _ in missing)
+            image.draft("RGB", (largest, round(height * largest / width)))
+            image = ImageOps.exif_transpose(image)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+            resized = {}
+            for target, fmt, name in missing:
+                if target not in resized:
+                    resized[target] = image.resize(
+                        (target, max(1, round(image.height * target / image.width))),
+                        Image.LANCZOS,
+                        reducing_gap=3.0,
+                    )
+                storage.save(name, ContentFile(encode(resized[target], fmt)))
+        except (UnidentifiedImageError, OSError) as error:
+            raise ImageDerivativeError(f"{field_file.name}: {error}")
+
+    return derivatives
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.media import MediaProbeError, probe, probe_ffmpeg
+
+
+class Command(BaseCommand):
+    """
+    Compares header-only probing with the ffmpeg fallback for media files.
+
+    Example:
+        python manage.py benchmark_media_probe media/course-file/*.mp4 --rounds 50
+    """
+
+    help = "Benchmark media probe throughput (probes/second) per strategy."
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="Media files to probe.")
+        parser.add_argument("--rounds", type=int, default=20)
+
+    def handle(self, *args, **options):
+        for name, strategy in (("container", probe), ("ffmpeg", probe_ffmpeg)):
+            probes = failures = 0
+            started = time.perf_counter()
+            for _ in range(options["rounds"]):
+                for path in options["paths"]:
+                    try:
+                        strategy(path)
+                    except MediaProbeError:
+                        failures += 1
+                    probes += 1
+            elapsed = time.perf_counter() - started
+
+            self.stdout.write(
+                f"{name:<10} {probes / elapsed:10.1f} probes/s  "
+                f"{elapsed / probes * 1000:8.3f} ms/probe  {failures} failures"
+            )
@@ -0,0 +1,148 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from api import models as api_models
+from userauths.models import User
+
+
+class Command(BaseCommand):
+    """
+    Compares teacher dashboard queries on raw orders with the daily rollups.
+
+    Generates `--orders` synthetic paid and unpaid orders (one item each)
+    spread over `--days` days, `--teachers` teachers and their courses,
+    builds the rollups with `rebuild_teacher_stats`, then times the daily
+    revenue series of random teachers over several ranges both ways. Every
+    row is created in one transaction that is rolled back at the end.
+
+    Example:
+        python manage.py benchmark_teacher_stats --orders 10000000 --rounds 20
+    """
+
+    help = "Benchmark teacher revenue queries on orders vs. daily rollups."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=10_000_000)
+        parser.add_argument("--teachers", type=int, default=200)
+        parser.add_argument("--courses-per-teacher", type=int, default=5)
+        parser.add_argument("--days", type=int, default=730)
+        parser.add_argument("--rounds", type=int, default=20)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(options)
+            transaction.set_rollback(True)
+
+    def run(self, options):
+        random.seed(0)
+        today = timezone.localdate()
+        now = timezone.now()
+        teachers = []
+        courses = []
+        for number in range(options["teachers"]):
+            user = User.objects.create(
+                email=f"benchmark-teacher-{number}@example.com",
+                username=f"benchmark-teacher-{number}",
+                full_name=f"Benchmark Teacher {number}",
+            )
+            teacher = api_models.Teacher.objects.create(
+                user=user, full_name=user.full_name, image=""
+            )
+            teachers.append(teacher.pk)
+            for index in range(options["courses_per_teacher"]):
+                course = api_models.Course.objects.create(
+                    teacher=teacher, title=f"Benchmark {number}-{index}", image=""
+                )
+                courses.append((teacher.pk, course.pk))
+
+        started = time.perf_counter()
+        batch_size = options["batch_size"]
+        for first in range(0, options["orders"], batch_size):
+            numbers = range(first, min(first + batch_size, options["orders"]))
+            dates = [
+                now - timedelta(seconds=random.randrange(options["days"] * 86400))
+                for _ in numbers
+            ]
+            orders = api_models.CartOrder.objects.bulk_create(
+                api_models.CartOrder(
+                    order_id=f"b{number}",
+                    payment_status="Paid" if number % 10 else "Processing",
+                    date=date,
+                )
+                for number, date in zip(numbers, dates)
+            )
+            items = []
+            for order, date in zip(orders, dates):
+                teacher_id, course_id = random.choice(courses)
+                price = random.choice((9.99, 19.99, 49.99, 99.99))
+                items.append(
+                    api_models.CartOrderItem(
+                        order=order,
+                        course_id=course_id,
+                        teacher_id=teacher_id,
+                        price=price,
+                        total=price,
+                        date=date,
+                    )
+                )
+            api_models.CartOrderItem.objects.bulk_create(items)
+        self.stdout.write(
+            f"generated {options['orders']} orders in {time.perf_counter() - started:.1f} s"
+        )
+
+        started = time.perf_counter()
+        rows = api_models.rebuild_teacher_stats(today - timedelta(days=options["days"]))
+        self.stdout.write(
+            f"built {rows} rollup rows in {time.perf_counter() - started:.1f} s"
+        )
+
+        for span in (30, 90, 365):
+            start = today - timedelta(days=span - 1)
+            for name, query in (
+                ("orders", self.from_orders),
+                ("rollups", self.from_rollups),
+            ):
+                timings = []
+                for _ in range(options["rounds"]):
+                    teacher_id = random.choice(teachers)
+                    began = time.perf_counter()
+                    list(query(teacher_id, start, today))
+                    timings.append(time.perf_counter() - began)
+                self.stdout.write(
+                    f"{span:4d} days  {name:<8} p50 {statistics.median(timings) * 1000:8.2f} ms  "
+                    f"max {max(timings) * 1000:8.2f} ms"
+                )
+
+    @staticmethod
+    def from_orders(teacher_id, start, end):
+        return (
+            api_models.CartOrderItem.objects.filter(
+                teacher_id=teacher_id,
+                order__payment_status="Paid",
+                date__date__range=(start, end),
+            )
+            .annotate(day=TruncDate("date"))
+            .values("day")
+            .annotate(revenue=Sum("total"), sales=Count("id"))
+            .order_by("day")
+        )
+
+    @staticmethod
+    def from_rollups(teacher_id, start, end):
+        return (
+            api_models.TeacherDailyStats.objects.filter(
+                teacher_id=teacher_id, day__range=(start, end)
+            )
+            .values("day")
+            .annotate(revenue=Sum("revenue"), sales=Sum("sales"))
+            .order_by("day")
+        )
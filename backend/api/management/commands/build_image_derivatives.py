@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+
+from api import models as api_models
+from api.tasks import build_image_derivatives
+from core import jobs
+from userauths.models import Profile
+
+
+IMAGE_MODELS = (
+    api_models.Course,
+    api_models.Teacher,
+    api_models.Category,
+    Profile,
+)
+
+
+class Command(BaseCommand):
+    """
+    Generates responsive thumbnails for images uploaded before the pipeline existed.
+
+    By default one "image_derivatives" job is queued per image without
+    derivatives; `--now` builds them in this process instead.
+
+    Example:
+        python manage.py build_image_derivatives
+        python manage.py build_image_derivatives --all --now
+    """
+
+    help = "Queue or build WebP/JPEG thumbnails for stored images."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Include images that already have derivatives.",
+        )
+        parser.add_argument(
+            "--now",
+            action="store_true",
+            help="Build in this process instead of queueing.",
+        )
+
+    def handle(self, *args, **options):
+        for model in IMAGE_MODELS:
+            rows = model.objects.exclude(image="").exclude(image__isnull=True)
+            if not options["all"]:
+                rows = rows.filter(image_derivatives={})
+            pks = list(rows.values_list("pk", flat=True))
+
+            if options["now"]:
+                for pk in pks:
+                    build_image_derivatives(model=model._meta.label, pk=pk)
+            else:
+                jobs.enqueue_many(
+                    "image_derivatives",
+                    [{"model": model._meta.label, "pk": pk} for pk in pks],
+                )
+
+            action = "Built" if options["now"] else "Queued"
+            self.stdout.write(f"{action} {len(pks)} {model._meta.verbose_name_plural}.")
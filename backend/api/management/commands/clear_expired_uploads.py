@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api import models as api_models
+from api.uploads import discard_parts
+
+
+class Command(BaseCommand):
+    """
+    Deletes chunked uploads that were abandoned before being finalized.
+
+    Uploads older than `CHUNKED_UPLOAD_EXPIRY_HOURS` that are still "Uploading"
+    lose their session and received chunks. Run it periodically (e.g. hourly).
+
+    Example:
+        python manage.py clear_expired_uploads
+    """
+
+    help = "Delete abandoned resumable uploads and their chunks."
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=settings.CHUNKED_UPLOAD_EXPIRY_HOURS)
+        sessions = api_models.UploadSession.objects.filter(
+            status="Uploading", date__lt=cutoff
+        )
+
+        count = 0
+        for session in sessions.iterator():
+            discard_parts(session)
+            session.delete()
+            count += 1
+
+        self.stdout.write(f"Deleted {count} expired uploads.")
@@ -0,0 +1,49 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api import playback
+
+
+class Command(BaseCommand):
+    """
+    Writes buffered playback heartbeats to the database.
+
+    Runs in a loop, flushing every `PLAYBACK_FLUSH_INTERVAL` seconds, so the
+    database write rate is bounded by the number of active viewers per interval
+    rather than the heartbeat rate. Run a single instance per cache. Refuses to
+    run when `PLAYBACK_CACHE` is a per-process cache.
+
+    Example:
+        python manage.py flush_playback --interval 10
+        python manage.py flush_playback --once
+    """
+
+    help = "Flush buffered playback positions to LessonPlayback."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.PLAYBACK_FLUSH_INTERVAL,
+            help="Seconds between flushes.",
+        )
+        parser.add_argument("--once", action="store_true", help="Flush once and exit.")
+
+    def handle(self, *args, **options):
+        if not playback.is_shared_cache():
+            raise CommandError(
+                f"PLAYBACK_CACHE {settings.PLAYBACK_CACHE!r} is a per-process cache, so "
+                "heartbeats are written to the database directly. Configure a shared "
+                "cache (e.g. Redis) to buffer them."
+            )
+
+        while True:
+            started = time.monotonic()
+            written = playback.flush()
+            if written:
+                self.stdout.write(f"Wrote {written} playback positions.")
+            if options["once"]:
+                break
+            time.sleep(max(0, options["interval"] - (time.monotonic() - started)))
@@ -0,0 +1,59 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from api import models as api_models
+from core import jobs
+
+
+class Command(BaseCommand):
+    """
+    Issues certificates for every student who completed a course.
+
+    Certificates are normally issued as students complete their last lecture;
+    this catches up a whole cohort at once (e.g. after lectures were imported
+    or progress was rebuilt), and re-queues renders of certificates that have
+    no files yet. With `--render` the queued renders are run right away by a
+    pool of `--processes` workers instead of waiting for `run_jobs`.
+
+    Example:
+        python manage.py generate_certificates 482910 --render --processes 4
+        python manage.py generate_certificates --all
+    """
+
+    help = "Issue and render certificates for students who completed a course."
+
+    def add_arguments(self, parser):
+        parser.add_argument("course_ids", nargs="*", help="Public course ids.")
+        parser.add_argument("--all", action="store_true", help="Every course.")
+        parser.add_argument(
+            "--render", action="store_true", help="Run the queued renders now."
+        )
+        parser.add_argument("--processes", type=int, default=1)
+
+    def handle(self, *args, **options):
+        courses = api_models.Course.objects.all()
+        if not options["all"]:
+            if not options["course_ids"]:
+                raise CommandError("Pass course ids or --all.")
+            courses = courses.filter(course_id__in=options["course_ids"])
+
+        issued = 0
+        for course_pk in courses.values_list("pk", flat=True):
+            issued += len(api_models.issue_certificates(course_pk))
+            unrendered = api_models.Certificate.objects.filter(
+                course_id=course_pk, image="", user__isnull=False
+            ).values_list("pk", flat=True)
+            for certificate_pk in unrendered:
+                jobs.enqueue(
+                    "render_certificate", unique=True, certificate_id=certificate_pk
+                )
+
+        self.stdout.write(f"Issued {issued} certificates.")
+        if options["render"]:
+            call_command(
+                "run_jobs",
+                kinds=["render_certificate"],
+                once=True,
+                processes=options["processes"],
+                stdout=self.stdout,
+            )
@@ -0,0 +1,82 @@
+import json
+import os
+import time
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from api import models as api_models
+from api.curriculum import (
+    CurriculumImportError,
+    import_curriculum,
+    read_archive,
+    validate_manifest,
+)
+
+
+class Command(BaseCommand):
+    """
+    Imports a course curriculum from a ZIP archive or a manifest and a directory.
+
+    Example:
+        python manage.py import_curriculum 123456 course.zip
+        python manage.py import_curriculum 123456 manifest.json --files-dir ./videos
+    """
+
+    help = "Bulk import Variants and VariantItems for a course."
+
+    def add_arguments(self, parser):
+        parser.add_argument("course_id", help="The public course_id of the course.")
+        parser.add_argument("source", help="A ZIP archive or a manifest.json file.")
+        parser.add_argument(
+            "--files-dir",
+            help="Directory the manifest's file paths are relative to "
+            "(default: the manifest's directory).",
+        )
+
+    def handle(self, *args, **options):
+        course = api_models.Course.objects.filter(
+            course_id=options["course_id"]
+        ).first()
+        if course is None:
+            raise CommandError(f"Course '{options['course_id']}' does not exist.")
+
+        source = options["source"]
+        opened = []
+        try:
+            if source.lower().endswith(".zip"):
+                manifest, files = read_archive(source)
+            else:
+                with open(source, encoding="utf-8") as handle:
+                    manifest = json.load(handle)
+                files_dir = options["files_dir"] or os.path.dirname(source)
+                files = {}
+                for variant in validate_manifest(manifest):
+                    for item in variant["items"]:
+                        name = item.get("file")
+                        if name and name not in files:
+                            path = os.path.join(files_dir, name)
+                            if not os.path.exists(path):
+                                raise CommandError(f"File '{path}' does not exist.")
+                            opened.append(open(path, "rb"))
+                            files[name] = File(opened[-1], name=os.path.basename(name))
+
+            started = time.perf_counter()
+            result = import_curriculum(course, manifest, files, self.report_progress)
+        except CurriculumImportError as error:
+            raise CommandError(str(error))
+        finally:
+            for handle in opened:
+                handle.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result['variants']} variants and {result['lectures']} "
+                f"lectures ({result['probes_queued']} probes queued) in "
+                f"{time.perf_counter() - started:.2f}s"
+            )
+        )
+
+    def report_progress(self, stage, done, total):
+        if done == total or done % 25 == 0:
+            self.stdout.write(f"{stage}: {done}/{total}")
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from api import models as api_models
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the duration, lecture count and rating totals of every variant and course.
+
+    The totals are kept up to date as lectures change; this backfills them for
+    existing data or repairs them after bulk edits that bypassed `save()`.
+
+    Example:
+        python manage.py rebuild_course_totals --batch-size 500
+    """
+
+    help = (
+        "Rebuild Variant and Course duration_seconds and lecture_count, and Course "
+        "review_count and rating_total."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        variant_ids = list(
+            api_models.Variant.objects.order_by("pk").values_list("pk", flat=True)
+        )
+        batch_size = options["batch_size"]
+        for start in range(0, len(variant_ids), batch_size):
+            api_models.refresh_variant_totals(variant_ids[start : start + batch_size])
+
+        # Courses without variants are not reached through their variants.
+        empty_courses = api_models.Course.objects.filter(variant__isnull=True)
+        api_models.refresh_course_totals(empty_courses.values_list("pk", flat=True))
+
+        course_ids = list(
+            api_models.Course.objects.order_by("pk").values_list("pk", flat=True)
+        )
+        for start in range(0, len(course_ids), batch_size):
+            api_models.refresh_course_ratings(course_ids[start : start + batch_size])
+
+        self.stdout.write(
+            f"Rebuilt totals for {len(variant_ids)} variants and "
+            f"{api_models.Course.objects.count()} courses."
+        )
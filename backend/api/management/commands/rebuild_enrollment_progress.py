@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from api import models as api_models
+
+
+class Command(BaseCommand):
+    """
+    Recounts the completed lessons of every enrollment.
+
+    Progress is kept up to date as lessons are completed and un-completed; this
+    backfills it for existing data or repairs it after bulk edits that bypassed
+    the signals (e.g. `QuerySet.update()` or raw SQL).
+
+    Example:
+        python manage.py rebuild_enrollment_progress --batch-size 1000
+    """
+
+    help = "Rebuild EnrollmentProgress completed lesson counts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        enrollment_ids = list(
+            api_models.EnrolledCourse.objects.order_by("pk").values_list(
+                "pk", flat=True
+            )
+        )
+        batch_size = options["batch_size"]
+        for start in range(0, len(enrollment_ids), batch_size):
+            api_models.rebuild_enrollment_progress(
+                api_models.EnrolledCourse.objects.filter(
+                    pk__in=enrollment_ids[start : start + batch_size]
+                )
+            )
+
+        self.stdout.write(f"Rebuilt progress for {len(enrollment_ids)} enrollments.")
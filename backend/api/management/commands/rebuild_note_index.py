@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from api import models as api_models
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the NoteToken search index of every note.
+
+    Notes are re-indexed when saved; this repairs the index after bulk edits
+    that bypassed `save()` or after the tokenizer changed.
+
+    Example:
+        python manage.py rebuild_note_index
+    """
+
+    help = "Rebuild the NoteToken note search index."
+
+    def handle(self, *args, **options):
+        count = 0
+        for note in api_models.Note.objects.iterator(chunk_size=500):
+            note.reindex()
+            count += 1
+
+        self.stdout.write(f"Indexed {count} notes.")
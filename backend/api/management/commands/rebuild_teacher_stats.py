@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+from django.utils import timezone
+
+from api import models as api_models
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the teachers' daily stats rollups from orders and enrollments.
+
+    The rollups are updated as orders are paid and students enroll; run this
+    nightly with `--days` to reconcile recent days with changes that bypassed
+    the signals (refunds edited in bulk, deleted orders, imports), or without
+    it to rebuild the whole history, `--chunk-days` days per transaction.
+
+    Example:
+        python manage.py rebuild_teacher_stats --days 3
+        python manage.py rebuild_teacher_stats --chunk-days 31
+    """
+
+    help = "Rebuild TeacherDailyStats from orders and enrollments."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, help="Only rebuild this many days up to today."
+        )
+        parser.add_argument("--chunk-days", type=int, default=31)
+
+    def handle(self, *args, **options):
+        end = timezone.localdate()
+        if options["days"]:
+            start = end - timedelta(days=options["days"] - 1)
+        else:
+            first_dates = [
+                timezone.localdate(first)
+                for first in (
+                    api_models.CartOrderItem.objects.aggregate(first=Min("date"))[
+                        "first"
+                    ],
+                    api_models.EnrolledCourse.objects.aggregate(first=Min("date"))[
+                        "first"
+                    ],
+                )
+                if first is not None
+            ]
+            first_day = api_models.TeacherDailyStats.objects.aggregate(first=Min("day"))
+            if first_day["first"] is not None:
+                first_dates.append(first_day["first"])
+            start = min(first_dates, default=end)
+
+        written = 0
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(
+                chunk_start + timedelta(days=options["chunk_days"] - 1), end
+            )
+            written += api_models.rebuild_teacher_stats(chunk_start, chunk_end)
+            chunk_start = chunk_end + timedelta(days=1)
+
+        self.stdout.write(f"Rebuilt {written} daily stats rows from {start} to {end}.")
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api import models as api_models
+from api.emails import send_course_announcement
+
+
+class Command(BaseCommand):
+    """
+    Emails an announcement to every student enrolled in a course.
+
+    Example:
+        python manage.py send_course_announcement 123456 --subject "Course Published"
+    """
+
+    help = "Send a batched announcement email to all students of a course."
+
+    def add_arguments(self, parser):
+        parser.add_argument("course_id", help="The public course_id of the course.")
+        parser.add_argument("--subject", default="Course Published")
+        parser.add_argument(
+            "--template",
+            default="email/course_published.html",
+            help="Email template to render (default: email/course_published.html).",
+        )
+        parser.add_argument("--link", default="", help="Optional link to the course.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Recipients per batch-send message (default: EMAIL_BATCH_SIZE).",
+        )
+
+    def handle(self, *args, **options):
+        course = (
+            api_models.Course.objects.select_related("teacher")
+            .filter(course_id=options["course_id"])
+            .first()
+        )
+        if course is None:
+            raise CommandError(f"Course '{options['course_id']}' does not exist.")
+
+        sent = send_course_announcement(
+            course,
+            subject=options["subject"],
+            template_name=options["template"],
+            context={"link": options["link"]},
+            batch_size=options["batch_size"],
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Announced '{course}' to {sent} students.")
+        )
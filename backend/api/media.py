@@ -0,0 +1,475 @@
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
+import struct
+import subprocess
+import tempfile
+from contextlib import contextmanager
+
+
+class MediaProbeError(Exception):
+    """Raised when the metadata of a media file cannot be determined."""
+
+
+EBML_HEADER = 0x1A45DFA3
+EBML_SEGMENT = 0x18538067
+EBML_INFO = 0x1549A966
+EBML_TIMECODE_SCALE = 0x2AD7B1
+EBML_DURATION = 0x4489
+EBML_TRACKS = 0x1654AE6B
+EBML_TRACK_ENTRY = 0xAE
+EBML_TRACK_TYPE = 0x83
+EBML_CODEC_ID = 0x86
+EBML_VIDEO = 0xE0
+EBML_PIXEL_WIDTH = 0xB0
+EBML_PIXEL_HEIGHT = 0xBA
+EBML_CLUSTER = 0x1F43B675
+
+
+def format_duration(seconds):
+    """
+    Formats a duration the way `VariantItem.content_duration` stores it.
+
+    Args:
+        seconds (float): Duration in seconds.
+
+    Returns:
+        str: e.g. "5m 30s".
+    """
+    minutes, remainder = divmod(seconds, 60)
+
+    return f"{math.floor(minutes)}m {math.floor(remainder)}s"
+
+
+def hash_file(file):
+    """
+    Returns the SHA-256 of a Django `File`, reading it in chunks.
+
+    Uploads that went through `api.uploadhandlers` already carry the digest as
+    `content_hash`, so they are not read again. The file is left open.
+
+    Args:
+        file (File): The file to hash.
+
+    Returns:
+        str: The hex digest.
+    """
+    content_hash = getattr(file, "content_hash", None)
+    if content_hash:
+        return content_hash
+
+    hasher = hashlib.sha256()
+    for chunk in file.chunks():
+        hasher.update(chunk)
+
+    return hasher.hexdigest()
+
+
+@contextmanager
+def local_copy(storage, name):
+    """
+    Yields a local path of a stored file, downloading it if the storage is remote.
+
+    Tools such as ffmpeg need a real path; with FileSystemStorage the stored
+    file is used directly, with S3 it is streamed to a temporary file that is
+    deleted afterwards.
+
+    Args:
+        storage (Storage): The storage holding the file.
+        name (str): The storage name.
+
+    Yields:
+        str: A readable local path.
+    """
+    try:
+        path = storage.path(name)
+    except NotImplementedError:
+        path = None
+    if path:
+        yield path
+        return
+
+    with tempfile.NamedTemporaryFile(suffix=os.path.splitext(name)[1]) as copy:
+        with storage.open(name, "rb") as remote:
+            shutil.copyfileobj(remote, copy, 1024 * 1024)
+        copy.flush()
+        yield copy.name
+
+
+def _read_exact(fileobj, size):
+    data = fileobj.read(size)
+    if len(data) != size:
+        raise MediaProbeError("Unexpected end of file.")
+    return data
+
+
+def iter_mp4_boxes(fileobj, start, end):
+    """
+    Walks the ISO BMFF boxes between two offsets without reading their payload.
+
+    Args:
+        fileobj (file): A binary file opened for reading.
+        start (int): Offset of the first box header.
+        end (int, optional): Offset where the parent box ends, or None for end of file.
+
+    Yields:
+        tuple: (box type, payload offset, payload size or None if it runs to end of file).
+    """
+    offset = start
+    while end is None or offset + 8 <= end:
+        fileobj.seek(offset)
+        header = fileobj.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack(">I4s", header)
+        header_size = 8
+        if size == 1:
+            (size,) = struct.unpack(">Q", _read_exact(fileobj, 8))
+            header_size = 16
+        elif size == 0:
+            remaining = None if end is None else end - offset - header_size
+            yield box_type, offset + header_size, remaining
+            return
+        if size < header_size:
+            raise MediaProbeError("Corrupt MP4 box header.")
+
+        yield box_type, offset + header_size, size - header_size
+        offset += size
+
+
+def _mp4_children(fileobj, offset, size):
+    return iter_mp4_boxes(fileobj, offset, None if size is None else offset + size)
+
+
+def _mp4_video_track(fileobj, offset, size):
+    handler = codec = None
+    width = height = 0
+    for box_type, box_offset, box_size in _mp4_children(fileobj, offset, size):
+        if box_type == b"tkhd":
+            fileobj.seek(box_offset)
+            version = _read_exact(fileobj, 1)[0]
+            fileobj.seek(box_offset + (88 if version == 1 else 76))
+            width, height = (
+                value >> 16 for value in struct.unpack(">II", _read_exact(fileobj, 8))
+            )
+        elif box_type == b"mdia":
+            for mdia_type, mdia_offset, mdia_size in _mp4_children(
+                fileobj, box_offset, box_size
+            ):
+                if mdia_type == b"hdlr":
+                    fileobj.seek(mdia_offset + 8)
+                    handler = _read_exact(fileobj, 4)
+                elif mdia_type == b"minf":
+                    codec = _mp4_codec(fileobj, mdia_offset, mdia_size)
+
+    if handler != b"vide":
+        return None
+    return {"width": width, "height": height, "codec": codec}
+
+
+def _mp4_codec(fileobj, offset, size):
+    for box_type, box_offset, box_size in _mp4_children(fileobj, offset, size):
+        if box_type != b"stbl":
+            continue
+        for stbl_type, stbl_offset, _ in _mp4_children(fileobj, box_offset, box_size):
+            if stbl_type == b"stsd":
+                fileobj.seek(stbl_offset + 12)
+                return _read_exact(fileobj, 4).decode("latin-1").strip()
+    return None
+
+
+def probe_mp4(fileobj):
+    """
+    Reads the metadata of an MP4/MOV file from its `moov` box.
+
+    The duration comes from `mvhd`, the resolution from the video track's
+    `tkhd` and the codec from its `stsd` entry. Only box headers and these
+    small boxes are read; `mdat` is skipped by seeking.
+
+    Args:
+        fileobj (file): A binary file opened for reading.
+
+    Returns:
+        dict: {"duration": seconds, "width": int, "height": int, "codec": str}.
+    """
+    for box_type, offset, size in iter_mp4_boxes(fileobj, 0, None):
+        if box_type != b"moov":
+            continue
+
+        info = {"duration": None, "width": None, "height": None, "codec": None}
+        for child_type, child_offset, child_size in _mp4_children(
+            fileobj, offset, size
+        ):
+            if child_type == b"mvhd":
+                fileobj.seek(child_offset)
+                version = _read_exact(fileobj, 4)[0]
+                if version == 1:
+                    timescale, duration = struct.unpack(
+                        ">IQ", _read_exact(fileobj, 28)[16:]
+                    )
+                else:
+                    timescale, duration = struct.unpack(
+                        ">II", _read_exact(fileobj, 16)[8:]
+                    )
+                if not timescale:
+                    raise MediaProbeError("MP4 movie header has no timescale.")
+                info["duration"] = duration / timescale
+            elif child_type == b"trak" and info["codec"] is None:
+                track = _mp4_video_track(fileobj, child_offset, child_size)
+                if track:
+                    info.update(track)
+
+        if info["duration"] is None:
+            raise MediaProbeError("No moov/mvhd box found.")
+        return info
+
+    raise MediaProbeError("No moov/mvhd box found.")
+
+
+def _read_vint(fileobj, keep_marker=False):
+    first = fileobj.read(1)
+    if not first:
+        return None, 0
+    first = first[0]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        raise MediaProbeError("Invalid EBML variable-size integer.")
+
+    value = first if keep_marker else first & (mask - 1)
+    for byte in _read_exact(fileobj, length - 1):
+        value = (value << 8) | byte
+
+    unknown = not keep_marker and value == (1 << (7 * length)) - 1
+    return (None if unknown else value), length
+
+
+def iter_ebml_elements(fileobj, start, end):
+    """
+    Walks the EBML elements between two offsets without reading their payload.
+
+    An element of unknown size (as live-streamed master elements have) runs to
+    the end of its parent; with no parent end it is yielded with a size of None
+    and ends the walk.
+
+    Args:
+        fileobj (file): A binary file opened for reading.
+        start (int): Offset of the first element.
+        end (int, optional): Offset where the parent element ends, or None for end of file.
+
+    Yields:
+        tuple: (element id, payload offset, payload size or None if unknown).
+    """
+    offset = start
+    while end is None or offset < end:
+        fileobj.seek(offset)
+        element_id, id_length = _read_vint(fileobj, keep_marker=True)
+        if element_id is None:
+            return
+        size, size_length = _read_vint(fileobj)
+        payload = offset + id_length + size_length
+        if size is None and end is not None:
+            size = end - payload
+
+        yield element_id, payload, size
+        if size is None:
+            return
+        offset = payload + size
+
+
+def _read_ebml_uint(fileobj, offset, size):
+    fileobj.seek(offset)
+    return int.from_bytes(_read_exact(fileobj, size), "big")
+
+
+def _webm_video_track(fileobj, offset, size):
+    track = {"type": None, "codec": None, "width": None, "height": None}
+    for element_id, element_offset, element_size in iter_ebml_elements(
+        fileobj, offset, offset + size
+    ):
+        if element_id == EBML_TRACK_TYPE:
+            track["type"] = _read_ebml_uint(fileobj, element_offset, element_size)
+        elif element_id == EBML_CODEC_ID:
+            fileobj.seek(element_offset)
+            codec = _read_exact(fileobj, element_size).rstrip(b"\x00")
+            track["codec"] = codec.decode("ascii", "replace")
+        elif element_id == EBML_VIDEO:
+            for video_id, video_offset, video_size in iter_ebml_elements(
+                fileobj, element_offset, element_offset + element_size
+            ):
+                if video_id == EBML_PIXEL_WIDTH:
+                    track["width"] = _read_ebml_uint(fileobj, video_offset, video_size)
+                elif video_id == EBML_PIXEL_HEIGHT:
+                    track["height"] = _read_ebml_uint(fileobj, video_offset, video_size)
+
+    if track.pop("type") != 1:
+        return None
+    return track
+
+
+def probe_webm(fileobj):
+    """
+    Reads the metadata of a WebM/Matroska file from its Segment headers.
+
+    The duration comes from the Info element and the resolution and codec from
+    the first video TrackEntry. Parsing stops at the first Cluster, so no media
+    data is read.
+
+    Args:
+        fileobj (file): A binary file opened for reading.
+
+    Returns:
+        dict: {"duration": seconds, "width": int, "height": int, "codec": str}.
+    """
+    for element_id, offset, size in iter_ebml_elements(fileobj, 0, None):
+        if element_id != EBML_SEGMENT:
+            continue
+
+        info = {"duration": None, "width": None, "height": None, "codec": None}
+        for child_id, child_offset, child_size in iter_ebml_elements(
+            fileobj, offset, None if size is None else offset + size
+        ):
+            # Elements of unknown size in an unknown-size Segment have no
+            # known end; leave such files to ffprobe.
+            if child_id == EBML_CLUSTER or child_size is None:
+                break
+            if child_id == EBML_INFO:
+                timecode_scale = 1_000_000
+                duration = None
+                for info_id, info_offset, info_size in iter_ebml_elements(
+                    fileobj, child_offset, child_offset + child_size
+                ):
+                    if info_id == EBML_TIMECODE_SCALE:
+                        timecode_scale = _read_ebml_uint(
+                            fileobj, info_offset, info_size
+                        )
+                    elif info_id == EBML_DURATION:
+                        fileobj.seek(info_offset)
+                        (duration,) = struct.unpack(
+                            ">f" if info_size == 4 else ">d",
+                            _read_exact(fileobj, info_size),
+                        )
+                if duration is None:
+                    raise MediaProbeError("WebM Info element has no Duration.")
+                info["duration"] = duration * timecode_scale / 1e9
+            elif child_id == EBML_TRACKS and info["codec"] is None:
+                for track_id, track_offset, track_size in iter_ebml_elements(
+                    fileobj, child_offset, child_offset + child_size
+                ):
+                    if track_id == EBML_TRACK_ENTRY:
+                        track = _webm_video_track(fileobj, track_offset, track_size)
+                        if track:
+                            info.update(track)
+                            break
+
+        if info["duration"] is None:
+            raise MediaProbeError("No WebM Segment Info element found.")
+        return info
+
+    raise MediaProbeError("No WebM Segment Info element found.")
+
+
+def probe_ffmpeg(path):
+    """
+    Reads the metadata of any file ffmpeg understands, without decoding frames.
+
+    Uses `ffprobe` when it is on PATH, otherwise the ffmpeg binary bundled with
+    `imageio-ffmpeg` and the stream summary it prints for its input.
+
+    Args:
+        path (str): Path of the media file.
+
+    Returns:
+        dict: {"duration": seconds, "width": int, "height": int, "codec": str}.
+    """
+    ffprobe = shutil.which("ffprobe")
+    if ffprobe:
+        result = subprocess.run(
+            [
+                ffprobe,
+                "-v",
+                "error",
+                "-show_entries",
+                "format=duration:stream=codec_type,codec_name,width,height",
+                "-of",
+                "json",
+                path,
+            ],
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        try:
+            output = json.loads(result.stdout)
+            duration = float(output["format"]["duration"])
+        except (ValueError, KeyError):
+            raise MediaProbeError(f"ffprobe could not read '{path}'.")
+        video = next(
+            (
+                stream
+                for stream in output.get("streams", [])
+                if stream.get("codec_type") == "video"
+            ),
+            {},
+        )
+        return {
+            "duration": duration,
+            "width": video.get("width"),
+            "height": video.get("height"),
+            "codec": video.get("codec_name"),
+        }
+
+    import imageio_ffmpeg
+
+    result = subprocess.run(
+        [imageio_ffmpeg.get_ffmpeg_exe(), "-hide_banner", "-i", path],
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    match = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", result.stderr)
+    if not match:
+        raise MediaProbeError(f"ffmpeg could not read '{path}'.")
+    hours, minutes, seconds = match.groups()
+    video = re.search(r"Stream #.*?Video: (\w+).*?, (\d{2,5})x(\d{2,5})", result.stderr)
+
+    return {
+        "duration": int(hours) * 3600 + int(minutes) * 60 + float(seconds),
+        "width": int(video.group(2)) if video else None,
+        "height": int(video.group(3)) if video else None,
+        "codec": video.group(1) if video else None,
+    }
+
+
+def probe(path):
+    """
+    Returns the metadata of a media file, reading container headers when possible.
+
+    MP4/MOV and WebM/Matroska files are parsed directly; anything else, or a
+    file whose headers cannot be parsed, falls back to `probe_ffmpeg`.
+
+    Args:
+        path (str): Path of the media file.
+
+    Returns:
+        dict: {"duration": seconds, "width": int, "height": int, "codec": str, "size": bytes}.
+    """
+    with open(path, "rb") as fileobj:
+        size = os.fstat(fileobj.fileno()).st_size
+        magic = fileobj.read(12)
+        fileobj.seek(0)
+        try:
+            if magic[4:8] in (b"ftyp", b"moov", b"free", b"mdat", b"wide"):
+                return {**probe_mp4(fileobj), "size": size}
+            if magic[:4] == EBML_HEADER.to_bytes(4, "big"):
+                return {**probe_webm(fileobj), "size": size}
+        except (MediaProbeError, struct.error):
+            pass
+
+    return {**probe_ffmpeg(path), "size": size}
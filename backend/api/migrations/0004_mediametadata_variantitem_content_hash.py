@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:54
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0003_rename_qa_id_questionanswer_question_answer_id_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaMetadata",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("content_hash", models.CharField(max_length=64, unique=True)),
+                ("file", models.CharField(max_length=1000)),
+                ("size", models.BigIntegerField(default=0)),
+                ("duration", models.FloatField()),
+                ("width", models.PositiveIntegerField(blank=True, null=True)),
+                ("height", models.PositiveIntegerField(blank=True, null=True)),
+                ("codec", models.CharField(blank=True, max_length=100, null=True)),
+                ("date", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "verbose_name_plural": "Media Metadata",
+            },
+        ),
+        migrations.AddField(
+            model_name="variantitem",
+            name="content_hash",
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_mediametadata_variantitem_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="image_derivatives",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="image_derivatives",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="teacher",
+            name="image_derivatives",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
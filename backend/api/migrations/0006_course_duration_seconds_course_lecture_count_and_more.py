@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0005_category_image_derivatives_course_image_derivatives_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="duration_seconds",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="lecture_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="variant",
+            name="duration_seconds",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="variant",
+            name="lecture_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
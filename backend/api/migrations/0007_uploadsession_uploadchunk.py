@@ -0,0 +1,81 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import shortuuid.django_fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_course_duration_seconds_course_lecture_count_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UploadSession",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "upload_id",
+                    shortuuid.django_fields.ShortUUIDField(
+                        alphabet=None, length=22, max_length=40, prefix="", unique=True
+                    ),
+                ),
+                ("filename", models.CharField(max_length=255)),
+                ("size", models.BigIntegerField()),
+                ("chunk_size", models.PositiveIntegerField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("Uploading", "Uploading"), ("Complete", "Complete")],
+                        default="Uploading",
+                        max_length=20,
+                    ),
+                ),
+                ("file", models.CharField(blank=True, max_length=1000, null=True)),
+                (
+                    "content_hash",
+                    models.CharField(blank=True, max_length=64, null=True),
+                ),
+                ("date", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="UploadChunk",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("index", models.PositiveIntegerField()),
+                ("size", models.PositiveIntegerField()),
+                ("checksum", models.CharField(max_length=64)),
+                (
+                    "session",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="chunks",
+                        to="api.uploadsession",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("session", "index")},
+            },
+        ),
+    ]
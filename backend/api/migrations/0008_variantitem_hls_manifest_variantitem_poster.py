@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_uploadsession_uploadchunk"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="variantitem",
+            name="hls_manifest",
+            field=models.FileField(blank=True, max_length=255, null=True, upload_to=""),
+        ),
+        migrations.AddField(
+            model_name="variantitem",
+            name="poster",
+            field=models.FileField(blank=True, max_length=255, null=True, upload_to=""),
+        ),
+    ]
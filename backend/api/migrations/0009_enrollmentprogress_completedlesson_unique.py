@@ -0,0 +1,88 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def remove_duplicate_completed_lessons(apps, schema_editor):
+    """Keeps the earliest completion of each (user, variant_item) pair."""
+    CompletedLesson = apps.get_model("api", "CompletedLesson")
+    duplicates = (
+        CompletedLesson.objects.filter(user__isnull=False)
+        .values("user_id", "variant_item_id")
+        .annotate(first=models.Min("id"), count=models.Count("id"))
+        .filter(count__gt=1)
+    )
+    for row in duplicates:
+        CompletedLesson.objects.filter(
+            user_id=row["user_id"], variant_item_id=row["variant_item_id"]
+        ).exclude(id=row["first"]).delete()
+
+
+def backfill_enrollment_progress(apps, schema_editor):
+    CompletedLesson = apps.get_model("api", "CompletedLesson")
+    EnrolledCourse = apps.get_model("api", "EnrolledCourse")
+    EnrollmentProgress = apps.get_model("api", "EnrollmentProgress")
+    counts = {
+        (row["course_id"], row["user_id"]): row["count"]
+        for row in CompletedLesson.objects.values("course_id", "user_id").annotate(
+            count=models.Count("id")
+        )
+    }
+    EnrollmentProgress.objects.bulk_create(
+        [
+            EnrollmentProgress(
+                enrolled_course_id=enrollment.pk,
+                completed_lessons=counts.get(
+                    (enrollment.course_id, enrollment.user_id), 0
+                ),
+            )
+            for enrollment in EnrolledCourse.objects.only("pk", "course_id", "user_id")
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("api", "0008_variantitem_hls_manifest_variantitem_poster"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_completed_lessons, migrations.RunPython.noop
+        ),
+        migrations.AlterUniqueTogether(
+            name="completedlesson",
+            unique_together={("user", "variant_item")},
+        ),
+        migrations.CreateModel(
+            name="EnrollmentProgress",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("completed_lessons", models.PositiveIntegerField(default=0)),
+                ("updated", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "enrolled_course",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="progress",
+                        to="api.enrolledcourse",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(backfill_enrollment_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_qa_summaries(apps, schema_editor):
+    Course = apps.get_model("api", "Course")
+    CourseQASummary = apps.get_model("api", "CourseQASummary")
+    courses = Course.objects.annotate(
+        questions=models.Count("questionanswer", distinct=True),
+        messages=models.Count("questionanswermessage", distinct=True),
+        question_activity=models.Max("questionanswer__date"),
+        message_activity=models.Max("questionanswermessage__date"),
+    ).filter(questions__gt=0)
+    CourseQASummary.objects.bulk_create(
+        [
+            CourseQASummary(
+                course_id=course.pk,
+                question_count=course.questions,
+                message_count=course.messages,
+                last_activity=max(
+                    date
+                    for date in (course.question_activity, course.message_activity)
+                    if date
+                ),
+            )
+            for course in courses
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_lessonplayback"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CourseQASummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("question_count", models.PositiveIntegerField(default=0)),
+                ("message_count", models.PositiveIntegerField(default=0)),
+                ("last_activity", models.DateTimeField(blank=True, null=True)),
+                (
+                    "course",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="qa_summary",
+                        to="api.course",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(backfill_qa_summaries, migrations.RunPython.noop),
+    ]
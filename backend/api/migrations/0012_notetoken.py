@@ -0,0 +1,89 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def index_existing_notes(apps, schema_editor):
+    from api.notes import tokenize
+
+    Note = apps.get_model("api", "Note")
+    NoteToken = apps.get_model("api", "NoteToken")
+    batch = []
+    for note in Note.objects.iterator(chunk_size=500):
+        terms = tokenize(note.title) + tokenize(note.note)
+        batch.extend(
+            NoteToken(
+                note_id=note.pk,
+                user_id=note.user_id,
+                course_id=note.course_id,
+                token=token,
+                count=min(count, 32767),
+            )
+            for token, count in terms.items()
+        )
+        if len(batch) >= 5000:
+            NoteToken.objects.bulk_create(batch)
+            batch = []
+    NoteToken.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("api", "0011_courseqasummary"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NoteToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("token", models.CharField(max_length=64)),
+                ("count", models.PositiveSmallIntegerField(default=1)),
+                (
+                    "course",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="api.course"
+                    ),
+                ),
+                (
+                    "note",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tokens",
+                        to="api.note",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user", "token", "course"],
+                        name="api_notetok_user_id_4eec70_idx",
+                    )
+                ],
+                "unique_together": {("note", "token")},
+            },
+        ),
+        migrations.RunPython(index_existing_notes, migrations.RunPython.noop),
+    ]
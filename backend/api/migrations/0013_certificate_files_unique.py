@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def remove_duplicate_certificates(apps, schema_editor):
+    """Keeps the earliest certificate of each (course, user) pair."""
+    Certificate = apps.get_model("api", "Certificate")
+    duplicates = (
+        Certificate.objects.filter(user__isnull=False)
+        .values("course_id", "user_id")
+        .annotate(first=models.Min("id"), count=models.Count("id"))
+        .filter(count__gt=1)
+    )
+    for row in duplicates:
+        Certificate.objects.filter(
+            course_id=row["course_id"], user_id=row["user_id"]
+        ).exclude(id=row["first"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("api", "0012_notetoken"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_certificates, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name="certificate",
+            name="image",
+            field=models.FileField(blank=True, max_length=255, upload_to=""),
+        ),
+        migrations.AddField(
+            model_name="certificate",
+            name="pdf",
+            field=models.FileField(blank=True, max_length=255, upload_to=""),
+        ),
+        migrations.AlterUniqueTogether(
+            name="certificate",
+            unique_together={("course", "user")},
+        ),
+    ]
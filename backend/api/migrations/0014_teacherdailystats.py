@@ -0,0 +1,94 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:25
+
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+
+def backfill_teacher_daily_stats(apps, schema_editor):
+    CartOrderItem = apps.get_model("api", "CartOrderItem")
+    EnrolledCourse = apps.get_model("api", "EnrolledCourse")
+    TeacherDailyStats = apps.get_model("api", "TeacherDailyStats")
+    rows = {}
+    for row in (
+        CartOrderItem.objects.filter(order__payment_status="Paid")
+        .annotate(day=TruncDate("date"))
+        .values("teacher_id", "course_id", "day")
+        .annotate(revenue=models.Sum("total"), sales=models.Count("id"))
+        .order_by()
+    ):
+        rows[(row["teacher_id"], row["course_id"], row["day"])] = TeacherDailyStats(
+            teacher_id=row["teacher_id"],
+            course_id=row["course_id"],
+            day=row["day"],
+            revenue=row["revenue"],
+            sales=row["sales"],
+        )
+    for row in (
+        EnrolledCourse.objects.filter(teacher__isnull=False)
+        .annotate(day=TruncDate("date"))
+        .values("teacher_id", "course_id", "day")
+        .annotate(students=models.Count("id"))
+        .order_by()
+    ):
+        key = (row["teacher_id"], row["course_id"], row["day"])
+        rows.setdefault(
+            key,
+            TeacherDailyStats(
+                teacher_id=row["teacher_id"], course_id=row["course_id"], day=row["day"]
+            ),
+        ).students = row["students"]
+    TeacherDailyStats.objects.bulk_create(rows.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0013_certificate_files_unique"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TeacherDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("sales", models.IntegerField(default=0)),
+                ("students", models.IntegerField(default=0)),
+                (
+                    "course",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="api.course"
+                    ),
+                ),
+                (
+                    "teacher",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="api.teacher"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Teacher Daily Stats",
+                "indexes": [
+                    models.Index(
+                        fields=["teacher", "day"], name="api_teacher_teacher_b67b2d_idx"
+                    )
+                ],
+                "unique_together": {("teacher", "course", "day")},
+            },
+        ),
+        migrations.RunPython(backfill_teacher_daily_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_notification_counters(apps, schema_editor):
+    Notification = apps.get_model("api", "Notification")
+    NotificationCounter = apps.get_model("api", "NotificationCounter")
+    unseen = Notification.objects.filter(seen=False)
+    counters = []
+    for recipient in ("user", "teacher"):
+        for row in (
+            unseen.filter(**{f"{recipient}__isnull": False})
+            .values(f"{recipient}_id")
+            .annotate(unread=models.Count("id"))
+            .order_by()
+        ):
+            counters.append(
+                NotificationCounter(
+                    **{f"{recipient}_id": row[f"{recipient}_id"]}, unread=row["unread"]
+                )
+            )
+    NotificationCounter.objects.bulk_create(counters, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("api", "0014_teacherdailystats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("unread", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "seen", "date"], name="api_notific_user_id_1f9ede_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["teacher", "seen", "date"],
+                name="api_notific_teacher_2c1167_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="notificationcounter",
+            name="teacher",
+            field=models.OneToOneField(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="notification_counter",
+                to="api.teacher",
+            ),
+        ),
+        migrations.AddField(
+            model_name="notificationcounter",
+            name="user",
+            field=models.OneToOneField(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="notification_counter",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RunPython(backfill_notification_counters, migrations.RunPython.noop),
+    ]
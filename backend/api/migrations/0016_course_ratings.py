@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:36
+
+from django.db import migrations, models
+
+
+def backfill_course_ratings(apps, schema_editor):
+    Course = apps.get_model("api", "Course")
+    Review = apps.get_model("api", "Review")
+    Course.objects.bulk_update(
+        [
+            Course(
+                pk=row["course_id"],
+                review_count=row["count"],
+                rating_total=row["total"],
+            )
+            for row in Review.objects.filter(active=True)
+            .values("course_id")
+            .annotate(count=models.Count("id"), total=models.Sum("rating"))
+            .order_by()
+        ],
+        ["review_count", "rating_total"],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0015_notificationcounter"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="rating_total",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="review_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_course_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0016_course_ratings"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="questionanswer",
+            index=models.Index(
+                fields=["course", "date", "id"], name="api_questio_course__e45cf4_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="questionanswermessage",
+            index=models.Index(
+                fields=["question", "date", "id"], name="api_questio_questio_9d2469_idx"
+            ),
+        ),
+    ]
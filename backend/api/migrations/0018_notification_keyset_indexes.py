@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0017_question_answer_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="notification",
+            name="api_notific_user_id_1f9ede_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="notification",
+            name="api_notific_teacher_2c1167_idx",
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "date", "id"], name="api_notific_user_id_dbbd5a_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["teacher", "date", "id"], name="api_notific_teacher_465cdb_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "seen", "date", "id"],
+                name="api_notific_user_id_53d166_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["teacher", "seen", "date", "id"],
+                name="api_notific_teacher_18b0f8_idx",
+            ),
+        ),
+    ]
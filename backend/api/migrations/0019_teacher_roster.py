@@ -0,0 +1,69 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:49
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_teacher_roster(apps, schema_editor):
+    EnrolledCourse = apps.get_model("api", "EnrolledCourse")
+    TeacherStudent = apps.get_model("api", "TeacherStudent")
+    rows = (
+        EnrolledCourse.objects.filter(teacher__isnull=False, user__isnull=False)
+        .values("teacher_id", "user_id")
+        .annotate(first_purchase=models.Min("date"), course_count=models.Count("id"))
+        .order_by()
+    )
+    TeacherStudent.objects.bulk_create(
+        [TeacherStudent(**row) for row in rows.iterator()], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("api", "0018_notification_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TeacherStudent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("first_purchase", models.DateTimeField()),
+                ("course_count", models.PositiveIntegerField(default=0)),
+                (
+                    "teacher",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="api.teacher"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["teacher", "first_purchase", "user"],
+                        name="api_teacher_teacher_ed9297_idx",
+                    )
+                ],
+                "unique_together": {("teacher", "user")},
+            },
+        ),
+        migrations.RunPython(backfill_teacher_roster, migrations.RunPython.noop),
+    ]
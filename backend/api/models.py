@@ -1,10 +1,19 @@
-import math
-from django.db import models
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import Coalesce, Greatest, Least, TruncDate
+from django.db.models.signals import post_delete, post_save
 from django.utils import timezone
 from django.utils.text import slugify
-from moviepy.editor import VideoFileClip
 from shortuuid.django_fields import ShortUUIDField
 
+from api.media import format_duration, hash_file
+from api.notes import query_terms, tokenize
+from core import events, jobs
+from core.models import TrackedFieldsMixin
 from userauths.models import User, Profile
 
 
@@ -48,6 +57,11 @@ RATING = (
     (5, "5 Star"),
 )
 
+UPLOAD_STATUS = (
+    ("Uploading", "Uploading"),
+    ("Complete", "Complete"),
+)
+
 NOTIFICATION_TYPE = (
     ("New Order", "New Order"),
     ("New Review", "New Review"),
@@ -58,13 +72,14 @@ NOTIFICATION_TYPE = (
 )
 
 
-class Teacher(models.Model):
+class Teacher(TrackedFieldsMixin, models.Model):
     """
     Represents a teacher profile.
 
     Attributes:
         user (User): The associated user for this teacher.
         image (FileField): An optional image file for the teacher's profile.
+        image_derivatives (JSONField): Resized copies of `image` by format and width (see `api.images`).
         full_name (str): The full name of the teacher.
         bio (str, optional): A short bio or description (can be blank).
         about (str, optional): A detailed description of the teacher (can be blank).
@@ -81,10 +96,13 @@ class Teacher(models.Model):
         review(): Returns the count of courses reviewed by students for this teacher.
     """
 
+    tracked_fields = ("image",)
+
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     image = models.FileField(
         upload_to="course-file", blank=True, null=True, default="default.jpg"
     )
+    image_derivatives = models.JSONField(default=dict, blank=True)
     full_name = models.CharField(max_length=100)
     bio = models.CharField(max_length=100, null=True, blank=True)
     about = models.TextField(null=True, blank=True)
@@ -107,7 +125,7 @@ class Teacher(models.Model):
         return Course.objects.filter(teacher=self).count()
 
 
-class Category(models.Model):
+class Category(TrackedFieldsMixin, models.Model):
     """
     Represents a category for courses.
 
@@ -117,6 +135,7 @@ class Category(models.Model):
     Attributes:
         title (str): The title of the category.
         image (FileField, optional): An image file associated with the category (can be blank).
+        image_derivatives (JSONField): Resized copies of `image` by format and width (see `api.images`).
         active (bool): Indicates whether the category is active or not.
         slug (SlugField, optional): A unique slug for the category (can be blank).
 
@@ -134,10 +153,13 @@ class Category(models.Model):
         category.save()
     """
 
+    tracked_fields = ("image",)
+
     title = models.CharField(max_length=100)
     image = models.FileField(
         upload_to="course-file", default="category.jpg", null=True, blank=True
     )
+    image_derivatives = models.JSONField(default=dict, blank=True)
     active = models.BooleanField(default=True)
     slug = models.SlugField(unique=True, null=True, blank=True)
 
@@ -158,7 +180,7 @@ class Category(models.Model):
         super(Category, self).save(*args, **kwargs)
 
 
-class Course(models.Model):
+class Course(TrackedFieldsMixin, models.Model):
     """
     Represents a course offered within the platform.
 
@@ -173,6 +195,7 @@ class Course(models.Model):
         teacher (ForeignKey): The teacher associated with the course.
         file (FileField): Optional file attachment related to the course.
         image (FileField): Optional image associated with the course.
+        image_derivatives (JSONField): Resized copies of `image` by format and width (see `api.images`).
         title (CharField): The title of the course (maximum length: 200 characters).
         description (TextField): A detailed description of the course (nullable).
         price (DecimalField): The course price (maximum 12 digits, 2 decimal places).
@@ -184,6 +207,10 @@ class Course(models.Model):
         course_id (ShortUUIDField): A unique short UUID for the course.
         slug (SlugField): A URL-friendly slug for the course (unique, nullable).
         date (DateTimeField): The creation date of the course (default: current timestamp).
+        duration_seconds (FloatField): Total duration of the course's lectures (maintained by `refresh_course_totals`).
+        lecture_count (PositiveIntegerField): Number of lectures in the course (maintained by `refresh_course_totals`).
+        review_count (PositiveIntegerField): Number of active reviews (maintained by `refresh_course_ratings`).
+        rating_total (PositiveIntegerField): Sum of the ratings of the active reviews (maintained by `refresh_course_ratings`).
 
     Methods:
         __str__(): Returns the title of the course.
@@ -191,17 +218,20 @@ class Course(models.Model):
         students(): Returns a queryset of enrolled students for this course.
         curriculum(): Returns a queryset of variants (curriculum) associated with this course.
         lectures(): Returns a queryset of variant items (lectures) for this course.
-        average_rating(): Calculates and returns the average rating for this course.
-        rating_count(): Returns the total count of reviews/ratings for this course.
+        average_rating(): Returns the average rating of the active reviews (None without reviews).
+        rating_count(): Returns the number of active reviews for this course.
         reviews(): Returns a queryset of reviews for this course.
     """
 
+    tracked_fields = ("image",)
+
     category = models.ForeignKey(
         Category, on_delete=models.SET_NULL, null=True, blank=True
     )
     teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE)
     file = models.FileField(upload_to="course-file", blank=True, null=True)
     image = models.FileField(upload_to="course-file", blank=True, null=True)
+    image_derivatives = models.JSONField(default=dict, blank=True)
     title = models.CharField(max_length=200)
     description = models.TextField(null=True, blank=True)
     price = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
@@ -219,6 +249,10 @@ class Course(models.Model):
     )
     slug = models.SlugField(unique=True, null=True, blank=True)
     date = models.DateTimeField(default=timezone.now)
+    duration_seconds = models.FloatField(default=0)
+    lecture_count = models.PositiveIntegerField(default=0)
+    review_count = models.PositiveIntegerField(default=0)
+    rating_total = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.title
@@ -238,13 +272,12 @@ class Course(models.Model):
         return VariantItem.objects.filter(variant__course=self)
 
     def average_rating(self):
-        average_rating = Review.objects.filter(course=self, active=True).aggregate(
-            avg_rating=models.Avg("rating")
-        )
-        return average_rating["avg_rating"]
+        if not self.review_count:
+            return None
+        return self.rating_total / self.review_count
 
     def rating_count(self):
-        return Review.objects.filter(course=self, active=True).count()
+        return self.review_count
 
     def reviews(self):
         return Review.objects.filter(course=self, active=True)
@@ -262,6 +295,8 @@ class Variant(models.Model):
         title (CharField): The title of the variant (maximum length: 1000 characters).
         variant_id (ShortUUIDField): A unique identifier for the variant (length: 6 characters, alphabet: "1234567890").
         date (DateTimeField): The creation date of the variant (default: current time).
+        duration_seconds (FloatField): Total duration of the variant's items (maintained by `refresh_variant_totals`).
+        lecture_count (PositiveIntegerField): Number of items in the variant (maintained by `refresh_variant_totals`).
 
     Methods:
         __str__(): Returns the title of the variant.
@@ -275,6 +310,8 @@ class Variant(models.Model):
         unique=True, length=6, max_length=20, alphabet="1234567890"
     )
     date = models.DateTimeField(default=timezone.now)
+    duration_seconds = models.FloatField(default=0)
+    lecture_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.title
@@ -286,7 +323,7 @@ class Variant(models.Model):
         return VariantItem.objects.filter(variant=self)
 
 
-class VariantItem(models.Model):
+class VariantItem(TrackedFieldsMixin, models.Model):
     """
     Represents an item within a course variant.
 
@@ -300,15 +337,30 @@ class VariantItem(models.Model):
         file (FileField): An optional file associated with the item (e.g., video, document).
         duration (DurationField): The duration of the item (nullable).
         content_duration (CharField): A human-readable representation of the item's duration (e.g., "5m 30s").
+        content_hash (CharField): SHA-256 of the file content, used to look up `MediaMetadata` (nullable).
+        hls_manifest (FileField): The HLS master playlist built from the file (nullable).
+        poster (FileField): A JPEG frame of the video shown before playback (nullable).
         preview (BooleanField): Indicates whether the item is a preview (default: False).
         variant_item_id (ShortUUIDField): A unique identifier for the variant item (length: 6 characters, alphabet: "1234567890").
         date (DateTimeField): The creation date of the variant item (default: current time).
 
     Methods:
         __str__(): Returns a formatted string with the variant title and item title.
-        save(*args, **kwargs): Overrides the default save method to calculate and store content duration.
+        save(*args, **kwargs): Overrides the default save method to reuse cached media metadata or queue a probe when the file changes.
+
+    Note:
+        - `duration` and `content_duration` are filled in by the "probe_media" background
+          job (see `api.tasks`), so uploads return without reading the video.
+        - A file whose content was seen before reuses its `MediaMetadata` and the stored copy
+          instead of being probed and stored again.
+        - Saves that add the item, move it to another variant or change its duration refresh
+          the `duration_seconds` and `lecture_count` totals of the affected variants and courses.
+        - `hls_manifest` and `poster` are built by the "package_hls" background job whenever
+          the file changes.
     """
 
+    tracked_fields = ("file", "variant", "duration")
+
     variant = models.ForeignKey(
         Variant, on_delete=models.CASCADE, related_name="variant_items"
     )
@@ -317,6 +369,9 @@ class VariantItem(models.Model):
     file = models.FileField(upload_to="course-file", null=True, blank=True)
     duration = models.DurationField(null=True, blank=True)
     content_duration = models.CharField(max_length=1000, null=True, blank=True)
+    content_hash = models.CharField(max_length=64, null=True, blank=True, db_index=True)
+    hls_manifest = models.FileField(max_length=255, null=True, blank=True)
+    poster = models.FileField(max_length=255, null=True, blank=True)
     preview = models.BooleanField(default=False)
     variant_item_id = ShortUUIDField(
         unique=True, length=6, max_length=20, alphabet="1234567890"
@@ -327,21 +382,163 @@ class VariantItem(models.Model):
         return f"{self.variant.title} - {self.title}"
 
     def save(self, *args, **kwargs):
+        file_changed = self.has_changed("file")
+        metadata = None
+        if file_changed:
+            self.hls_manifest = None
+            self.poster = None
+
+        if file_changed and self.file:
+            if self.file._committed:
+                with self.file.storage.open(self.file.name) as stored_file:
+                    self.content_hash = hash_file(stored_file)
+            else:
+                self.content_hash = hash_file(self.file.file)
+
+            metadata = MediaMetadata.objects.filter(
+                content_hash=self.content_hash
+            ).first()
+            if metadata:
+                if not self.file._committed and self.file.storage.exists(metadata.file):
+                    self.file = metadata.file
+                self.duration = timedelta(seconds=metadata.duration)
+                self.content_duration = format_duration(metadata.duration)
+        elif file_changed and not self._state.adding:
+            self.content_hash = None
+            self.duration = None
+            self.content_duration = None
+
+        totals_changed = self.has_changed("variant", "duration")
+        previous_variant_id = getattr(self, "_tracked_values", {}).get("variant")
+
         super().save(*args, **kwargs)
 
-        if self.file:
-            clip = VideoFileClip(self.file.path)
-            duration_seconds = clip.duration
+        if file_changed and self.file:
+            if metadata is None:
+                jobs.enqueue("probe_media", unique=True, variant_item_id=self.pk)
+            jobs.enqueue("package_hls", unique=True, variant_item_id=self.pk)
+        if totals_changed:
+            refresh_variant_totals({self.variant_id, previous_variant_id} - {None})
+
+
+class MediaMetadata(models.Model):
+    """
+    Caches the probed metadata of a media file, keyed by its content hash.
+
+    Args:
+        models (module): The Django models module.
+
+    Attributes:
+        content_hash (CharField): SHA-256 of the file content (unique).
+        file (CharField): Storage name of a stored copy of the file, reused for duplicate uploads.
+        size (BigIntegerField): File size in bytes.
+        duration (FloatField): Duration in seconds.
+        width (PositiveIntegerField): Video width in pixels (nullable).
+        height (PositiveIntegerField): Video height in pixels (nullable).
+        codec (CharField): Video codec identifier, e.g. "avc1" or "V_VP9" (nullable).
+        date (DateTimeField): When the file was first probed (default: current time).
+
+    Methods:
+        __str__(): Returns the content hash.
+    """
+
+    content_hash = models.CharField(max_length=64, unique=True)
+    file = models.CharField(max_length=1000)
+    size = models.BigIntegerField(default=0)
+    duration = models.FloatField()
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    codec = models.CharField(max_length=100, null=True, blank=True)
+    date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name_plural = "Media Metadata"
+
+    def __str__(self):
+        return self.content_hash
+
+
+class UploadSession(models.Model):
+    """
+    Represents a resumable chunked upload of a large file (see `api.uploads`).
+
+    Args:
+        models (module): The Django models module.
+
+    Attributes:
+        upload_id (ShortUUIDField): The public identifier clients use to send chunks.
+        user (ForeignKey): The user who started the upload (nullable).
+        filename (CharField): The original file name.
+        size (BigIntegerField): Total file size in bytes.
+        chunk_size (PositiveIntegerField): Size of every chunk except the last one.
+        status (CharField): The upload status (choices: "Uploading", "Complete").
+        file (CharField): Storage name of the assembled file once complete (nullable).
+        content_hash (CharField): SHA-256 of the assembled file (nullable).
+        date (DateTimeField): When the upload was started (default: current time).
+
+    Methods:
+        __str__(): Returns the file name and status.
+        chunk_count(): Returns the number of chunks the file is split into.
+        chunk_length(index): Returns the expected size of a chunk.
+        part_dir(): Returns the local directory holding the received chunks.
+        part_path(index): Returns the local path of one received chunk.
+    """
+
+    upload_id = ShortUUIDField(unique=True, length=22, max_length=40)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    status = models.CharField(choices=UPLOAD_STATUS, default="Uploading", max_length=20)
+    file = models.CharField(max_length=1000, null=True, blank=True)
+    content_hash = models.CharField(max_length=64, null=True, blank=True)
+    date = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.filename} ({self.status})"
+
+    def chunk_count(self):
+        return -(-self.size // self.chunk_size)
+
+    def chunk_length(self, index):
+        return min(self.chunk_size, self.size - index * self.chunk_size)
+
+    def part_dir(self):
+        return os.path.join(settings.CHUNKED_UPLOAD_ROOT, self.upload_id)
+
+    def part_path(self, index):
+        return os.path.join(self.part_dir(), f"{index:06d}.part")
 
-            minutes, remainder = divmod(duration_seconds, 60)
 
-            minutes = math.floor(minutes)
-            seconds = math.floor(remainder)
+class UploadChunk(models.Model):
+    """
+    Records one received chunk of an `UploadSession`.
+
+    Args:
+        models (module): The Django models module.
 
-            duration_text = f"{minutes}m {seconds}s"
-            self.content_duration = duration_text
+    Attributes:
+        session (ForeignKey): The upload the chunk belongs to.
+        index (PositiveIntegerField): Zero-based position of the chunk in the file.
+        size (PositiveIntegerField): Size of the chunk in bytes.
+        checksum (CharField): Hex SHA-256 of the chunk, verified on receipt.
 
-            super().save(update_fields=["content_duration"])
+    Meta:
+        unique_together = ['session', 'index']
+    """
+
+    session = models.ForeignKey(
+        UploadSession, on_delete=models.CASCADE, related_name="chunks"
+    )
+    index = models.PositiveIntegerField()
+    size = models.PositiveIntegerField()
+    checksum = models.CharField(max_length=64)
+
+    class Meta:
+        unique_together = ["session", "index"]
+
+    def __str__(self):
+        return f"{self.session.upload_id} #{self.index}"
 
 
 class QuestionAnswer(models.Model):
@@ -380,6 +577,7 @@ class QuestionAnswer(models.Model):
 
     class Meta:
         ordering = ["-date"]
+        indexes = [models.Index(fields=["course", "date", "id"])]
 
     def messages(self):
         return QuestionAnswerMessage.objects.filter(question=self)
@@ -429,11 +627,41 @@ class QuestionAnswerMessage(models.Model):
 
     class Meta:
         ordering = ["date"]
+        indexes = [models.Index(fields=["question", "date", "id"])]
 
     def profile(self):
         return Profile.objects.get(user=self.user)
 
 
+class CourseQASummary(models.Model):
+    """
+    Denormalized Q&A activity of a course.
+
+    Kept current by the QuestionAnswer and QuestionAnswerMessage signals at the
+    bottom of this module, so course pages can show thread counts without
+    counting the threads.
+
+    Args:
+        models (module): The Django models module.
+
+    Attributes:
+        course (OneToOneField): The course the summary belongs to.
+        question_count (PositiveIntegerField): Number of questions (threads) asked in the course.
+        message_count (PositiveIntegerField): Number of messages across all threads.
+        last_activity (DateTimeField): When the latest question or message was posted (nullable).
+    """
+
+    course = models.OneToOneField(
+        Course, on_delete=models.CASCADE, related_name="qa_summary"
+    )
+    question_count = models.PositiveIntegerField(default=0)
+    message_count = models.PositiveIntegerField(default=0)
+    last_activity = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.course.title} ({self.question_count} questions)"
+
+
 class Cart(models.Model):
     """
     Represents a user's cart for purchasing courses.
@@ -468,7 +696,7 @@ class Cart(models.Model):
         return self.course.title
 
 
-class CartOrder(models.Model):
+class CartOrder(TrackedFieldsMixin, models.Model):
     """
     Represents an order for course items in a user's cart.
 
@@ -495,11 +723,14 @@ class CartOrder(models.Model):
     Methods:
         order_items(): Returns a queryset of related order items.
         __str__(): Returns the order ID as a formatted string.
+        save(*args, **kwargs): Saves the order and updates the teachers' daily stats when it becomes (or stops being) paid.
 
     Meta:
         ordering = ['-date']
     """
 
+    tracked_fields = ("payment_status",)
+
     student = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     teachers = models.ManyToManyField(Teacher, blank=True)
     sub_total = models.DecimalField(max_digits=12, default=0.00, decimal_places=2)
@@ -529,6 +760,15 @@ class CartOrder(models.Model):
     def __str__(self):
         return self.order_id
 
+    def save(self, *args, **kwargs):
+        was_paid = getattr(self, "_tracked_values", {}).get("payment_status") == "Paid"
+        super().save(*args, **kwargs)
+        is_paid = self.payment_status == "Paid"
+        if was_paid != is_paid:
+            record_sales(CartOrderItem.objects.filter(order=self), 1 if is_paid else -1)
+        if is_paid and not was_paid:
+            notify_order(self)
+
 
 class CartOrderItem(models.Model):
     """
@@ -592,6 +832,46 @@ class CartOrderItem(models.Model):
         return self.order_id
 
 
+class TeacherDailyStats(models.Model):
+    """
+    Daily sales and enrollment totals of one course of a teacher.
+
+    Kept current as orders are paid and students enroll (see `record_sales`
+    and the signals at the bottom of this module), and recomputed from the
+    orders by `rebuild_teacher_stats`, so dashboards sum a few rows per day
+    instead of scanning order history.
+
+    Args:
+        models (module): The Django models module.
+
+    Attributes:
+        teacher (ForeignKey): The teacher who sold the course.
+        course (ForeignKey): The course.
+        day (DateField): The day of the sales and enrollments (in `TIME_ZONE`).
+        revenue (DecimalField): Total of the paid order items.
+        sales (IntegerField): Number of paid order items.
+        students (IntegerField): Number of new enrollments.
+
+    Meta:
+        unique_together = ['teacher', 'course', 'day']
+    """
+
+    teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE)
+    course = models.ForeignKey(Course, on_delete=models.CASCADE)
+    day = models.DateField()
+    revenue = models.DecimalField(max_digits=14, default=0, decimal_places=2)
+    sales = models.IntegerField(default=0)
+    students = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "Teacher Daily Stats"
+        unique_together = ["teacher", "course", "day"]
+        indexes = [models.Index(fields=["teacher", "day"])]
+
+    def __str__(self):
+        return f"{self.teacher} - {self.course} - {self.day}"
+
+
 class Certificate(models.Model):
     """
     Represents a certificate awarded to a user upon course completion.
@@ -604,6 +884,11 @@ class Certificate(models.Model):
         user (ForeignKey): A foreign key to the user who received the certificate (nullable).
         certificate_id (ShortUUIDField): A unique identifier for the certificate (length: 6 characters, alphabet: "1234567890").
         date (DateTimeField): The creation date of the certificate (default: current time).
+        image (FileField): The rendered certificate as PNG (empty until the "render_certificate" job ran).
+        pdf (FileField): The rendered certificate as PDF (empty until the "render_certificate" job ran).
+
+    Meta:
+        unique_together = ['course', 'user']
 
     Methods:
         __str__(): Returns the title of the associated course.
@@ -615,6 +900,11 @@ class Certificate(models.Model):
         unique=True, length=6, max_length=20, alphabet="1234567890"
     )
     date = models.DateTimeField(default=timezone.now)
+    image = models.FileField(max_length=255, blank=True)
+    pdf = models.FileField(max_length=255, blank=True)
+
+    class Meta:
+        unique_together = ["course", "user"]
 
     def __str__(self):
         return self.course.title
@@ -633,6 +923,9 @@ class CompletedLesson(models.Model):
         variant_item (ForeignKey): A foreign key to the specific lesson variant item.
         date (DateTimeField): The completion date of the lesson (default: current time).
 
+    Meta:
+        unique_together = ['user', 'variant_item']
+
     Methods:
         __str__(): Returns the title of the associated course.
     """
@@ -642,10 +935,45 @@ class CompletedLesson(models.Model):
     variant_item = models.ForeignKey(VariantItem, on_delete=models.CASCADE)
     date = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        unique_together = ["user", "variant_item"]
+
     def __str__(self):
         return self.course.title
 
 
+class LessonPlayback(models.Model):
+    """
+    Stores how far a user has watched a lecture, for resuming playback.
+
+    Rows are written in batches from the heartbeat buffer (see `api.playback`),
+    not once per heartbeat.
+
+    Args:
+        models (module): The Django models module.
+
+    Attributes:
+        user (ForeignKey): The viewer.
+        variant_item (ForeignKey): The lecture being watched.
+        position (FloatField): Playback position in seconds.
+        reported_at (DateTimeField): When the player reported the position; newer reports win.
+
+    Meta:
+        unique_together = ['user', 'variant_item']
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    variant_item = models.ForeignKey(VariantItem, on_delete=models.CASCADE)
+    position = models.FloatField(default=0)
+    reported_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ["user", "variant_item"]
+
+    def __str__(self):
+        return f"{self.user} - {self.variant_item_id} @ {self.position:.0f}s"
+
+
 class EnrolledCourse(models.Model):
     """
     Represents a user's enrollment in a course.
@@ -666,8 +994,8 @@ class EnrolledCourse(models.Model):
         lectures(): Returns a queryset of related lesson variant items.
         completed_lesson(): Returns a queryset of completed lessons by the user.
         curriculum(): Returns a queryset of course variants.
-        note(): Returns a queryset of notes related to the course and user.
-        question_answer(): Returns a queryset of question-answer pairs related to the course.
+        note(): Returns a queryset of notes related to the course and user (not serialized; see `search_notes`).
+        question_answer(): Returns a queryset of the user's question-answer pairs in the course.
         review(): Returns the first review associated with the course and user.
     """
 
@@ -698,13 +1026,86 @@ class EnrolledCourse(models.Model):
         return Note.objects.filter(course=self.course, user=self.user)
 
     def question_answer(self):
-        return QuestionAnswer.objects.filter(course=self.course)
+        return QuestionAnswer.objects.filter(course=self.course, user=self.user)
 
     def review(self):
         return Review.objects.filter(course=self.course, user=self.user).first()
 
 
-class Note(models.Model):
+class EnrollmentProgress(models.Model):
+    """
+    Denormalized lesson completion count of one enrollment.
+
+    Kept current by the CompletedLesson signals at the bottom of this module so
+    that a student's dashboard reads progress for all enrollments in one query
+    instead of counting completed lessons per course. The percentage is derived
+    from `Course.lecture_count`.
+
+    Args:
+        models (module): The Django models module.
+
+    Attributes:
+        enrolled_course (OneToOneField): The enrollment the progress belongs to.
+        completed_lessons (PositiveIntegerField): Number of the course's lessons the student completed.
+        updated (DateTimeField): When a lesson was last completed or un-completed.
+
+    Methods:
+        percent(): Returns the completed share of the course's lectures, from 0 to 100.
+    """
+
+    enrolled_course = models.OneToOneField(
+        EnrolledCourse, on_delete=models.CASCADE, related_name="progress"
+    )
+    completed_lessons = models.PositiveIntegerField(default=0)
+    updated = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.enrolled_course} ({self.completed_lessons})"
+
+    def percent(self):
+        lecture_count = self.enrolled_course.course.lecture_count
+        if not lecture_count:
+            return 0
+
+        return min(100, round(self.completed_lessons * 100 / lecture_count, 1))
+
+
+class TeacherStudent(models.Model):
+    """
+    One student on a teacher's roster, with their first purchase and course count.
+
+    Kept current by the EnrolledCourse signals at the bottom of this module so
+    that the roster is paginated with a keyset on the
+    (teacher, first_purchase, user) index instead of grouping the teacher's
+    enrollments on every page.
+
+    Args:
+        models (module): The Django models module.
+
+    Attributes:
+        teacher (ForeignKey): The teacher whose course the student enrolled in.
+        user (ForeignKey): The student.
+        first_purchase (DateTimeField): The date of the student's first enrollment with the teacher.
+        course_count (PositiveIntegerField): Number of the teacher's courses the student is enrolled in.
+
+    Meta:
+        unique_together = ['teacher', 'user']
+    """
+
+    teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    first_purchase = models.DateTimeField()
+    course_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ["teacher", "user"]
+        indexes = [models.Index(fields=["teacher", "first_purchase", "user"])]
+
+    def __str__(self):
+        return f"{self.teacher} - {self.user}"
+
+
+class Note(TrackedFieldsMixin, models.Model):
     """
     Represents a user's note related to a course.
 
@@ -721,8 +1122,15 @@ class Note(models.Model):
 
     Methods:
         __str__(): Returns the title of the note.
+        save(*args, **kwargs): Saves the note and re-indexes it if its text, user or course changed.
+        reindex(): Replaces the note's NoteToken rows with the terms of its current text.
+
+    Note:
+        - Deleting a note deletes its NoteToken rows with it (cascade).
     """
 
+    tracked_fields = ("title", "note", "user", "course")
+
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
     title = models.CharField(max_length=1000, null=True, blank=True)
@@ -735,8 +1143,66 @@ class Note(models.Model):
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        reindex = self.has_changed()
+        super().save(*args, **kwargs)
+        if reindex:
+            self.reindex()
+
+    def reindex(self):
+        terms = tokenize(self.title) + tokenize(self.note)
+        NoteToken.objects.filter(note=self).delete()
+        NoteToken.objects.bulk_create(
+            [
+                NoteToken(
+                    note=self,
+                    user_id=self.user_id,
+                    course_id=self.course_id,
+                    token=token,
+                    count=min(count, 32767),
+                )
+                for token, count in terms.items()
+            ]
+        )
+
+
+class NoteToken(models.Model):
+    """
+    One entry of the per-user inverted index over note titles and bodies.
+
+    `user` and `course` are copied from the note so a search is a single
+    index range scan on (user, token[, course]) without joining Note.
+
+    Args:
+        models (module): The Django models module.
+
+    Attributes:
+        note (ForeignKey): The note containing the term.
+        user (ForeignKey): The note's author (nullable).
+        course (ForeignKey): The note's course.
+        token (CharField): A normalized term (see `api.notes.tokenize`).
+        count (PositiveSmallIntegerField): Occurrences of the term in the note, used for ranking.
+
+    Meta:
+        unique_together = ['note', 'token']
+        indexes = [(user, token, course)]
+    """
+
+    note = models.ForeignKey(Note, on_delete=models.CASCADE, related_name="tokens")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    course = models.ForeignKey(Course, on_delete=models.CASCADE)
+    token = models.CharField(max_length=64)
+    count = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        unique_together = ["note", "token"]
+        indexes = [models.Index(fields=["user", "token", "course"])]
+
+    def __str__(self):
+        return f"{self.token} ({self.note_id})"
+
 
-class Review(models.Model):
+class Review(TrackedFieldsMixin, models.Model):
     """
     Represents a user's review for a course.
 
@@ -755,8 +1221,14 @@ class Review(models.Model):
     Methods:
         __str__(): Returns the title of the associated course.
         profile(): Returns the user's profile associated with the review.
+
+    Note:
+        - Approve, reject or reply to many reviews with `moderate_reviews()`,
+          which refreshes the ratings of the affected courses in one pass.
     """
 
+    tracked_fields = ("course", "rating", "active")
+
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
     review = models.TextField()
@@ -772,7 +1244,7 @@ class Review(models.Model):
         return Profile.objects.get(user=self.user)
 
 
-class Notification(models.Model):
+class Notification(TrackedFieldsMixin, models.Model):
     """
     Represents a notification related to user activity.
 
@@ -789,10 +1261,19 @@ class Notification(models.Model):
         seen (BooleanField): Indicates whether the notification has been seen (default: False).
         date (DateTimeField): The creation date of the notification (default: current time).
 
+    Meta:
+        indexes: (user, seen, date) and (teacher, seen, date), for unseen-first and newest-first listings.
+
     Methods:
         __str__(): Returns the type of the notification.
+
+    Note:
+        - Create many notifications with `notify()` and mark them seen with
+          `mark_all_seen()`, which keep the NotificationCounter badges in step.
     """
 
+    tracked_fields = ("seen",)
+
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     teacher = models.ForeignKey(
         Teacher, on_delete=models.SET_NULL, null=True, blank=True
@@ -808,10 +1289,55 @@ class Notification(models.Model):
     seen = models.BooleanField(default=False)
     date = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "date", "id"]),
+            models.Index(fields=["teacher", "date", "id"]),
+            models.Index(fields=["user", "seen", "date", "id"]),
+            models.Index(fields=["teacher", "seen", "date", "id"]),
+        ]
+
     def __str__(self):
         return self.type
 
 
+class NotificationCounter(models.Model):
+    """
+    Number of unseen notifications of a student or a teacher.
+
+    Kept current by `notify()`, `mark_all_seen()` and the Notification
+    signals at the bottom of this module, so unread badges are one primary
+    key lookup instead of a count over the notifications.
+
+    Args:
+        models (module): The Django models module.
+
+    Attributes:
+        user (OneToOneField): The student (null for a teacher's counter).
+        teacher (OneToOneField): The teacher (null for a student's counter).
+        unread (PositiveIntegerField): Notifications of the recipient that are not seen.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="notification_counter",
+    )
+    teacher = models.OneToOneField(
+        Teacher,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="notification_counter",
+    )
+    unread = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user or self.teacher} ({self.unread} unread)"
+
+
 class Coupon(models.Model):
     """
     Represents a coupon for discounts.
@@ -889,3 +1415,915 @@ class Country(models.Model):
 
     def __str__(self):
         return self.name
+
+
+def queue_image_derivatives(sender, instance, update_fields=None, **kwargs):
+    """
+    Queues thumbnail generation when an image field was uploaded or replaced.
+
+    Clearing the image clears its derivatives right away; resizing happens in the
+    "image_derivatives" background job (see `api.tasks`). The shared placeholder
+    images (the field defaults) are skipped so creating users and teachers does not
+    queue work.
+
+    Args:
+        sender (Model): The saved model class (Course, Teacher, Category or Profile).
+        instance (Model): The saved instance.
+        update_fields (frozenset, optional): The fields passed to `save()`, if any.
+    """
+    if update_fields is not None and "image" not in update_fields:
+        return
+    if not instance.has_changed("image"):
+        return
+
+    default = sender._meta.get_field("image").default
+    if instance.image and instance.image.name != default:
+        jobs.enqueue(
+            "image_derivatives", unique=True, model=sender._meta.label, pk=instance.pk
+        )
+    elif instance.image_derivatives:
+        instance.image_derivatives = {}
+        sender.objects.filter(pk=instance.pk).update(image_derivatives={})
+
+
+for image_model in (Course, Teacher, Category, Profile):
+    post_save.connect(queue_image_derivatives, sender=image_model)
+
+
+def refresh_variant_totals(variant_ids):
+    """
+    Recomputes `duration_seconds` and `lecture_count` of variants and their courses.
+
+    Only the given variants are aggregated (one grouped query) and only their
+    courses are re-summed from the variant totals, so a change costs the size
+    of one variant rather than of the whole course.
+
+    Args:
+        variant_ids (iterable): Primary keys of the variants whose items changed.
+    """
+    variant_ids = set(variant_ids)
+    if not variant_ids:
+        return
+
+    totals = {
+        row["variant_id"]: row
+        for row in VariantItem.objects.filter(variant_id__in=variant_ids)
+        .values("variant_id")
+        .annotate(duration=models.Sum("duration"), count=models.Count("id"))
+    }
+    variants = list(
+        Variant.objects.filter(pk__in=variant_ids).only(
+            "course_id", "duration_seconds", "lecture_count"
+        )
+    )
+    for variant in variants:
+        row = totals.get(variant.pk, {})
+        duration = row.get("duration")
+        variant.duration_seconds = duration.total_seconds() if duration else 0
+        variant.lecture_count = row.get("count", 0)
+    Variant.objects.bulk_update(variants, ["duration_seconds", "lecture_count"])
+
+    refresh_course_totals({variant.course_id for variant in variants})
+
+
+def refresh_course_totals(course_ids):
+    """
+    Re-sums `duration_seconds` and `lecture_count` of courses from their variants.
+
+    Args:
+        course_ids (iterable): Primary keys of the courses to refresh.
+    """
+    course_ids = set(course_ids)
+    totals = {
+        row["course_id"]: row
+        for row in Variant.objects.filter(course_id__in=course_ids)
+        .values("course_id")
+        .annotate(
+            duration=models.Sum("duration_seconds"), count=models.Sum("lecture_count")
+        )
+    }
+    for course_id in course_ids:
+        row = totals.get(course_id, {})
+        Course.objects.filter(pk=course_id).update(
+            duration_seconds=row.get("duration") or 0,
+            lecture_count=row.get("count") or 0,
+        )
+
+
+def refresh_totals_after_delete(sender, instance, **kwargs):
+    """
+    Refreshes the totals above a deleted VariantItem or Variant.
+
+    Args:
+        sender (Model): VariantItem or Variant.
+        instance (Model): The deleted instance.
+    """
+    if sender is VariantItem:
+        refresh_variant_totals([instance.variant_id])
+    else:
+        refresh_course_totals([instance.course_id])
+
+
+post_delete.connect(refresh_totals_after_delete, sender=VariantItem)
+post_delete.connect(refresh_totals_after_delete, sender=Variant)
+
+
+def create_enrollment_progress(sender, instance, created, **kwargs):
+    """
+    Creates the progress row of a new enrollment, counting lessons completed before.
+
+    Args:
+        sender (Model): EnrolledCourse.
+        instance (EnrolledCourse): The saved enrollment.
+        created (bool): True if the enrollment was just created.
+    """
+    if not created:
+        return
+
+    EnrollmentProgress.objects.get_or_create(
+        enrolled_course=instance,
+        defaults={
+            "completed_lessons": CompletedLesson.objects.filter(
+                course_id=instance.course_id, user_id=instance.user_id
+            ).count()
+        },
+    )
+
+
+def adjust_enrollment_progress(course_id, user_id, delta):
+    """
+    Atomically adds `delta` to the completed lesson count of a user's enrollments.
+
+    The increment is a single `UPDATE ... SET completed_lessons = completed_lessons + delta`,
+    so concurrent completions never overwrite each other.
+
+    Args:
+        course_id (int): The course of the completed lessons.
+        user_id (int): The student.
+        delta (int): The change in completed lessons (negative when un-completing).
+    """
+    if user_id is None or not delta:
+        return
+
+    progress = EnrollmentProgress.objects.filter(
+        enrolled_course__course_id=course_id, enrolled_course__user_id=user_id
+    )
+    if delta < 0:
+        progress = progress.filter(completed_lessons__gte=-delta)
+    progress.update(
+        completed_lessons=models.F("completed_lessons") + delta,
+        updated=timezone.now(),
+    )
+
+
+def count_completed_lesson(sender, instance, created, **kwargs):
+    if created:
+        adjust_enrollment_progress(instance.course_id, instance.user_id, 1)
+        issue_certificates(instance.course_id, [instance.user_id])
+
+
+def uncount_completed_lesson(sender, instance, **kwargs):
+    adjust_enrollment_progress(instance.course_id, instance.user_id, -1)
+
+
+def rebuild_enrollment_progress(enrollments):
+    """
+    Recounts the progress rows of enrollments from their completed lessons.
+
+    Missing rows are created. Counts come from one grouped query per call.
+
+    Args:
+        enrollments (QuerySet): The EnrolledCourse rows to rebuild.
+
+    Returns:
+        int: The number of enrollments rebuilt.
+    """
+    enrollments = list(enrollments.only("pk", "course_id", "user_id"))
+    pairs = {(enrollment.course_id, enrollment.user_id) for enrollment in enrollments}
+    counts = {
+        (row["course_id"], row["user_id"]): row["count"]
+        for row in CompletedLesson.objects.filter(
+            course_id__in={course_id for course_id, _ in pairs},
+            user_id__in={user_id for _, user_id in pairs},
+        )
+        .values("course_id", "user_id")
+        .annotate(count=models.Count("id"))
+    }
+
+    progress = {
+        row.enrolled_course_id: row
+        for row in EnrollmentProgress.objects.filter(enrolled_course__in=enrollments)
+    }
+    now = timezone.now()
+    for enrollment in enrollments:
+        row = progress.setdefault(
+            enrollment.pk, EnrollmentProgress(enrolled_course=enrollment)
+        )
+        row.completed_lessons = counts.get(
+            (enrollment.course_id, enrollment.user_id), 0
+        )
+        row.updated = now
+
+    existing = [row for row in progress.values() if row.pk is not None]
+    EnrollmentProgress.objects.bulk_create(
+        [row for row in progress.values() if row.pk is None]
+    )
+    EnrollmentProgress.objects.bulk_update(existing, ["completed_lessons", "updated"])
+
+    return len(enrollments)
+
+
+post_save.connect(create_enrollment_progress, sender=EnrolledCourse)
+post_save.connect(count_completed_lesson, sender=CompletedLesson)
+post_delete.connect(uncount_completed_lesson, sender=CompletedLesson)
+
+
+def adjust_qa_summary(course_id, questions=0, messages=0, activity=None):
+    """
+    Atomically adjusts the Q&A counters of a course.
+
+    The summary is created by the first post; decrements never create one, since
+    they also run while a course and its threads are being deleted.
+
+    Args:
+        course_id (int): The course.
+        questions (int, optional): Change in the number of questions.
+        messages (int, optional): Change in the number of messages.
+        activity (datetime, optional): Time of a new post; moves `last_activity` forward.
+    """
+    if questions > 0 or messages > 0:
+        CourseQASummary.objects.get_or_create(course_id=course_id)
+    summary = CourseQASummary.objects.filter(course_id=course_id)
+    changes = {}
+    if questions:
+        summary = summary.filter(question_count__gte=-questions)
+        changes["question_count"] = models.F("question_count") + questions
+    if messages:
+        summary = summary.filter(message_count__gte=-messages)
+        changes["message_count"] = models.F("message_count") + messages
+    if activity:
+        changes["last_activity"] = models.Case(
+            models.When(last_activity__gte=activity, then="last_activity"),
+            default=models.Value(activity),
+        )
+    summary.update(**changes)
+
+
+def count_qa_post(sender, instance, created, **kwargs):
+    if not created:
+        return
+    if sender is QuestionAnswer:
+        adjust_qa_summary(instance.course_id, questions=1, activity=instance.date)
+    else:
+        adjust_qa_summary(instance.course_id, messages=1, activity=instance.date)
+
+
+def uncount_qa_post(sender, instance, **kwargs):
+    if sender is QuestionAnswer:
+        adjust_qa_summary(instance.course_id, questions=-1)
+    else:
+        adjust_qa_summary(instance.course_id, messages=-1)
+
+
+for qa_model in (QuestionAnswer, QuestionAnswerMessage):
+    post_save.connect(count_qa_post, sender=qa_model)
+    post_delete.connect(uncount_qa_post, sender=qa_model)
+
+
+def push_qa_event(sender, instance, created, **kwargs):
+    """
+    Announces a new question or message to the course's event stream subscribers.
+
+    Args:
+        sender (Model): QuestionAnswer or QuestionAnswerMessage.
+        instance (Model): The saved question or message.
+        created (bool): True if the row was just created.
+    """
+    if not created:
+        return
+    if sender is QuestionAnswer:
+        event, data = "qa.question", {
+            "question_answer_id": instance.question_answer_id,
+            "title": instance.title,
+        }
+    else:
+        event, data = "qa.message", {
+            "question_answer_message_id": instance.question_answer_message_id,
+            "question": instance.question_id,
+        }
+    data.update(user=instance.user_id, date=instance.date)
+    events.publish(f"course:{instance.course_id}", event, data)
+
+
+def push_notification(sender, instance, created, **kwargs):
+    """
+    Sends a new notification to the event streams of its user and teacher.
+
+    Args:
+        sender (Model): Notification.
+        instance (Notification): The saved notification.
+        created (bool): True if the row was just created.
+    """
+    if created:
+        publish_notification(instance)
+
+
+def publish_notification(notification):
+    data = {"id": notification.pk, "type": notification.type, "date": notification.date}
+    if notification.user_id:
+        events.publish(f"user:{notification.user_id}", "notification", data)
+    if notification.teacher_id:
+        events.publish(f"teacher:{notification.teacher_id}", "notification", data)
+
+
+for qa_model in (QuestionAnswer, QuestionAnswerMessage):
+    post_save.connect(push_qa_event, sender=qa_model)
+post_save.connect(push_notification, sender=Notification)
+
+
+def search_notes(user_id, query, course_id=None):
+    """
+    Finds a user's notes containing every term of `query`, best matches first.
+
+    Matching runs on the NoteToken index: one grouped query over the postings
+    of the query terms, ranked by how often the terms occur, then newest first.
+
+    Args:
+        user_id (int): The author of the notes.
+        query (str): The search text.
+        course_id (int, optional): Only search notes of this course (primary key).
+
+    Returns:
+        QuerySet: Notes annotated with `score`, or no notes if the query has no terms.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return Note.objects.none()
+
+    postings = NoteToken.objects.filter(user_id=user_id, token__in=terms)
+    if course_id is not None:
+        postings = postings.filter(course_id=course_id)
+    matches = (
+        postings.values("note_id")
+        .annotate(matched=models.Count("token"), score=models.Sum("count"))
+        .filter(matched=len(terms))
+    )
+
+    return (
+        Note.objects.filter(pk__in=matches.values("note_id"))
+        .annotate(
+            score=models.Subquery(
+                matches.filter(note_id=models.OuterRef("pk")).values("score")[:1]
+            )
+        )
+        .order_by("-score", "-date", "-pk")
+    )
+
+
+def issue_certificates(course_id, user_ids=None):
+    """
+    Creates certificates for students who completed every lecture of a course.
+
+    Students who already have a certificate for the course are skipped. New
+    certificates are inserted with one `bulk_create` and rendered by
+    "render_certificate" background jobs, so completing a lesson (or
+    graduating a whole cohort) never waits for rendering.
+
+    Args:
+        course_id (int): The course.
+        user_ids (list, optional): Only consider these students; all enrolled students if omitted.
+
+    Returns:
+        list: The newly created certificates.
+    """
+    completed = EnrollmentProgress.objects.filter(
+        enrolled_course__course_id=course_id,
+        enrolled_course__course__lecture_count__gt=0,
+        completed_lessons__gte=models.F("enrolled_course__course__lecture_count"),
+        enrolled_course__user__isnull=False,
+    )
+    if user_ids is not None:
+        completed = completed.filter(enrolled_course__user_id__in=user_ids)
+    graduates = set(completed.values_list("enrolled_course__user_id", flat=True))
+    graduates -= set(
+        Certificate.objects.filter(
+            course_id=course_id, user_id__in=graduates
+        ).values_list("user_id", flat=True)
+    )
+    if not graduates:
+        return []
+
+    certificates = [
+        Certificate(course_id=course_id, user_id=user_id) for user_id in graduates
+    ]
+    Certificate.objects.bulk_create(certificates, ignore_conflicts=True)
+    certificate_ids = list(
+        Certificate.objects.filter(
+            course_id=course_id, user_id__in=graduates, image=""
+        ).values_list("pk", flat=True)
+    )
+    jobs.enqueue_many(
+        "render_certificate",
+        [{"certificate_id": certificate_id} for certificate_id in certificate_ids],
+    )
+
+    return certificates
+
+
+def queue_certificate_render(sender, instance, created, **kwargs):
+    if created and instance.user_id is not None:
+        jobs.enqueue("render_certificate", certificate_id=instance.pk)
+
+
+def forget_cached_certificate(sender, instance, **kwargs):
+    cache.delete(certificate_cache_key(instance.certificate_id))
+
+
+def certificate_cache_key(certificate_id):
+    return f"certificate:{certificate_id}"
+
+
+post_save.connect(queue_certificate_render, sender=Certificate)
+post_save.connect(forget_cached_certificate, sender=Certificate)
+post_delete.connect(forget_cached_certificate, sender=Certificate)
+
+
+def adjust_teacher_stats(changes):
+    """
+    Atomically adds to the daily stats rows of teachers' courses.
+
+    Rows are created by the first positive change; every change is a single
+    `UPDATE ... SET revenue = revenue + ...`, so concurrent orders never
+    overwrite each other.
+
+    Args:
+        changes (dict): {(teacher_id, course_id, day): {"revenue": ..., "sales": ..., "students": ...}}.
+    """
+    for (teacher_id, course_id, day), deltas in changes.items():
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            continue
+        key = {"teacher_id": teacher_id, "course_id": course_id, "day": day}
+        if any(delta > 0 for delta in deltas.values()):
+            TeacherDailyStats.objects.get_or_create(**key)
+        TeacherDailyStats.objects.filter(**key).update(
+            **{field: models.F(field) + delta for field, delta in deltas.items()}
+        )
+
+
+def record_sales(order_items, sign=1):
+    """
+    Adds (or with `sign=-1` removes) paid order items to their teachers' daily stats.
+
+    Args:
+        order_items (QuerySet): CartOrderItem rows.
+        sign (int, optional): 1 when the items were paid, -1 when the payment was reverted.
+    """
+    changes = {}
+    for item in order_items.values("teacher_id", "course_id", "date", "total"):
+        key = (item["teacher_id"], item["course_id"], timezone.localdate(item["date"]))
+        totals = changes.setdefault(key, {"revenue": 0, "sales": 0})
+        totals["revenue"] += sign * item["total"]
+        totals["sales"] += sign
+
+    adjust_teacher_stats(changes)
+
+
+def count_paid_order_item(sender, instance, created, **kwargs):
+    # Items added to an order that is already paid count at once.
+    if (
+        created
+        and CartOrder.objects.filter(
+            pk=instance.order_id, payment_status="Paid"
+        ).exists()
+    ):
+        record_sales(CartOrderItem.objects.filter(pk=instance.pk))
+
+
+def count_enrollment(sender, instance, created, **kwargs):
+    if created and instance.teacher_id is not None:
+        key = (
+            instance.teacher_id,
+            instance.course_id,
+            timezone.localdate(instance.date),
+        )
+        adjust_teacher_stats({key: {"students": 1}})
+
+
+def uncount_enrollment(sender, instance, **kwargs):
+    if instance.teacher_id is not None:
+        key = (
+            instance.teacher_id,
+            instance.course_id,
+            timezone.localdate(instance.date),
+        )
+        adjust_teacher_stats({key: {"students": -1}})
+
+
+def rebuild_teacher_stats(start=None, end=None):
+    """
+    Recomputes the daily stats of every teacher between two days from the orders.
+
+    Repairs drift from changes that bypass the signals (bulk imports,
+    `QuerySet.update()`, refunds edited in the admin, deleted orders) and
+    backfills history.
+
+    Everything happens in one transaction that first locks the range's rows,
+    so orders paid meanwhile either finish before the totals are read (and
+    are counted by them) or wait and add their increment on top. Rows are
+    corrected in place rather than deleted, since an increment waiting on a
+    deleted row would be lost; missing rows are inserted only if no order
+    created them in the meantime, otherwise they are left to their signal
+    and the next rebuild.
+
+    Args:
+        start (date, optional): First day to rebuild; the beginning of history if omitted.
+        end (date, optional): Last day to rebuild; today if omitted.
+
+    Returns:
+        int: The number of rows written.
+    """
+    end = end or timezone.localdate()
+    sales = CartOrderItem.objects.filter(
+        order__payment_status="Paid", date__date__lte=end
+    )
+    enrollments = EnrolledCourse.objects.filter(
+        teacher__isnull=False, date__date__lte=end
+    )
+    window = TeacherDailyStats.objects.filter(day__lte=end)
+    if start is not None:
+        sales = sales.filter(date__date__gte=start)
+        enrollments = enrollments.filter(date__date__gte=start)
+        window = window.filter(day__gte=start)
+    fields = ["revenue", "sales", "students"]
+
+    with transaction.atomic():
+        existing = {
+            (row.teacher_id, row.course_id, row.day): row
+            for row in window.select_for_update()
+        }
+
+        totals = {}
+        for row in (
+            sales.annotate(day=TruncDate("date"))
+            .values("teacher_id", "course_id", "day")
+            .annotate(revenue=models.Sum("total"), sales=models.Count("id"))
+            .order_by()
+        ):
+            key = (row["teacher_id"], row["course_id"], row["day"])
+            totals[key] = {
+                "revenue": row["revenue"],
+                "sales": row["sales"],
+                "students": 0,
+            }
+        for row in (
+            enrollments.annotate(day=TruncDate("date"))
+            .values("teacher_id", "course_id", "day")
+            .annotate(students=models.Count("id"))
+            .order_by()
+        ):
+            key = (row["teacher_id"], row["course_id"], row["day"])
+            totals.setdefault(key, {"revenue": 0, "sales": 0, "students": 0})
+            totals[key]["students"] = row["students"]
+
+        changed = []
+        for key, row in existing.items():
+            values = totals.pop(key, {"revenue": 0, "sales": 0, "students": 0})
+            if any(getattr(row, field) != values[field] for field in fields):
+                for field in fields:
+                    setattr(row, field, values[field])
+                changed.append(row)
+        TeacherDailyStats.objects.bulk_update(changed, fields, batch_size=1000)
+
+        appeared = set(
+            window.exclude(pk__in=[row.pk for row in existing.values()]).values_list(
+                "teacher_id", "course_id", "day"
+            )
+        )
+        missing = [
+            TeacherDailyStats(teacher_id=key[0], course_id=key[1], day=key[2], **values)
+            for key, values in totals.items()
+            if key not in appeared
+        ]
+        try:
+            with transaction.atomic():
+                TeacherDailyStats.objects.bulk_create(missing, batch_size=1000)
+        except IntegrityError:
+            # An order created one of the rows after the check above.
+            for row in list(missing):
+                row.pk = None
+                try:
+                    with transaction.atomic():
+                        row.save()
+                except IntegrityError:
+                    missing.remove(row)
+
+    return len(changed) + len(missing)
+
+
+post_save.connect(count_paid_order_item, sender=CartOrderItem)
+post_save.connect(count_enrollment, sender=EnrolledCourse)
+post_delete.connect(uncount_enrollment, sender=EnrolledCourse)
+
+
+def add_to_roster(sender, instance, created, **kwargs):
+    """
+    Adds the student of a new enrollment to the teacher's roster.
+
+    Args:
+        sender (Model): EnrolledCourse.
+        instance (EnrolledCourse): The saved enrollment.
+        created (bool): True if the enrollment was just created.
+    """
+    if not created or instance.teacher_id is None or instance.user_id is None:
+        return
+
+    key = {"teacher_id": instance.teacher_id, "user_id": instance.user_id}
+    TeacherStudent.objects.get_or_create(
+        **key, defaults={"first_purchase": instance.date}
+    )
+    TeacherStudent.objects.filter(**key).update(
+        course_count=models.F("course_count") + 1,
+        first_purchase=Least("first_purchase", models.Value(instance.date)),
+    )
+
+
+def remove_from_roster(sender, instance, **kwargs):
+    if instance.teacher_id is not None and instance.user_id is not None:
+        refresh_teacher_roster([(instance.teacher_id, instance.user_id)])
+
+
+def refresh_teacher_roster(pairs):
+    """
+    Recomputes roster rows from the enrollments, dropping students left with none.
+
+    Args:
+        pairs (iterable): (teacher_id, user_id) tuples to refresh.
+    """
+    for teacher_id, user_id in set(pairs):
+        key = {"teacher_id": teacher_id, "user_id": user_id}
+        totals = EnrolledCourse.objects.filter(**key).aggregate(
+            first_purchase=models.Min("date"), course_count=models.Count("id")
+        )
+        if totals["course_count"]:
+            TeacherStudent.objects.update_or_create(**key, defaults=totals)
+        else:
+            TeacherStudent.objects.filter(**key).delete()
+
+
+post_save.connect(add_to_roster, sender=EnrolledCourse)
+post_delete.connect(remove_from_roster, sender=EnrolledCourse)
+
+
+def unread_changes(notifications, sign=1):
+    """
+    Returns the counter changes for unseen notifications.
+
+    Args:
+        notifications (iterable): Notification instances.
+        sign (int, optional): 1 for notifications becoming unseen, -1 for ones being seen or deleted.
+
+    Returns:
+        dict: {("user" or "teacher", id): delta}.
+    """
+    changes = {}
+    for notification in notifications:
+        for recipient in ("user", "teacher"):
+            recipient_id = getattr(notification, f"{recipient}_id")
+            if recipient_id is not None:
+                key = (recipient, recipient_id)
+                changes[key] = changes.get(key, 0) + sign
+
+    return changes
+
+
+def adjust_unread(changes):
+    """
+    Atomically adds to the unread counters of students and teachers.
+
+    Counters are created by the first increment and never go below zero.
+
+    Args:
+        changes (dict): {("user" or "teacher", id): delta}, as returned by `unread_changes`.
+    """
+    for (recipient, recipient_id), delta in changes.items():
+        if not delta:
+            continue
+        counter = {f"{recipient}_id": recipient_id}
+        if delta > 0:
+            NotificationCounter.objects.get_or_create(**counter)
+        NotificationCounter.objects.filter(**counter).update(
+            unread=Greatest(models.F("unread") + delta, 0)
+        )
+
+
+def notify(notifications):
+    """
+    Creates notifications with one insert and bumps their recipients' unread counters.
+
+    `bulk_create` skips the Notification signals, so the counters are
+    adjusted (one UPDATE per recipient) and the event streams notified here.
+
+    Args:
+        notifications (list): Unsaved Notification instances.
+
+    Returns:
+        list: The created notifications.
+    """
+    if not notifications:
+        return []
+
+    with transaction.atomic():
+        created = Notification.objects.bulk_create(notifications, batch_size=500)
+        adjust_unread(unread_changes(n for n in created if not n.seen))
+    for notification in created:
+        publish_notification(notification)
+
+    return created
+
+
+def mark_all_seen(user_id=None, teacher_id=None):
+    """
+    Marks every unseen notification of a student or a teacher as seen.
+
+    One UPDATE marks the rows and one lowers the counter by the number of
+    rows it changed (rather than setting it to zero), so a notification
+    created concurrently is still counted.
+
+    Args:
+        user_id (int, optional): The student.
+        teacher_id (int, optional): The teacher, if `user_id` is not given.
+
+    Returns:
+        int: The number of notifications marked as seen.
+    """
+    recipient = ("user", user_id) if user_id is not None else ("teacher", teacher_id)
+    with transaction.atomic():
+        seen = Notification.objects.filter(
+            **{f"{recipient[0]}_id": recipient[1]}, seen=False
+        ).update(seen=True)
+        adjust_unread({recipient: -seen})
+
+    return seen
+
+
+def unread_count(user_id=None, teacher_id=None):
+    """Returns the unread badge of a student or, if `user_id` is not given, a teacher."""
+    if user_id is not None:
+        counters = NotificationCounter.objects.filter(user_id=user_id)
+    else:
+        counters = NotificationCounter.objects.filter(teacher_id=teacher_id)
+
+    return counters.values_list("unread", flat=True).first() or 0
+
+
+def count_notification(sender, instance, created, **kwargs):
+    if created:
+        changes = {} if instance.seen else unread_changes([instance])
+    elif instance.has_changed("seen"):
+        changes = unread_changes([instance], -1 if instance.seen else 1)
+    else:
+        return
+    adjust_unread(changes)
+
+
+def uncount_notification(sender, instance, **kwargs):
+    if not instance.seen:
+        adjust_unread(unread_changes([instance], -1))
+
+
+def notify_order(order):
+    """Notifies the teachers of a paid order's items and the student who bought them."""
+    items = list(CartOrderItem.objects.filter(order=order).only("pk", "teacher_id"))
+    notifications = [
+        Notification(
+            teacher_id=item.teacher_id, order=order, order_item=item, type="New Order"
+        )
+        for item in items
+    ]
+    if order.student_id is not None and items:
+        notifications.append(
+            Notification(
+                user_id=order.student_id,
+                order=order,
+                type="Course Enrollment Completed",
+            )
+        )
+    notify(notifications)
+
+
+def course_teacher_id(course_id):
+    return (
+        Course.objects.filter(pk=course_id).values_list("teacher_id", flat=True).first()
+    )
+
+
+def notify_review(sender, instance, created, **kwargs):
+    teacher_id = course_teacher_id(instance.course_id) if created else None
+    if teacher_id is not None:
+        notify(
+            [Notification(teacher_id=teacher_id, review=instance, type="New Review")]
+        )
+
+
+def notify_question(sender, instance, created, **kwargs):
+    teacher_id = course_teacher_id(instance.course_id) if created else None
+    if teacher_id is not None:
+        notify([Notification(teacher_id=teacher_id, type="New Course Question")])
+
+
+post_save.connect(count_notification, sender=Notification)
+post_delete.connect(uncount_notification, sender=Notification)
+post_save.connect(notify_review, sender=Review)
+post_save.connect(notify_question, sender=QuestionAnswer)
+
+
+def refresh_course_ratings(course_ids):
+    """
+    Recomputes `review_count` and `rating_total` of courses from their active reviews.
+
+    The totals are written by a single `UPDATE ... SET review_count =
+    (SELECT ...)` so they are computed and stored in one statement, and a
+    concurrent moderation cannot overwrite them with totals it read earlier.
+
+    Args:
+        course_ids (iterable): Primary keys of the courses to refresh.
+    """
+    course_ids = set(course_ids)
+    if not course_ids:
+        return
+
+    active = (
+        Review.objects.filter(course=models.OuterRef("pk"), active=True)
+        .order_by()
+        .values("course")
+    )
+    Course.objects.filter(pk__in=course_ids).update(
+        review_count=Coalesce(
+            models.Subquery(active.annotate(count=models.Count("id")).values("count")),
+            0,
+        ),
+        rating_total=Coalesce(
+            models.Subquery(
+                active.annotate(total=models.Sum("rating")).values("total")
+            ),
+            0,
+        ),
+    )
+
+
+def moderate_reviews(reviews, action, reply=None):
+    """
+    Approves, rejects or replies to many reviews at once.
+
+    The reviews are changed with a single UPDATE (which skips the Review
+    signals) and the ratings of the affected courses are then refreshed
+    together by `refresh_course_ratings`. Callers validate the action (see
+    `ReviewModerationSerializer`).
+
+    Args:
+        reviews (QuerySet): The reviews to moderate.
+        action (str): "approve" (make active), "reject" (make inactive) or "reply".
+        reply (str, optional): A reply to set on every review; required for "reply".
+
+    Returns:
+        int: The number of reviews updated.
+
+    Raises:
+        ValueError: If the action is unknown, or "reply" is given no reply.
+    """
+    changes = {}
+    if action == "approve":
+        changes["active"] = True
+    elif action == "reject":
+        changes["active"] = False
+    elif action != "reply" or reply is None:
+        raise ValueError(f"Invalid review action: {action}")
+    if reply is not None:
+        changes["reply"] = reply
+
+    with transaction.atomic():
+        course_ids = set(
+            reviews.order_by().values_list("course_id", flat=True).distinct()
+        )
+        updated = Review.objects.filter(pk__in=reviews.values("pk")).update(**changes)
+        if "active" in changes:
+            refresh_course_ratings(course_ids)
+
+    return updated
+
+
+def refresh_review_ratings(sender, instance, **kwargs):
+    if kwargs["signal"] is post_save and not instance.has_changed(
+        "course", "rating", "active"
+    ):
+        return
+    course_ids = {instance.course_id}
+    previous_course_id = getattr(instance, "_tracked_values", {}).get("course")
+    if previous_course_id is not None:
+        course_ids.add(previous_course_id)
+    refresh_course_ratings(course_ids)
+
+
+post_save.connect(refresh_review_ratings, sender=Review)
+post_delete.connect(refresh_review_ratings, sender=Review)
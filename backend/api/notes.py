@@ -0,0 +1,85 @@
+import re
+from collections import Counter
+from html import escape
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+MIN_TOKEN_LENGTH = 2
+MAX_TOKEN_LENGTH = 64
+
+# Too common to narrow a search; they are neither indexed nor searched for.
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or "
+    "that the this to was were will with".split()
+)
+
+
+def tokenize(text):
+    """
+    Splits text into normalized index terms.
+
+    Args:
+        text (str): A note title or body (may be None).
+
+    Returns:
+        Counter: {term: occurrences}, lowercased, without stopwords and very short or long words.
+    """
+    return Counter(
+        token
+        for token in TOKEN_RE.findall((text or "").casefold())
+        if MIN_TOKEN_LENGTH <= len(token) <= MAX_TOKEN_LENGTH and token not in STOPWORDS
+    )
+
+
+def query_terms(query):
+    """
+    Returns the distinct index terms of a search query, in query order.
+
+    Args:
+        query (str): The search text.
+
+    Returns:
+        list: The terms every matching note must contain.
+    """
+    return list(dict.fromkeys(tokenize(query)))
+
+
+def snippet(text, terms, width=160):
+    """
+    Returns an HTML-escaped excerpt of `text` around the first search term, with terms in <mark>.
+
+    Args:
+        text (str): The note body.
+        terms (list): Terms from `query_terms`.
+        width (int, optional): Approximate length of the excerpt in characters.
+
+    Returns:
+        str: The excerpt, with "…" where the text was cut.
+    """
+    text = text or ""
+    pattern = None
+    if terms:
+        pattern = re.compile(
+            r"\b(%s)\b" % "|".join(re.escape(term) for term in terms), re.IGNORECASE
+        )
+
+    match = pattern.search(text) if pattern else None
+    start = max(0, match.start() - width // 3) if match else 0
+    end = min(len(text), start + width)
+    if start > 0:
+        # Do not cut a word in half.
+        space = text.find(" ", start, match.start() if match else end)
+        start = space + 1 if space != -1 else start
+    excerpt = text[start:end]
+
+    parts = []
+    position = 0
+    for found in pattern.finditer(excerpt) if pattern else ():
+        parts.append(escape(excerpt[position : found.start()]))
+        parts.append(f"<mark>{escape(found.group(0))}</mark>")
+        position = found.end()
+    parts.append(escape(excerpt[position:]))
+
+    return (
+        ("…" if start > 0 else "") + "".join(parts) + ("…" if end < len(text) else "")
+    )
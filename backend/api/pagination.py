@@ -0,0 +1,174 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    CursorPagination,
+    PageNumberPagination,
+    _reverse_ordering,
+)
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination that seeks on the whole ordering tuple.
+
+    DRF's `CursorPagination` only filters on the first ordering field and falls
+    back to OFFSET inside runs of equal values, so a burst of rows sharing one
+    timestamp is skipped or repeated as rows are added. This class encodes
+    every ordering field into the cursor and filters with a row-value
+    comparison, e.g. `(date, id) < (d, i)`. The last ordering field must be
+    unique so the position identifies exactly one row.
+    """
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            field_name = order.lstrip("-")
+            if isinstance(instance, dict):
+                values.append(str(instance[field_name]))
+            else:
+                values.append(str(getattr(instance, field_name)))
+        return json.dumps(values)
+
+    def position_filter(self, position, reverse):
+        """
+        Build the `Q` object that selects the rows after `position`.
+
+        Args:
+            position (str): The JSON encoded ordering values of the cursor row.
+            reverse (bool): Whether the cursor walks backwards.
+
+        Returns:
+            Q: `(f1 > v1) OR (f1 = v1 AND f2 > v2) ...` with each comparison
+            flipped for descending fields and reversed cursors.
+
+        Raises:
+            NotFound: If the position does not match the ordering.
+        """
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = None
+        for order, value in reversed(list(zip(self.ordering, values))):
+            field_name = order.lstrip("-")
+            lookup = "lt" if order.startswith("-") != reverse else "gt"
+            step = Q(**{f"{field_name}__{lookup}": value})
+            if condition is not None:
+                step |= Q(**{field_name: value}) & condition
+            condition = step
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            queryset = queryset.filter(self.position_filter(current_position, reverse))
+
+        try:
+            results = list(queryset[offset : offset + self.page_size + 1])
+        except (ValidationError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        self.page = list(results[: self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+
+class QuestionAnswerPagination(KeysetCursorPagination):
+    """
+    Keyset pagination of Q&A threads, newest first.
+
+    Cursor pages seek on `(date, id)` instead of using OFFSET, so deep pages of
+    a busy course cost the same as the first one and new threads do not shift
+    the pages a client is reading.
+    """
+
+    ordering = ("-date", "-id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class QuestionAnswerMessagePagination(KeysetCursorPagination):
+    """Keyset pagination of the messages of one thread, oldest first."""
+
+    ordering = ("date", "id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+class TeacherStudentPagination(KeysetCursorPagination):
+    """Keyset pagination of a teacher's roster, most recent first purchase first."""
+
+    ordering = ("-first_purchase", "-user_id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+class NotificationPagination(KeysetCursorPagination):
+    """Keyset pagination of a student's or teacher's notifications, newest first."""
+
+    ordering = ("-date", "-id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class NotePagination(PageNumberPagination):
+    """Page-number pagination of note listings and ranked note search results."""
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
@@ -0,0 +1,262 @@
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+from api import models as api_models
+from userauths.models import User
+
+# Heartbeats are buffered in the cache and written to LessonPlayback by
+# `flush()`, so the database sees at most one write per (user, lecture) per
+# flush interval however often players report.
+#
+# Cache layout:
+#   playback:pos:<user>:<item>   (position, reported_at) of the newest heartbeat
+#   playback:dirty:<user>:<item> set while the pair is waiting in the log
+#   playback:seq                 sequence number of the last log entry
+#   playback:log:<seq>           (user, item) pair that became dirty
+#   playback:cursor              last log entry written to the database
+#   playback:gap                 log entry found missing by the previous flush
+#
+# A pair is appended to the log only when it becomes dirty, so the log grows
+# with the number of active viewers, not with the heartbeat rate. The cursor
+# only advances after the batch is committed, so a flush that crashes is
+# replayed, and the upsert keeps whichever write has the newer `reported_at`.
+#
+# The buffer only works in a cache shared by the web workers and the flusher.
+# With a per-process cache (LocMemCache, DummyCache) heartbeats are written
+# straight to the database instead, and `flush()` refuses to run.
+
+POSITION_KEY = "playback:pos:{}:{}"
+DIRTY_KEY = "playback:dirty:{}:{}"
+SEQ_KEY = "playback:seq"
+LOG_KEY = "playback:log:{}"
+CURSOR_KEY = "playback:cursor"
+GAP_KEY = "playback:gap"
+PER_PROCESS_BACKENDS = (
+    "django.core.cache.backends.dummy.DummyCache",
+    "django.core.cache.backends.locmem.LocMemCache",
+)
+
+
+def get_cache():
+    return caches[settings.PLAYBACK_CACHE]
+
+
+def is_shared_cache():
+    """
+    Tells whether `PLAYBACK_CACHE` is visible to every process.
+
+    Returns:
+        bool: False for the per-process LocMemCache and DummyCache backends.
+    """
+    return (
+        settings.CACHES[settings.PLAYBACK_CACHE]["BACKEND"] not in PER_PROCESS_BACKENDS
+    )
+
+
+def record_heartbeat(user_id, variant_item_id, position, reported_at=None):
+    """
+    Buffers a playback position report in the cache.
+
+    Reading and replacing the buffered report is not atomic: two reports for
+    the same lecture arriving at the same instant are last-writer-wins in the
+    buffer. A player reports one heartbeat at a time, so this can only swap a
+    retried report with its successor, never lose a lecture's position.
+
+    Without a shared cache (see `is_shared_cache`) the report is written
+    straight to LessonPlayback instead.
+
+    Args:
+        user_id (int): The viewer.
+        variant_item_id (int): Primary key of the lecture being watched.
+        position (float): Playback position in seconds.
+        reported_at (float, optional): Unix time of the report; defaults to now.
+            Reports older than the buffered one are ignored.
+
+    Returns:
+        bool: False if a newer report was already buffered or stored.
+    """
+    reported_at = time.time() if reported_at is None else reported_at
+    if not is_shared_cache():
+        return bool(
+            upsert_positions({(user_id, variant_item_id): (position, reported_at)})
+        )
+
+    cache = get_cache()
+    key = POSITION_KEY.format(user_id, variant_item_id)
+    buffered = cache.get(key)
+    if buffered and buffered[1] > reported_at:
+        return False
+
+    timeout = settings.PLAYBACK_BUFFER_TIMEOUT
+    cache.set(key, (position, reported_at), timeout)
+    if cache.add(DIRTY_KEY.format(user_id, variant_item_id), 1, timeout):
+        cache.add(SEQ_KEY, 0, None)
+        seq = cache.incr(SEQ_KEY)
+        cache.set(LOG_KEY.format(seq), (user_id, variant_item_id), timeout)
+
+    return True
+
+
+def buffered_position(user_id, variant_item_id):
+    """
+    Returns the latest known position, from the buffer or the database.
+
+    Args:
+        user_id (int): The viewer.
+        variant_item_id (int): Primary key of the lecture.
+
+    Returns:
+        float: Position in seconds, or None if the lecture was never played.
+    """
+    buffered = get_cache().get(POSITION_KEY.format(user_id, variant_item_id))
+    if buffered:
+        return buffered[0]
+
+    return (
+        api_models.LessonPlayback.objects.filter(
+            user_id=user_id, variant_item_id=variant_item_id
+        )
+        .values_list("position", flat=True)
+        .first()
+    )
+
+
+def upsert_positions(positions):
+    """
+    Writes positions to LessonPlayback, keeping the newest report per pair.
+
+    Rows are locked and compared in one transaction, so concurrent or replayed
+    flushes never move a position back to an older report.
+
+    Args:
+        positions (dict): {(user_id, variant_item_id): (position, reported_at)}.
+
+    Returns:
+        int: The number of rows created or updated.
+    """
+    if not positions:
+        return 0
+
+    # Reports for deleted users or lectures would fail the whole batch.
+    user_ids = set(
+        User.objects.filter(pk__in={user_id for user_id, _ in positions}).values_list(
+            "pk", flat=True
+        )
+    )
+    variant_item_ids = set(
+        api_models.VariantItem.objects.filter(
+            pk__in={item_id for _, item_id in positions}
+        ).values_list("pk", flat=True)
+    )
+    positions = {
+        pair: value
+        for pair, value in positions.items()
+        if pair[0] in user_ids and pair[1] in variant_item_ids
+    }
+
+    with transaction.atomic():
+        existing = {
+            (row.user_id, row.variant_item_id): row
+            for row in api_models.LessonPlayback.objects.select_for_update().filter(
+                user_id__in={user_id for user_id, _ in positions},
+                variant_item_id__in={item_id for _, item_id in positions},
+            )
+        }
+        created, updated = [], []
+        for (user_id, variant_item_id), (position, reported_at) in positions.items():
+            reported_at = datetime.fromtimestamp(reported_at, dt_timezone.utc)
+            row = existing.get((user_id, variant_item_id))
+            if row is None:
+                created.append(
+                    api_models.LessonPlayback(
+                        user_id=user_id,
+                        variant_item_id=variant_item_id,
+                        position=position,
+                        reported_at=reported_at,
+                    )
+                )
+            elif row.reported_at < reported_at:
+                row.position = position
+                row.reported_at = reported_at
+                updated.append(row)
+
+        # A row created by a concurrent flush is left to its newer report.
+        api_models.LessonPlayback.objects.bulk_create(created, ignore_conflicts=True)
+        api_models.LessonPlayback.objects.bulk_update(
+            updated, ["position", "reported_at"]
+        )
+
+    return len(created) + len(updated)
+
+
+def flush(batch_size=None):
+    """
+    Writes buffered heartbeats to the database in batched upserts.
+
+    Log entries are read from the cursor onwards. An entry that is missing
+    (its heartbeat incremented the sequence but has not stored the entry yet)
+    stops the flush, unless the previous flush already stopped at it, in which
+    case the writer is assumed to have died and the entry is skipped.
+
+    Args:
+        batch_size (int, optional): Log entries per upsert (default: `PLAYBACK_FLUSH_BATCH_SIZE`).
+
+    Returns:
+        int: The number of LessonPlayback rows written.
+
+    Raises:
+        ImproperlyConfigured: If `PLAYBACK_CACHE` is a per-process cache, which
+            holds none of the heartbeats buffered by the web workers.
+    """
+    if not is_shared_cache():
+        raise ImproperlyConfigured(
+            f"PLAYBACK_CACHE {settings.PLAYBACK_CACHE!r} is a per-process cache; "
+            "heartbeats are written to the database directly and there is nothing to flush."
+        )
+
+    cache = get_cache()
+    batch_size = batch_size or settings.PLAYBACK_FLUSH_BATCH_SIZE
+    cursor = cache.get(CURSOR_KEY, 0)
+    last = cache.get(SEQ_KEY, 0)
+    written = 0
+
+    while cursor < last:
+        seqs = range(cursor + 1, min(cursor + batch_size, last) + 1)
+        entries = cache.get_many([LOG_KEY.format(seq) for seq in seqs])
+
+        pairs = []
+        stopped = False
+        for seq in seqs:
+            pair = entries.get(LOG_KEY.format(seq))
+            if pair is None:
+                if cache.get(GAP_KEY) != seq:
+                    cache.set(GAP_KEY, seq, None)
+                    stopped = True
+                    break
+                continue
+            pairs.append(pair)
+        end = seq - 1 if stopped else seq
+
+        # Clear the dirty flags first: a heartbeat arriving after this point
+        # logs its pair again and is picked up by the next flush.
+        cache.delete_many([DIRTY_KEY.format(*pair) for pair in pairs])
+        buffered = cache.get_many([POSITION_KEY.format(*pair) for pair in pairs])
+        positions = {}
+        for pair in pairs:
+            value = buffered.get(POSITION_KEY.format(*pair))
+            if value:
+                positions[tuple(pair)] = value
+
+        written += upsert_positions(positions)
+        cache.set(CURSOR_KEY, end, None)
+        cache.delete_many([LOG_KEY.format(seq) for seq in range(cursor + 1, end + 1)])
+        cursor = end
+        if stopped:
+            break
+
+    return written
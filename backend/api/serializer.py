@@ -1,11 +1,40 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
+from django.core.files.storage import default_storage
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 from api import models as api_models
+from api import uploads
+from api.notes import snippet
 from userauths.models import Profile, User
 
 
+class ImageSrcsetField(serializers.ReadOnlyField):
+    """
+    Renders an `image_derivatives` map as `srcset` strings per format.
+
+    Args:
+        serializers (type): The base ReadOnlyField class.
+
+    Returns:
+        dict: e.g. {"webp": "http://.../160.webp 160w, http://.../320.webp 320w", "jpeg": "..."}.
+    """
+
+    def to_representation(self, value):
+        request = self.context.get("request")
+        srcset = {}
+        for fmt, widths in (value or {}).items():
+            entries = []
+            for width, name in sorted(widths.items(), key=lambda entry: int(entry[0])):
+                url = default_storage.url(name)
+                if request:
+                    url = request.build_absolute_uri(url)
+                entries.append(f"{url} {width}w")
+            srcset[fmt] = ", ".join(entries)
+
+        return srcset
+
+
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
     """
     Custom TokenObtainPairSerializer with additional user information.
@@ -60,7 +89,7 @@ class RegisterSerializer(serializers.ModelSerializer):
         return attr
 
     def create(self, validated_data):
-        user = User.objects.create(
+        user = User(
             full_name=validated_data["full_name"],
             email=validated_data["email"],
         )
@@ -94,6 +123,8 @@ class ProfileSerializer(serializers.ModelSerializer):
         serializers (type): The serializer class for the Profile model.
     """
 
+    image_srcset = ImageSrcsetField(source="image_derivatives")
+
     class Meta:
         model = Profile
         fields = "__all__"
@@ -107,8 +138,10 @@ class CategorySerializer(serializers.ModelSerializer):
         serializers (type): The serializer class for the Category model.
     """
 
+    image_srcset = ImageSrcsetField(source="image_derivatives")
+
     class Meta:
-        fields = ["id", "title", "image", "slug", "course_count"]
+        fields = ["id", "title", "image", "image_srcset", "slug", "course_count"]
         model = api_models.Category
 
 
@@ -120,10 +153,13 @@ class TeacherSerializer(serializers.ModelSerializer):
         serializers (type): The serializer class for the Teacher model.
     """
 
+    image_srcset = ImageSrcsetField(source="image_derivatives")
+
     class Meta:
         fields = [
             "user",
             "image",
+            "image_srcset",
             "full_name",
             "bio",
             "about",
@@ -134,7 +170,6 @@ class TeacherSerializer(serializers.ModelSerializer):
             "linkedin",
             "courses",
             "review",
-            "students",
         ]
         model = api_models.Teacher
 
@@ -215,6 +250,143 @@ class QuestionAnswerSerializer(serializers.ModelSerializer):
         model = api_models.QuestionAnswer
 
 
+class BatchedProfileField(serializers.ReadOnlyField):
+    """
+    Renders the author's profile from the `profiles` map in the serializer context.
+
+    The view loads the profiles of a whole page with one `IN` query (see
+    `api.views.profiles_for`) instead of one `Profile.objects.get()` per row.
+
+    Args:
+        serializers (type): The base ReadOnlyField class.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("source", "user_id")
+        super().__init__(**kwargs)
+
+    def to_representation(self, user_id):
+        profile = self.context["profiles"].get(user_id)
+        if profile is None:
+            return None
+
+        return ProfileSerializer(profile, context=self.context).data
+
+
+class TeacherStudentSerializer(serializers.ModelSerializer):
+    """
+    Serializes one student of a teacher's roster.
+
+    Profiles and enrolled courses come from the `profiles` and `enrollments`
+    maps `TeacherStudentListAPIView` loads for the whole page.
+
+    Args:
+        serializers (type): The serializer class for the TeacherStudent model.
+    """
+
+    full_name = serializers.CharField(source="user.full_name", read_only=True)
+    profile = BatchedProfileField()
+    courses = serializers.SerializerMethodField()
+
+    class Meta:
+        fields = [
+            "user_id",
+            "full_name",
+            "profile",
+            "first_purchase",
+            "course_count",
+            "courses",
+        ]
+        model = api_models.TeacherStudent
+
+    def get_courses(self, student):
+        return self.context["enrollments"].get(student.user_id, [])
+
+
+class QuestionAnswerThreadSerializer(serializers.ModelSerializer):
+    """
+    Serializes a Q&A thread for the paginated thread list.
+
+    `message_count` and `last_activity` are annotated by `QuestionAnswerListAPIView`.
+
+    Args:
+        serializers (type): The serializer class for the QuestionAnswer model.
+    """
+
+    profile = BatchedProfileField()
+    message_count = serializers.IntegerField(read_only=True)
+    last_activity = serializers.DateTimeField(read_only=True)
+
+    class Meta:
+        fields = [
+            "question_answer_id",
+            "title",
+            "user",
+            "profile",
+            "date",
+            "message_count",
+            "last_activity",
+        ]
+        model = api_models.QuestionAnswer
+
+
+class QuestionAnswerThreadMessageSerializer(serializers.ModelSerializer):
+    """
+    Serializes a message for the paginated message list of a thread.
+
+    Args:
+        serializers (type): The serializer class for the QuestionAnswerMessage model.
+    """
+
+    profile = BatchedProfileField()
+
+    class Meta:
+        fields = ["question_answer_message_id", "message", "user", "profile", "date"]
+        model = api_models.QuestionAnswerMessage
+
+
+class CourseQASummarySerializer(serializers.ModelSerializer):
+    """
+    Serializes the CourseQASummary model.
+
+    Args:
+        serializers (type): The serializer class for the CourseQASummary model.
+    """
+
+    class Meta:
+        fields = ["question_count", "message_count", "last_activity"]
+        model = api_models.CourseQASummary
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """
+    Serializes the UploadSession model with the chunk layout and missing chunk ranges.
+
+    Args:
+        serializers (type): The serializer class for the UploadSession model.
+    """
+
+    chunk_count = serializers.IntegerField(read_only=True)
+    missing = serializers.SerializerMethodField()
+
+    class Meta:
+        fields = [
+            "upload_id",
+            "filename",
+            "size",
+            "chunk_size",
+            "chunk_count",
+            "missing",
+            "status",
+            "file",
+            "content_hash",
+        ]
+        model = api_models.UploadSession
+
+    def get_missing(self, session):
+        return uploads.missing_chunks(session) if session.status == "Uploading" else []
+
+
 class CartSerializer(serializers.ModelSerializer):
     """
     Serializes the Cart model.
@@ -293,6 +465,62 @@ class CertificateSerializer(serializers.ModelSerializer):
         model = api_models.Certificate
 
 
+class CertificateVerifySerializer(serializers.Serializer):
+    """
+    Serializes the cached certificate lookup of `CertificateVerifyAPIView`.
+
+    `image` and `pdf` hold storage names and are returned as URLs.
+    """
+
+    certificate_id = serializers.CharField()
+    student = serializers.CharField()
+    course = serializers.CharField()
+    course_id = serializers.CharField()
+    teacher = serializers.CharField()
+    date = serializers.DateTimeField()
+    image = serializers.SerializerMethodField()
+    pdf = serializers.SerializerMethodField()
+
+    def get_image(self, data):
+        return default_storage.url(data["image"]) if data["image"] else None
+
+    def get_pdf(self, data):
+        return default_storage.url(data["pdf"]) if data["pdf"] else None
+
+
+class ReviewModerationSerializer(serializers.Serializer):
+    """
+    Validates a bulk moderation request of `ReviewModerateAPIView`.
+
+    `reply` is required when the action is "reply" and optional otherwise.
+    """
+
+    review_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=5000
+    )
+    action = serializers.ChoiceField(choices=["approve", "reject", "reply"])
+    reply = serializers.CharField(required=False)
+
+    def validate(self, attrs):
+        if attrs["action"] == "reply" and "reply" not in attrs:
+            raise serializers.ValidationError(
+                {"reply": "A reply is required to reply to reviews."}
+            )
+
+        return attrs
+
+
+class TeacherStatsPeriodSerializer(serializers.Serializer):
+    """
+    Serializes one day or month of `TeacherStatsAPIView`.
+    """
+
+    period = serializers.DateField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    sales = serializers.IntegerField()
+    students = serializers.IntegerField()
+
+
 class CompletedLessonSerializer(serializers.ModelSerializer):
     """
     Serializes the CompletedLesson model.
@@ -327,6 +555,27 @@ class NoteSerializer(serializers.ModelSerializer):
         model = api_models.Note
 
 
+class NoteSearchSerializer(serializers.ModelSerializer):
+    """
+    Serializes a note for listings and search results, with an excerpt instead of the full text.
+
+    The excerpt highlights the search terms passed as `terms` in the serializer context.
+
+    Args:
+        serializers (type): The serializer class for the Note model.
+    """
+
+    course_id = serializers.ReadOnlyField(source="course.course_id")
+    snippet = serializers.SerializerMethodField()
+
+    class Meta:
+        fields = ["note_id", "title", "course_id", "date", "snippet"]
+        model = api_models.Note
+
+    def get_snippet(self, note):
+        return snippet(note.note, self.context.get("terms", []))
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     """
     Serializes the Review model.
@@ -410,6 +659,19 @@ class CountrySerializer(serializers.ModelSerializer):
         model = api_models.Country
 
 
+class LessonPlaybackSerializer(serializers.ModelSerializer):
+    """
+    Serializes the LessonPlayback model.
+
+    Args:
+        serializers (type): The serializer class for the LessonPlayback model.
+    """
+
+    class Meta:
+        fields = ["user", "variant_item", "position", "reported_at"]
+        model = api_models.LessonPlayback
+
+
 class EnrolledCourseSerializer(serializers.ModelSerializer):
     """
     Serializes the EnrolledCourse model.
@@ -421,8 +683,6 @@ class EnrolledCourseSerializer(serializers.ModelSerializer):
     lectures = VariantItemSerializer(many=True, read_only=True)
     completed_lesson = CompletedLessonSerializer(many=True, read_only=True)
     curriculum = VariantSerializer(many=True, read_only=True)
-    note = NoteSerializer(many=True, read_only=True)
-    question_answer = QuestionAnswerSerializer(many=True, read_only=True)
     review = ReviewSerializer(many=False, read_only=True)
 
     class Meta:
@@ -438,6 +698,181 @@ class EnrolledCourseSerializer(serializers.ModelSerializer):
             self.Meta.depth = 3
 
 
+class EnrollmentProgressSerializer(serializers.ModelSerializer):
+    """
+    Serializes the EnrollmentProgress model with the course it tracks.
+
+    Expects `enrolled_course__course` to be selected with the progress rows.
+
+    Args:
+        serializers (type): The serializer class for the EnrollmentProgress model.
+    """
+
+    enrollment_id = serializers.ReadOnlyField(source="enrolled_course.enrollment_id")
+    course_id = serializers.ReadOnlyField(source="enrolled_course.course.course_id")
+    title = serializers.ReadOnlyField(source="enrolled_course.course.title")
+    slug = serializers.ReadOnlyField(source="enrolled_course.course.slug")
+    lecture_count = serializers.ReadOnlyField(
+        source="enrolled_course.course.lecture_count"
+    )
+    percent = serializers.ReadOnlyField()
+
+    class Meta:
+        fields = [
+            "enrollment_id",
+            "course_id",
+            "title",
+            "slug",
+            "completed_lessons",
+            "lecture_count",
+            "percent",
+            "updated",
+        ]
+        model = api_models.EnrollmentProgress
+
+
+class DashboardCourseSerializer(serializers.ModelSerializer):
+    """
+    Serializes the course summary shown on a student's dashboard.
+
+    Args:
+        serializers (type): The serializer class for the Course model.
+    """
+
+    image_srcset = ImageSrcsetField(source="image_derivatives")
+    teacher = serializers.ReadOnlyField(source="teacher.full_name")
+
+    class Meta:
+        fields = [
+            "id",
+            "course_id",
+            "title",
+            "slug",
+            "image",
+            "image_srcset",
+            "teacher",
+            "level",
+            "duration_seconds",
+            "lecture_count",
+        ]
+        model = api_models.Course
+
+
+class StudentDashboardSerializer(serializers.ModelSerializer):
+    """
+    Serializes one enrollment for the student dashboard.
+
+    Reads only what `StudentDashboardAPIView` loads up front: the course and
+    teacher, the progress row, and the `last_viewed` and `student_review`
+    attributes it attaches to each enrollment.
+
+    Args:
+        serializers (type): The serializer class for the EnrolledCourse model.
+    """
+
+    course = DashboardCourseSerializer(read_only=True)
+    progress = serializers.SerializerMethodField()
+    last_viewed = serializers.SerializerMethodField()
+    review = serializers.SerializerMethodField()
+
+    class Meta:
+        fields = [
+            "enrollment_id",
+            "date",
+            "course",
+            "progress",
+            "last_viewed",
+            "review",
+        ]
+        model = api_models.EnrolledCourse
+
+    def get_progress(self, enrollment):
+        progress = getattr(enrollment, "progress", None)
+        if progress is None:
+            return {"completed_lessons": 0, "percent": 0}
+
+        return {
+            "completed_lessons": progress.completed_lessons,
+            "percent": progress.percent(),
+        }
+
+    def get_last_viewed(self, enrollment):
+        playback = enrollment.last_viewed
+        if playback is None:
+            return None
+
+        return {
+            "variant_item_id": playback.variant_item.variant_item_id,
+            "title": playback.variant_item.title,
+            "position": playback.position,
+            "reported_at": playback.reported_at,
+        }
+
+    def get_review(self, enrollment):
+        review = enrollment.student_review
+        if review is None:
+            return None
+
+        return {"rating": review.rating, "active": review.active}
+
+
+class CurriculumItemSerializer(serializers.ModelSerializer):
+    """
+    Serializes a lecture in a student's lazily loaded course curriculum.
+
+    `completed` and `position` come from the per-user lookups passed in the
+    serializer context by `StudentCurriculumAPIView`.
+
+    Args:
+        serializers (type): The serializer class for the VariantItem model.
+    """
+
+    completed = serializers.SerializerMethodField()
+    position = serializers.SerializerMethodField()
+
+    class Meta:
+        fields = [
+            "id",
+            "variant_item_id",
+            "title",
+            "content_duration",
+            "preview",
+            "file",
+            "hls_manifest",
+            "poster",
+            "completed",
+            "position",
+        ]
+        model = api_models.VariantItem
+
+    def get_completed(self, item):
+        return item.pk in self.context["completed"]
+
+    def get_position(self, item):
+        return self.context["positions"].get(item.pk)
+
+
+class CurriculumSectionSerializer(serializers.ModelSerializer):
+    """
+    Serializes a curriculum section (Variant) with its lectures.
+
+    Args:
+        serializers (type): The serializer class for the Variant model.
+    """
+
+    items = CurriculumItemSerializer(source="variant_items", many=True, read_only=True)
+
+    class Meta:
+        fields = [
+            "variant_id",
+            "title",
+            "duration_seconds",
+            "lecture_count",
+            "items",
+        ]
+        model = api_models.Variant
+
+
 class CourseSerializer(serializers.ModelSerializer):
     """
     Serializes the Course model.
@@ -462,6 +897,7 @@ class CourseSerializer(serializers.ModelSerializer):
         read_only=True,
     )
     reviews = ReviewSerializer(many=True, read_only=True, required=False)
+    image_srcset = ImageSrcsetField(source="image_derivatives")
 
     class Meta:
         fields = [
@@ -470,6 +906,7 @@ class CourseSerializer(serializers.ModelSerializer):
             "teacher",
             "file",
             "image",
+            "image_srcset",
             "title",
             "description",
             "price",
@@ -481,6 +918,8 @@ class CourseSerializer(serializers.ModelSerializer):
             "course_id",
             "slug",
             "date",
+            "duration_seconds",
+            "lecture_count",
             "students",
             "curriculum",
             "lectures",
@@ -0,0 +1,172 @@
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from core import jobs
+from api import models as api_models
+from api.certificates import certificate_names, render
+from api.images import ImageDerivativeError, generate_derivatives
+from api.media import format_duration, hash_file, local_copy, probe
+from api.transcode import NotAVideoError, package
+
+
+@jobs.register("probe_media")
+def probe_variant_item(variant_item_id):
+    """
+    Probes a lecture video, caches its metadata and stores the duration on the VariantItem.
+
+    The course and variant duration totals are refreshed afterwards.
+
+    Content already probed for another lecture (e.g. a file shared by several
+    lectures of a curriculum import) reuses its `MediaMetadata`.
+
+    The row is only updated if it still points at the probed file, so a probe
+    that finishes after the file was replaced cannot overwrite newer values.
+
+    Args:
+        variant_item_id (int): Primary key of the VariantItem to probe.
+    """
+    variant_item = (
+        api_models.VariantItem.objects.filter(pk=variant_item_id)
+        .only("file", "content_hash", "variant")
+        .first()
+    )
+    if variant_item is None or not variant_item.file:
+        return
+
+    content_hash = variant_item.content_hash
+    if not content_hash:
+        with variant_item.file.open("rb") as stored_file:
+            content_hash = hash_file(stored_file)
+
+    metadata = api_models.MediaMetadata.objects.filter(
+        content_hash=content_hash
+    ).first()
+    if metadata is not None:
+        info = {"duration": metadata.duration}
+    else:
+        with local_copy(variant_item.file.storage, variant_item.file.name) as path:
+            info = probe(path)
+
+        api_models.MediaMetadata.objects.update_or_create(
+            content_hash=content_hash,
+            defaults={"file": variant_item.file.name, **info},
+        )
+    updated = api_models.VariantItem.objects.filter(
+        pk=variant_item_id, file=variant_item.file.name
+    ).update(
+        content_hash=content_hash,
+        duration=timedelta(seconds=info["duration"]),
+        content_duration=format_duration(info["duration"]),
+    )
+    if updated:
+        api_models.refresh_variant_totals([variant_item.variant_id])
+
+
+@jobs.register("image_derivatives")
+def build_image_derivatives(model, pk):
+    """
+    Generates the resized copies of a model's `image` and stores their names.
+
+    Files that are missing or are not images get an empty map instead of failing
+    the job, since every retry would fail the same way.
+
+    Args:
+        model (str): The model label, e.g. "api.Course".
+        pk (int): Primary key of the row.
+    """
+    model_class = apps.get_model(model)
+    instance = model_class.objects.filter(pk=pk).only("image").first()
+    if instance is None or not instance.image:
+        return
+
+    try:
+        derivatives = generate_derivatives(instance.image)
+    except ImageDerivativeError:
+        derivatives = {}
+
+    model_class.objects.filter(pk=pk, image=instance.image.name).update(
+        image_derivatives=derivatives
+    )
+
+
+@jobs.register("package_hls")
+def package_variant_item(variant_item_id):
+    """
+    Builds the HLS rendition ladder and poster of a lecture and stores their names on it.
+
+    Files without a video stream (slides, PDFs) are skipped; as with probing, the
+    row is only updated if it still points at the packaged file.
+
+    Args:
+        variant_item_id (int): Primary key of the VariantItem to package.
+    """
+    variant_item = (
+        api_models.VariantItem.objects.filter(pk=variant_item_id)
+        .only("file", "content_hash")
+        .first()
+    )
+    if variant_item is None or not variant_item.file:
+        return
+
+    content_hash = variant_item.content_hash
+    if not content_hash:
+        with variant_item.file.open("rb") as stored_file:
+            content_hash = hash_file(stored_file)
+
+    try:
+        names = package(variant_item.file, content_hash)
+    except NotAVideoError:
+        return
+
+    api_models.VariantItem.objects.filter(
+        pk=variant_item_id, file=variant_item.file.name
+    ).update(hls_manifest=names["manifest"], poster=names["poster"])
+
+
+@jobs.register("render_certificate")
+def render_certificate(certificate_id):
+    """
+    Draws a certificate's PNG and PDF and stores their names on the row.
+
+    Files are named after the public certificate id, so a retried job (or a
+    second job for the same certificate) reuses stored renders instead of
+    drawing them again.
+
+    Args:
+        certificate_id (int): Primary key of the Certificate.
+    """
+    certificate = (
+        api_models.Certificate.objects.filter(pk=certificate_id)
+        .select_related("course__teacher", "user")
+        .first()
+    )
+    if certificate is None or certificate.user is None:
+        return
+
+    names = certificate_names(certificate.certificate_id)
+    if not all(default_storage.exists(name) for name in names.values()):
+        teacher = certificate.course.teacher
+        png, pdf = render(
+            student=certificate.user.full_name,
+            course=certificate.course.title,
+            teacher=teacher.full_name if teacher else "",
+            date=certificate.date,
+            certificate_id=certificate.certificate_id,
+            verify_url=settings.CERTIFICATE_VERIFY_URL.format(
+                certificate_id=certificate.certificate_id
+            ),
+        )
+        for name, content in ((names["image"], png), (names["pdf"], pdf)):
+            default_storage.delete(name)
+            default_storage.save(name, ContentFile(content))
+
+    api_models.Certificate.objects.filter(pk=certificate_id).update(
+        image=names["image"], pdf=names["pdf"]
+    )
+    # `update()` skips the signal that drops the cached verification.
+    cache.delete(api_models.certificate_cache_key(certificate.certificate_id))
@@ -1,6 +1,47 @@
-from django.test import TestCase
-
-from api import models
+import base64
+import hashlib
+import json
+import os
+import shutil
+import struct
+import tempfile
+import time
+import zipfile
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core import mail
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import StopFutureHandlers
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from api import certificates, models, playback
+from api.checks import check_playback_cache, check_playback_cache_is_shared
+from api.emails import send_course_announcement
+from api.media import MediaProbeError, probe_mp4, probe_webm
+from api.serializer import (
+    CourseSerializer,
+    EnrolledCourseSerializer,
+    TeacherSerializer,
+    VariantItemSerializer,
+)
+from api.transcode import run_ffmpeg
+from api.uploadhandlers import HashingMemoryFileUploadHandler
+from core import jobs
+from core.models import Job
 from userauths.models import User, Profile
 
 
@@ -466,3 +507,2022 @@ class ApiModelTest(TestCase):
         country = models.Country(name="UK", tax_rate=10, active=True)
 
         assert isinstance(country, models.Country)
+
+
+class AuthViewQueryCountTest(TestCase):
+    """Query budget tests for the registration and password change endpoints."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_register_creates_user_and_profile_in_minimum_queries(self):
+        """Test registering runs the uniqueness checks plus one insert each for User and Profile."""
+        with self.assertNumQueries(4):
+            response = self.client.post(
+                "/api/v1/user/register/",
+                {
+                    "full_name": "Jane Smith",
+                    "email": "jane@example.com",
+                    "password": "Sup3r-Secret-pw",
+                    "password_matched": "Sup3r-Secret-pw",
+                },
+            )
+
+        assert response.status_code == 201
+        user = User.objects.get(email="jane@example.com")
+        assert user.username == "jane"
+        assert user.check_password("Sup3r-Secret-pw")
+        assert Profile.objects.get(user=user).full_name == "jane"
+
+    def test_password_change_does_not_save_profile(self):
+        """Test changing a password only reads and updates the user row."""
+        user = User.objects.create(email="test@example.com", username="test", otp="123")
+
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                "/api/v1/user/password-change/",
+                {"otp": "123", "uuidb64": user.pk, "password": "An0ther-Secret"},
+            )
+
+        assert response.status_code == 201
+        user.refresh_from_db()
+        assert user.check_password("An0ther-Secret")
+        assert user.otp == ""
+
+    def test_login_upgrades_legacy_password_hash(self):
+        """Test a successful login re-hashes a PBKDF2 password with the preferred hasher."""
+        user = User.objects.create(
+            email="test@example.com",
+            username="test",
+            password=make_password("Sup3r-Secret-pw", hasher="pbkdf2_sha256"),
+        )
+
+        response = self.client.post(
+            "/api/v1/user/token/",
+            {"email": "test@example.com", "password": "Sup3r-Secret-pw"},
+        )
+
+        assert response.status_code == 200
+        user.refresh_from_db()
+        assert user.password.startswith("scrypt$")
+        assert user.check_password("Sup3r-Secret-pw")
+
+
+class CourseAnnouncementTest(TestCase):
+    """Test cases for batched course announcement emails."""
+
+    def test_announcement_is_sent_in_batches_with_recipient_variables(self):
+        """Test every enrolled student gets the announcement through batch-send messages."""
+        teacher_user = User.objects.create(
+            email="teacher@example.com", username="teacher"
+        )
+        teacher = models.Teacher.objects.create(
+            user=teacher_user, full_name="Jane Smith"
+        )
+        course = models.Course.objects.create(
+            teacher=teacher, title="Python Programming"
+        )
+        order = models.CartOrder.objects.create(student=teacher_user)
+        order_item = models.CartOrderItem.objects.create(
+            order=order, course=course, teacher=teacher
+        )
+        for index in range(3):
+            student = User.objects.create(
+                email=f"student{index}@example.com", username=f"student{index}"
+            )
+            models.EnrolledCourse.objects.create(
+                course=course, user=student, teacher=teacher, order_item=order_item
+            )
+
+        sent = send_course_announcement(course, "Course Published", batch_size=2)
+
+        assert sent == 3
+        assert len(mail.outbox) == 2
+        assert mail.outbox[0].to == ["student0@example.com", "student1@example.com"]
+        assert mail.outbox[1].merge_data == {
+            "student2@example.com": {"username": "student2"}
+        }
+        html_body, _ = mail.outbox[0].alternatives[0]
+        assert "%recipient.username%" in html_body
+        assert "Python Programming" in html_body
+
+
+def build_mp4(duration, timescale=1000, mdat_size=64):
+    """Builds a minimal MP4 with the moov box after mdat, as non-faststart files have it."""
+    mvhd = struct.pack(
+        ">I4sB3xIIII", 108, b"mvhd", 0, 0, 0, timescale, int(duration * timescale)
+    ) + bytes(80)
+    moov = struct.pack(">I4s", 8 + len(mvhd), b"moov") + mvhd
+    ftyp = struct.pack(">I4s4sI", 16, b"ftyp", b"isom", 512)
+    mdat = struct.pack(">I4s", 8 + mdat_size, b"mdat") + bytes(mdat_size)
+
+    return ftyp + mdat + moov
+
+
+def build_webm(duration_ms, unknown_size=()):
+    """Builds a minimal WebM with a Segment Info element followed by a Cluster; ids in `unknown_size` get the EBML unknown size."""
+
+    def element(element_id, payload):
+        if element_id in unknown_size:
+            return element_id + b"\x01" + b"\xff" * 7 + payload
+        return element_id + b"\x01" + len(payload).to_bytes(7, "big") + payload
+
+    header = element(b"\x1a\x45\xdf\xa3", element(b"\x42\x82", b"webm"))
+    info = element(
+        b"\x15\x49\xa9\x66",
+        element(b"\x2a\xd7\xb1", (1000000).to_bytes(3, "big"))
+        + element(b"\x44\x89", struct.pack(">d", duration_ms)),
+    )
+    cluster = element(b"\x1f\x43\xb6\x75", bytes(16))
+
+    return header + element(b"\x18\x53\x80\x67", info + cluster)
+
+
+class MediaProbeTest(TestCase):
+    """Test cases for container probing and the background probe job."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.settings_override = override_settings(MEDIA_ROOT=media_root)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        user = User.objects.create(email="test@example.com", username="test")
+        teacher = models.Teacher.objects.create(user=user, full_name="Jane Smith")
+        course = models.Course.objects.create(teacher=teacher, title="Python")
+        self.variant = models.Variant.objects.create(course=course, title="Intro")
+
+    def test_probe_reads_duration_from_container_headers(self):
+        """Test MP4 and WebM durations are read from their headers."""
+        assert probe_mp4(BytesIO(build_mp4(125.5)))["duration"] == 125.5
+        assert probe_webm(BytesIO(build_webm(12500.0)))["duration"] == 12.5
+
+    def test_webm_elements_of_unknown_size(self):
+        """Test unknown-size elements end with their parent or fail the header probe cleanly."""
+        info, segment = b"\x15\x49\xa9\x66", b"\x18\x53\x80\x67"
+        webm = build_webm(12500.0, unknown_size=[info])
+        assert probe_webm(BytesIO(webm))["duration"] == 12.5
+
+        webm = build_webm(12500.0, unknown_size=[info, segment])
+        with self.assertRaises(MediaProbeError):
+            probe_webm(BytesIO(webm))
+
+    def test_upload_queues_probe_and_worker_fills_duration(self):
+        """Test saving a lecture file queues a probe job that the worker completes."""
+        variant_item = models.VariantItem.objects.create(
+            variant=self.variant,
+            title="Lecture",
+            file=SimpleUploadedFile("lecture.mp4", build_mp4(330)),
+        )
+
+        assert variant_item.content_duration is None
+        assert Job.objects.filter(kind="probe_media", status="Pending").count() == 1
+
+        assert jobs.run_pending(kinds=["probe_media"]) == 1
+
+        variant_item.refresh_from_db()
+        assert variant_item.duration == timedelta(seconds=330)
+        assert variant_item.content_duration == "5m 30s"
+
+    def test_resaving_without_file_change_does_not_probe(self):
+        """Test editing a lecture title neither queues a job nor touches the file."""
+        variant_item = models.VariantItem.objects.create(
+            variant=self.variant,
+            title="Lecture",
+            file=SimpleUploadedFile("lecture.mp4", build_mp4(60)),
+        )
+        jobs.run_pending()
+        variant_item = models.VariantItem.objects.get(pk=variant_item.pk)
+
+        variant_item.title = "Renamed"
+        with self.assertNumQueries(1):
+            variant_item.save()
+
+        assert not Job.objects.filter(status="Pending").exists()
+
+    def test_saving_with_deferred_file_keeps_media_fields(self):
+        """Test a lecture loaded without its file is not treated as having a new one."""
+        variant_item = models.VariantItem.objects.create(
+            variant=self.variant,
+            title="Lecture",
+            file=SimpleUploadedFile("lecture.mp4", build_mp4(60)),
+        )
+        jobs.run_pending(kinds=["probe_media"])
+        Job.objects.all().delete()
+        models.VariantItem.objects.filter(pk=variant_item.pk).update(
+            hls_manifest="hls/master.m3u8", poster="hls/poster.jpg"
+        )
+
+        deferred = models.VariantItem.objects.only("title", "variant").get(
+            pk=variant_item.pk
+        )
+        deferred.title = "Renamed"
+        deferred.save()
+        read_later = models.VariantItem.objects.defer("file").get(pk=variant_item.pk)
+        assert read_later.file.name == variant_item.file.name
+        read_later.save()
+
+        variant_item.refresh_from_db()
+        assert variant_item.title == "Renamed"
+        assert variant_item.hls_manifest.name == "hls/master.m3u8"
+        assert variant_item.content_duration == "1m 0s"
+        assert not Job.objects.exists()
+
+        replaced = models.VariantItem.objects.only("title", "variant").get(
+            pk=variant_item.pk
+        )
+        replaced.file = SimpleUploadedFile("other.mp4", build_mp4(90))
+        replaced.save()
+        replaced.refresh_from_db()
+        assert not replaced.hls_manifest
+        assert Job.objects.filter(kind="probe_media").exists()
+
+    def test_duplicate_upload_reuses_metadata_and_stored_file(self):
+        """Test a second upload of the same content skips probing and reuses the stored copy."""
+        first = models.VariantItem.objects.create(
+            variant=self.variant,
+            title="Lecture",
+            file=SimpleUploadedFile("lecture.mp4", build_mp4(90)),
+        )
+        jobs.run_pending()
+
+        metadata = models.MediaMetadata.objects.get()
+        assert metadata.content_hash == hashlib.sha256(build_mp4(90)).hexdigest()
+        assert metadata.duration == 90
+
+        second = models.VariantItem.objects.create(
+            variant=self.variant,
+            title="Lecture copy",
+            file=SimpleUploadedFile("copy.mp4", build_mp4(90)),
+        )
+
+        assert second.file.name == first.file.name
+        assert second.content_duration == "1m 30s"
+        assert not Job.objects.filter(kind="probe_media", status="Pending").exists()
+
+    def test_upload_handler_attaches_content_hash(self):
+        """Test uploads streamed through the hashing handler carry their SHA-256."""
+        handler = HashingMemoryFileUploadHandler()
+        handler.handle_raw_input(None, {}, 6, "boundary")
+        with self.assertRaises(StopFutureHandlers):
+            handler.new_file("file", "lecture.mp4", "video/mp4", 6)
+        handler.receive_data_chunk(b"abc", 0)
+        handler.receive_data_chunk(b"def", 3)
+
+        uploaded = handler.file_complete(6)
+
+        assert uploaded.content_hash == hashlib.sha256(b"abcdef").hexdigest()
+
+    def build_curriculum(self, manifest, files):
+        archive = BytesIO()
+        with zipfile.ZipFile(archive, "w") as zip_file:
+            zip_file.writestr("manifest.json", json.dumps(manifest))
+            for name, content in files.items():
+                zip_file.writestr(name, content)
+        archive.seek(0)
+        archive.name = "course.zip"
+        return archive
+
+    def import_curriculum(self, archive, user=None):
+        client = APIClient()
+        client.force_authenticate(user or self.variant.course.teacher.user)
+        return client.post(
+            f"/api/v1/course/curriculum-import/{self.variant.course.course_id}/",
+            {"archive": archive},
+            format="multipart",
+        )
+
+    def test_curriculum_import_creates_variants_and_queues_probes(self):
+        """Test a ZIP curriculum import bulk-creates the curriculum and probes it in the background."""
+        archive = self.build_curriculum(
+            {
+                "variants": [
+                    {
+                        "title": "Basics",
+                        "items": [
+                            {"title": "Welcome", "file": "a.mp4", "preview": True},
+                            {"title": "Setup", "file": "b.mp4"},
+                        ],
+                    },
+                    {
+                        "title": "Advanced",
+                        "items": [{"title": "Recap", "file": "a.mp4"}],
+                    },
+                ]
+            },
+            {"a.mp4": build_mp4(60), "b.mp4": build_mp4(150)},
+        )
+
+        response = self.import_curriculum(archive)
+
+        assert response.status_code == 201
+        assert response.data == {"variants": 2, "lectures": 3, "probes_queued": 3}
+        recap = models.VariantItem.objects.get(title="Recap")
+        assert (
+            recap.file.name == models.VariantItem.objects.get(title="Welcome").file.name
+        )
+        assert Job.objects.filter(kind="package_hls").count() == 3
+
+        assert jobs.run_pending(kinds=["probe_media"]) == 3
+        lectures = models.VariantItem.objects.filter(variant__title="Basics")
+        assert sorted(lectures.values_list("content_duration", flat=True)) == [
+            "1m 0s",
+            "2m 30s",
+        ]
+        assert models.MediaMetadata.objects.count() == 2
+        course = models.Course.objects.get(pk=self.variant.course_id)
+        assert (course.duration_seconds, course.lecture_count) == (270, 3)
+
+    def test_curriculum_import_without_returned_bulk_insert_ids(self):
+        """Test lectures are re-selected for their jobs where bulk inserts return no ids."""
+        archive = self.build_curriculum(
+            {
+                "variants": [
+                    {
+                        "title": "Basics",
+                        "items": [{"title": "Welcome", "file": "a.mp4"}],
+                    }
+                ]
+            },
+            {"a.mp4": build_mp4(60)},
+        )
+        features = mock.patch.object(
+            type(connection.features),
+            "can_return_rows_from_bulk_insert",
+            new_callable=mock.PropertyMock,
+            return_value=False,
+        )
+        with features:
+            response = self.import_curriculum(archive)
+
+        assert response.data["probes_queued"] == 1
+        lecture = models.VariantItem.objects.get(title="Welcome")
+        for kind in ("probe_media", "package_hls"):
+            assert Job.objects.get(kind=kind).payload == {"variant_item_id": lecture.pk}
+
+    def test_curriculum_import_rejects_bad_archives_and_other_users(self):
+        """Test malformed manifests, oversized archives and other users are refused."""
+        other = User.objects.create(email="other@example.com", username="other")
+        archive = self.build_curriculum({"variants": []}, {})
+        assert self.import_curriculum(archive, other).status_code == 403
+
+        for manifest in (
+            [],
+            {"variants": ["Basics"]},
+            {"variants": [{"title": "Basics", "items": ["Welcome"]}]},
+            {
+                "variants": [
+                    {"title": "Basics", "items": [{"title": "Welcome", "file": 3}]}
+                ]
+            },
+        ):
+            response = self.import_curriculum(self.build_curriculum(manifest, {}))
+            assert response.status_code == 400
+
+        with override_settings(CURRICULUM_ARCHIVE_MAX_SIZE=1000):
+            archive = self.build_curriculum({"variants": []}, {"a.mp4": bytes(2000)})
+            response = self.import_curriculum(archive)
+            assert response.status_code == 400
+            assert "at most 1000 bytes" in response.data["message"]
+
+        archive = BytesIO(b"not a zip")
+        archive.name = "course.zip"
+        assert self.import_curriculum(archive).status_code == 400
+        assert not models.Variant.objects.exclude(pk=self.variant.pk).exists()
+
+    def test_failed_curriculum_import_deletes_stored_files(self):
+        """Test files stored by an import that rolls back are removed from storage."""
+        archive = self.build_curriculum(
+            {
+                "variants": [
+                    {
+                        "title": "Basics",
+                        "items": [{"title": "Welcome", "file": "a.mp4"}],
+                    }
+                ]
+            },
+            {"a.mp4": build_mp4(60)},
+        )
+        failing = mock.patch.object(
+            models.VariantItem.objects, "bulk_create", side_effect=IntegrityError
+        )
+        with failing, self.assertRaises(IntegrityError):
+            self.import_curriculum(archive)
+
+        assert os.listdir(os.path.join(settings.MEDIA_ROOT, "course-file")) == []
+        assert not models.Variant.objects.exclude(pk=self.variant.pk).exists()
+
+
+def build_jpeg(width, height):
+    """Returns an encoded JPEG of the given size."""
+    output = BytesIO()
+    Image.new("RGB", (width, height), "steelblue").save(output, "JPEG", quality=95)
+
+    return output.getvalue()
+
+
+class ImageDerivativeTest(TestCase):
+    """Test cases for the responsive image derivative pipeline."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.settings_override = override_settings(MEDIA_ROOT=media_root)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        user = User.objects.create(email="test@example.com", username="test")
+        self.teacher = models.Teacher.objects.create(
+            user=user, full_name="Jane Smith", image=""
+        )
+
+    def test_upload_queues_job_that_builds_width_buckets(self):
+        """Test uploading a course image builds WebP and JPEG derivatives in the background."""
+        course = models.Course.objects.create(
+            teacher=self.teacher,
+            title="Python",
+            image=SimpleUploadedFile("cover.jpg", build_jpeg(1000, 500)),
+        )
+
+        assert course.image_derivatives == {}
+        assert (
+            Job.objects.filter(kind="image_derivatives", status="Pending").count() == 1
+        )
+
+        assert jobs.run_pending() == 1
+
+        course.refresh_from_db()
+        assert set(course.image_derivatives) == {"webp", "jpeg"}
+        assert list(course.image_derivatives["webp"]) == ["160", "320", "640", "1000"]
+        thumbnail_name = course.image_derivatives["webp"]["320"]
+        with Image.open(course.image.storage.open(thumbnail_name)) as thumbnail:
+            assert thumbnail.format == "WEBP"
+            assert thumbnail.size == (320, 160)
+
+    def test_identical_images_share_derivatives(self):
+        """Test the same image uploaded twice maps to the same content-addressed files."""
+        content = build_jpeg(400, 300)
+        first = models.Category.objects.create(
+            title="Design", image=SimpleUploadedFile("a.jpg", content)
+        )
+        second = models.Category.objects.create(
+            title="Art", image=SimpleUploadedFile("b.jpg", content)
+        )
+        jobs.run_pending()
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert first.image.name != second.image.name
+        assert first.image_derivatives == second.image_derivatives
+        assert first.image_derivatives["jpeg"]["400"].startswith(
+            f"derivatives/{hashlib.sha256(content).hexdigest()[:2]}/"
+        )
+
+    def test_unchanged_image_and_missing_file(self):
+        """Test resaves do not queue jobs and missing files get an empty map."""
+        category = models.Category.objects.create(title="Design", image="missing.jpg")
+        assert jobs.run_pending() == 1
+        category.refresh_from_db()
+        assert category.image_derivatives == {}
+
+        category.title = "UX"
+        category.save()
+        assert not Job.objects.filter(status="Pending").exists()
+
+    def test_serializer_exposes_srcset(self):
+        """Test the course serializer renders the derivatives as srcset strings."""
+        course = models.Course.objects.create(
+            teacher=self.teacher,
+            title="Python",
+            image=SimpleUploadedFile("cover.jpg", build_jpeg(300, 200)),
+        )
+        jobs.run_pending()
+        course.refresh_from_db()
+
+        response = APIClient().get(f"/api/v1/course/course-detail/{course.slug}/")
+        srcset = response.data["image_srcset"]
+
+        assert srcset["webp"].startswith("http://testserver/media/derivatives/")
+        assert srcset["webp"].endswith(" 300w")
+        assert " 160w, " in srcset["jpeg"]
+
+
+class CourseTotalsTest(TestCase):
+    """Test cases for the Variant and Course duration and lecture count rollups."""
+
+    def setUp(self):
+        user = User.objects.create(email="test@example.com", username="test")
+        teacher = models.Teacher.objects.create(user=user, full_name="Jane Smith")
+        self.course = models.Course.objects.create(teacher=teacher, title="Python")
+        self.intro = models.Variant.objects.create(course=self.course, title="Intro")
+        self.advanced = models.Variant.objects.create(
+            course=self.course, title="Advanced"
+        )
+
+    def add_lecture(self, variant, seconds):
+        return models.VariantItem.objects.create(
+            variant=variant, title="Lecture", duration=timedelta(seconds=seconds)
+        )
+
+    def assert_totals(self, instance, duration_seconds, lecture_count):
+        instance.refresh_from_db()
+        assert instance.duration_seconds == duration_seconds
+        assert instance.lecture_count == lecture_count
+
+    def test_totals_follow_create_move_and_delete(self):
+        """Test adding, moving and deleting lectures keeps variant and course totals current."""
+        first = self.add_lecture(self.intro, 60)
+        self.add_lecture(self.intro, 30)
+        self.add_lecture(self.advanced, 90)
+        self.assert_totals(self.intro, 90, 2)
+        self.assert_totals(self.course, 180, 3)
+
+        first.variant = self.advanced
+        first.save()
+        self.assert_totals(self.intro, 30, 1)
+        self.assert_totals(self.advanced, 150, 2)
+        self.assert_totals(self.course, 180, 3)
+
+        first.delete()
+        self.assert_totals(self.advanced, 90, 1)
+        self.assert_totals(self.course, 120, 2)
+
+        self.advanced.delete()
+        self.assert_totals(self.course, 30, 1)
+
+    def test_probe_job_updates_totals(self):
+        """Test a probed lecture's duration is added to the totals."""
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with override_settings(MEDIA_ROOT=media_root):
+            models.VariantItem.objects.create(
+                variant=self.intro,
+                title="Lecture",
+                file=SimpleUploadedFile("lecture.mp4", build_mp4(330)),
+            )
+            self.assert_totals(self.course, 0, 1)
+
+            jobs.run_pending()
+
+        self.assert_totals(self.intro, 330, 1)
+        self.assert_totals(self.course, 330, 1)
+
+    def test_rebuild_command_and_serializer(self):
+        """Test the rebuild command repairs stale totals that the serializers expose."""
+        self.add_lecture(self.intro, 45)
+        models.Variant.objects.update(duration_seconds=0, lecture_count=0)
+        models.Course.objects.update(duration_seconds=0, lecture_count=0)
+
+        call_command("rebuild_course_totals", stdout=StringIO())
+
+        self.assert_totals(self.course, 45, 1)
+        data = CourseSerializer(self.course).data
+        assert data["duration_seconds"] == 45
+        assert data["lecture_count"] == 1
+        assert sorted(variant["lecture_count"] for variant in data["curriculum"]) == [
+            0,
+            1,
+        ]
+
+
+class ChunkedUploadTest(TestCase):
+    """Test cases for resumable chunked uploads."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.settings_override = override_settings(
+            MEDIA_ROOT=media_root,
+            CHUNKED_UPLOAD_ROOT=f"{media_root}/uploads",
+            CHUNKED_UPLOAD_MIN_CHUNK_SIZE=500,
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        user = User.objects.create(email="test@example.com", username="test")
+        teacher = models.Teacher.objects.create(user=user, full_name="Jane Smith")
+        self.course = models.Course.objects.create(teacher=teacher, title="Python")
+        variant = models.Variant.objects.create(course=self.course, title="Intro")
+        self.variant_item = models.VariantItem.objects.create(
+            variant=variant, title="Lecture"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        self.content = build_mp4(330) + bytes(range(256)) * 10
+
+    def start(self, chunk_size=1000):
+        response = self.client.post(
+            "/api/v1/course/upload/",
+            {
+                "filename": "lecture.mp4",
+                "size": len(self.content),
+                "chunk_size": chunk_size,
+            },
+        )
+        assert response.status_code == 201
+        return response.data
+
+    def put_chunk(self, upload_id, index, data, checksum=None):
+        checksum = checksum or hashlib.sha256(data).hexdigest()
+        return self.client.put(
+            f"/api/v1/course/upload/{upload_id}/chunk/{index}/",
+            data,
+            content_type="application/octet-stream",
+            HTTP_UPLOAD_CHECKSUM=f"sha256 {checksum}",
+        )
+
+    def test_out_of_order_resumed_upload_is_attached_to_lecture(self):
+        """Test chunks sent out of order across a resume are assembled and probed."""
+        session = self.start()
+        chunks = [self.content[i : i + 1000] for i in range(0, len(self.content), 1000)]
+        assert session["chunk_count"] == len(chunks)
+
+        for index in reversed(range(3, len(chunks))):
+            response = self.put_chunk(session["upload_id"], index, chunks[index])
+            assert response.status_code == 200
+        assert self.put_chunk(session["upload_id"], 1, chunks[1]).status_code == 200
+
+        state = self.client.get(f"/api/v1/course/upload/{session['upload_id']}/").data
+        assert state["missing"] == [[0, 0], [2, 2]]
+        assert self.put_chunk(session["upload_id"], 2, chunks[2]).status_code == 200
+
+        finalize_url = f"/api/v1/course/upload/{session['upload_id']}/finalize/"
+        target = {"variant_item_id": self.variant_item.variant_item_id}
+        assert self.client.post(finalize_url, target).status_code == 409
+
+        assert self.put_chunk(session["upload_id"], 0, chunks[0]).status_code == 200
+        response = self.client.post(finalize_url, target)
+
+        assert response.status_code == 201
+        assert response.data["status"] == "Complete"
+        assert response.data["content_hash"] == hashlib.sha256(self.content).hexdigest()
+        self.variant_item.refresh_from_db()
+        assert self.variant_item.file.read() == self.content
+        assert self.variant_item.content_hash == response.data["content_hash"]
+        assert not models.UploadChunk.objects.exists()
+
+        jobs.run_pending()
+        self.variant_item.refresh_from_db()
+        assert self.variant_item.content_duration == "5m 30s"
+
+    def test_rejects_oversized_uploads_and_tiny_chunks(self):
+        """Test sessions are refused above the size limit, below the chunk minimum or past the chunk cap."""
+        url = "/api/v1/course/upload/"
+        with override_settings(CHUNKED_UPLOAD_MAX_SIZE=10_000):
+            response = self.client.post(url, {"filename": "a.mp4", "size": 10_001})
+            assert response.status_code == 413
+
+        response = self.client.post(
+            url, {"filename": "a.mp4", "size": 5000, "chunk_size": 1}
+        )
+        assert response.status_code == 400
+        # A file smaller than the minimum is sent in one chunk of its own size.
+        response = self.client.post(
+            url, {"filename": "a.mp4", "size": 10, "chunk_size": 10}
+        )
+        assert response.status_code == 201
+
+        with override_settings(CHUNKED_UPLOAD_MAX_CHUNKS=4):
+            response = self.client.post(
+                url, {"filename": "a.mp4", "size": 5000, "chunk_size": 1000}
+            )
+            assert response.status_code == 400
+            assert "at least 1250" in response.data["message"]
+
+    def test_rejects_bad_checksum_and_length(self):
+        """Test a corrupted or truncated chunk is not recorded."""
+        session = self.start()
+        chunk = self.content[:1000]
+
+        response = self.put_chunk(session["upload_id"], 0, chunk, checksum="0" * 64)
+        assert response.status_code == 460
+        assert self.put_chunk(session["upload_id"], 0, chunk[:500]).status_code == 400
+        assert not models.UploadChunk.objects.exists()
+
+        base64_checksum = base64.b64encode(hashlib.sha256(chunk).digest()).decode()
+        response = self.client.put(
+            f"/api/v1/course/upload/{session['upload_id']}/chunk/0/",
+            chunk,
+            content_type="application/octet-stream",
+            HTTP_UPLOAD_CHECKSUM=f"sha256 {base64_checksum}",
+        )
+        assert response.status_code == 200
+
+    def test_requires_the_uploader_and_the_course_teacher(self):
+        """Test anonymous clients and other teachers cannot upload to or finalize into a course."""
+        anonymous = APIClient()
+        response = anonymous.post(
+            "/api/v1/course/upload/", {"filename": "a.mp4", "size": 10}
+        )
+        assert response.status_code == 403
+
+        session = self.start(chunk_size=len(self.content))
+        upload_url = f"/api/v1/course/upload/{session['upload_id']}/"
+        assert anonymous.get(upload_url).status_code == 403
+        assert anonymous.post(f"{upload_url}finalize/").status_code == 403
+        assert self.put_chunk(session["upload_id"], 0, self.content).status_code == 200
+
+        other = User.objects.create(email="other@example.com", username="other")
+        models.Teacher.objects.create(user=other, full_name="John Doe")
+        self.client.force_authenticate(other)
+        assert self.client.get(upload_url).status_code == 404
+
+        # A teacher's own upload cannot be finalized into someone else's course.
+        own = self.start(chunk_size=len(self.content))
+        assert self.put_chunk(own["upload_id"], 0, self.content).status_code == 200
+        own_url = f"/api/v1/course/upload/{own['upload_id']}/finalize/"
+        for target in (
+            {"variant_item_id": self.variant_item.variant_item_id},
+            {"course_id": self.course.course_id},
+        ):
+            response = self.client.post(own_url, target)
+            assert response.status_code == 403
+        self.variant_item.refresh_from_db()
+        assert not self.variant_item.file
+
+
+class HlsPackagingTest(TestCase):
+    """Test cases for the HLS rendition ladder and poster job."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.settings_override = override_settings(
+            MEDIA_ROOT=media_root, HLS_RENDITIONS=((144, 200), (240, 400), (480, 1000))
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        user = User.objects.create(email="test@example.com", username="test")
+        teacher = models.Teacher.objects.create(user=user, full_name="Jane Smith")
+        course = models.Course.objects.create(teacher=teacher, title="Python")
+        self.variant = models.Variant.objects.create(course=course, title="Intro")
+
+    def build_video(self):
+        path = f"{tempfile.mkdtemp()}/lecture.mp4"
+        self.addCleanup(shutil.rmtree, path.rsplit("/", 1)[0])
+        run_ffmpeg(
+            "-y -f lavfi -i testsrc=size=426x240:rate=10:duration=2 "
+            "-f lavfi -i sine=duration=2 -pix_fmt yuv420p -shortest".split() + [path]
+        )
+        with open(path, "rb") as video:
+            return video.read()
+
+    def test_job_builds_ladder_and_poster(self):
+        """Test a lecture upload is packaged into an HLS ladder no taller than the source."""
+        variant_item = models.VariantItem.objects.create(
+            variant=self.variant,
+            title="Lecture",
+            file=SimpleUploadedFile("lecture.mp4", self.build_video()),
+        )
+
+        jobs.run_pending()
+
+        variant_item.refresh_from_db()
+        manifest_name = f"hls/{variant_item.content_hash}/master.m3u8"
+        assert variant_item.hls_manifest.name == manifest_name
+        master = variant_item.hls_manifest.read().decode()
+        assert "144p/index.m3u8" in master
+        assert "240p/index.m3u8" in master
+        assert "480p" not in master
+        assert Image.open(variant_item.poster).format == "JPEG"
+
+        data = VariantItemSerializer(variant_item).data
+        assert data["hls_manifest"].endswith("/master.m3u8")
+
+        response = self.client.get(f"/media/{variant_item.hls_manifest.name}")
+        assert response["Content-Type"] == "application/vnd.apple.mpegurl"
+        assert "immutable" in response["Cache-Control"]
+
+    def test_non_video_file_is_skipped(self):
+        """Test files without a video stream complete without a manifest."""
+        variant_item = models.VariantItem.objects.create(
+            variant=self.variant,
+            title="Slides",
+            file=SimpleUploadedFile("slides.pdf", b"%PDF-1.4 slides"),
+        )
+
+        jobs.run_pending(kinds=["package_hls"])
+
+        variant_item.refresh_from_db()
+        assert not variant_item.hls_manifest
+        assert Job.objects.get(kind="package_hls").status == "Done"
+
+
+class EnrollmentProgressTest(TestCase):
+    """Test cases for the denormalized per-enrollment progress counters."""
+
+    def setUp(self):
+        self.student = User.objects.create(
+            email="student@example.com", username="student"
+        )
+        user = User.objects.create(email="teacher@example.com", username="teacher")
+        self.teacher = models.Teacher.objects.create(user=user, full_name="Jane Smith")
+        self.order = models.CartOrder.objects.create(student=self.student)
+
+    def enroll(self, lectures):
+        course = models.Course.objects.create(
+            teacher=self.teacher, title=f"Course with {lectures} lectures"
+        )
+        variant = models.Variant.objects.create(course=course, title="Intro")
+        items = [
+            models.VariantItem.objects.create(variant=variant, title=f"Lecture {i}")
+            for i in range(lectures)
+        ]
+        order_item = models.CartOrderItem.objects.create(
+            order=self.order, course=course, teacher=self.teacher
+        )
+        enrollment = models.EnrolledCourse.objects.create(
+            course=course,
+            user=self.student,
+            teacher=self.teacher,
+            order_item=order_item,
+        )
+        return enrollment, items
+
+    def complete(self, item):
+        return models.CompletedLesson.objects.create(
+            course=item.variant.course, user=self.student, variant_item=item
+        )
+
+    def test_completing_and_uncompleting_updates_progress(self):
+        """Test completed lessons are counted on create and delete, and duplicates are rejected."""
+        enrollment, items = self.enroll(4)
+        first = self.complete(items[0])
+        self.complete(items[1])
+
+        assert enrollment.progress.completed_lessons == 0
+        enrollment.progress.refresh_from_db()
+        assert enrollment.progress.completed_lessons == 2
+        assert enrollment.progress.percent() == 50
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.complete(items[1])
+
+        first.delete()
+        items[1].delete()
+        enrollment.progress.refresh_from_db()
+        assert enrollment.progress.completed_lessons == 0
+
+    def test_dashboard_progress_is_one_query(self):
+        """Test the progress endpoint returns every enrollment in a single query."""
+        for lectures in (2, 3, 4):
+            _, items = self.enroll(lectures)
+            self.complete(items[0])
+
+        with self.assertNumQueries(1):
+            response = APIClient().get(
+                f"/api/v1/student/course-progress/{self.student.id}/"
+            )
+
+        assert response.status_code == 200
+        assert sorted(row["percent"] for row in response.data) == [25, 33.3, 50]
+        assert {row["completed_lessons"] for row in response.data} == {1}
+
+    def test_rebuild_command_repairs_counts(self):
+        """Test the rebuild command recounts progress and recreates missing rows."""
+        enrollment, items = self.enroll(2)
+        self.complete(items[0])
+        self.complete(items[1])
+        models.EnrollmentProgress.objects.all().delete()
+
+        call_command("rebuild_enrollment_progress", stdout=StringIO())
+
+        assert (
+            models.EnrollmentProgress.objects.get(
+                enrolled_course=enrollment
+            ).completed_lessons
+            == 2
+        )
+
+
+@override_settings(
+    PLAYBACK_CACHE="playback",
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "playback": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.path.join(tempfile.gettempdir(), "playback-test"),
+        },
+    },
+)
+class LessonPlaybackTest(TestCase):
+    """Test cases for the buffered playback heartbeats and bulk lesson completion."""
+
+    def setUp(self):
+        self.addCleanup(playback.get_cache().clear)
+
+        self.user = User.objects.create(email="student@example.com", username="student")
+        teacher = models.Teacher.objects.create(user=self.user, full_name="Jane Smith")
+        self.course = models.Course.objects.create(teacher=teacher, title="Python")
+        variant = models.Variant.objects.create(course=self.course, title="Intro")
+        self.items = [
+            models.VariantItem.objects.create(variant=variant, title=f"Lecture {i}")
+            for i in range(3)
+        ]
+        order_item = models.CartOrderItem.objects.create(
+            order=models.CartOrder.objects.create(student=self.user),
+            course=self.course,
+            teacher=teacher,
+        )
+        self.enrollment = models.EnrolledCourse.objects.create(
+            course=self.course, user=self.user, teacher=teacher, order_item=order_item
+        )
+
+    def heartbeat(self, item, position, timestamp):
+        return APIClient().post(
+            "/api/v1/student/playback/",
+            {
+                "user_id": self.user.id,
+                "variant_item_id": item.id,
+                "position": position,
+                "timestamp": timestamp,
+            },
+            format="json",
+        )
+
+    def test_heartbeats_are_buffered_and_flushed_in_one_batch(self):
+        """Test heartbeats skip the database and a flush writes the newest position per lecture."""
+        now = time.time()
+        with self.assertNumQueries(0):
+            for second in range(10):
+                response = self.heartbeat(self.items[0], second * 5, now + second)
+                assert response.status_code == 202
+            self.heartbeat(self.items[1], 30, now)
+            # Arrives late: older than the buffered report, so it is ignored.
+            self.heartbeat(self.items[0], 3, now - 60)
+
+        assert models.LessonPlayback.objects.count() == 0
+        url = f"/api/v1/student/playback/{self.user.id}/{self.items[0].id}/"
+        assert APIClient().get(url).data["position"] == 45
+
+        assert playback.flush() == 2
+        positions = dict(
+            models.LessonPlayback.objects.values_list("variant_item_id", "position")
+        )
+        assert positions == {self.items[0].id: 45, self.items[1].id: 30}
+
+        # Nothing new was reported, so the next flush writes nothing.
+        assert playback.flush() == 0
+
+    def test_flush_is_last_writer_wins_and_survives_lost_log_entries(self):
+        """Test a replayed older report never overwrites a newer row and gaps are skipped."""
+        now = time.time()
+        playback.upsert_positions({(self.user.id, self.items[0].id): (120, now)})
+        stale = {(self.user.id, self.items[0].id): (10, now - 5)}
+        assert playback.upsert_positions(stale) == 0
+
+        # A writer that died between reserving and storing its log entry.
+        cache = playback.get_cache()
+        cache.add(playback.SEQ_KEY, 0, None)
+        cache.incr(playback.SEQ_KEY)
+        playback.record_heartbeat(self.user.id, self.items[1].id, 60, now)
+
+        assert playback.flush() == 0
+        assert playback.flush() == 1
+        assert (
+            models.LessonPlayback.objects.get(variant_item=self.items[0]).position
+            == 120
+        )
+        assert (
+            models.LessonPlayback.objects.get(variant_item=self.items[1]).position == 60
+        )
+
+    def test_per_process_cache_writes_through(self):
+        """Test heartbeats go straight to the database when the playback cache is per process."""
+        now = time.time()
+        with override_settings(PLAYBACK_CACHE="default"):
+            assert self.heartbeat(self.items[0], 30, now).status_code == 202
+            assert self.heartbeat(self.items[0], 10, now - 5).status_code == 202
+            assert (
+                models.LessonPlayback.objects.get(variant_item=self.items[0]).position
+                == 30
+            )
+
+            with self.assertRaises(ImproperlyConfigured):
+                playback.flush()
+            with self.assertRaises(CommandError):
+                call_command("flush_playback", "--once")
+            warnings = check_playback_cache_is_shared(None)
+            assert [warning.id for warning in warnings] == ["api.W001"]
+            assert check_playback_cache(None) == []
+
+        assert check_playback_cache_is_shared(None) == []
+        with override_settings(PLAYBACK_CACHE="missing"):
+            assert [warning.id for warning in check_playback_cache(None)] == [
+                "api.W002"
+            ]
+
+    def test_bulk_complete_creates_missing_lessons_and_updates_progress(self):
+        """Test bulk completion skips completed and foreign lectures and recounts progress."""
+        models.CompletedLesson.objects.create(
+            course=self.course, user=self.user, variant_item=self.items[0]
+        )
+        other_course = models.Course.objects.create(
+            teacher=self.course.teacher, title="Other"
+        )
+        other_item = models.VariantItem.objects.create(
+            variant=models.Variant.objects.create(course=other_course, title="Intro"),
+            title="Elsewhere",
+        )
+
+        response = APIClient().post(
+            "/api/v1/student/lessons-complete/",
+            {
+                "user_id": self.user.id,
+                "course_id": self.course.id,
+                "variant_item_ids": [item.id for item in self.items] + [other_item.id],
+            },
+            format="json",
+        )
+
+        assert response.status_code == 201
+        assert response.data["completed"] == 2
+        assert response.data["completed_lessons"] == 3
+        self.enrollment.progress.refresh_from_db()
+        assert self.enrollment.progress.completed_lessons == 3
+        assert self.enrollment.progress.percent() == 100
+
+
+class StudentDashboardTest(TestCase):
+    """Test cases for the student dashboard and lazily loaded curriculum endpoints."""
+
+    def setUp(self):
+        self.student = User.objects.create(
+            email="student@example.com", username="student"
+        )
+        user = User.objects.create(email="teacher@example.com", username="teacher")
+        self.teacher = models.Teacher.objects.create(user=user, full_name="Jane Smith")
+        self.order = models.CartOrder.objects.create(student=self.student)
+        self.enrollments = [self.enroll(number) for number in range(4)]
+
+    def enroll(self, number):
+        course = models.Course.objects.create(
+            teacher=self.teacher, title=f"Course {number}"
+        )
+        for section in range(2):
+            variant = models.Variant.objects.create(
+                course=course, title=f"Section {section}"
+            )
+            for lecture in range(3):
+                models.VariantItem.objects.create(
+                    variant=variant, title=f"Lecture {lecture}"
+                )
+        order_item = models.CartOrderItem.objects.create(
+            order=self.order, course=course, teacher=self.teacher
+        )
+        enrollment = models.EnrolledCourse.objects.create(
+            course=course,
+            user=self.student,
+            teacher=self.teacher,
+            order_item=order_item,
+        )
+
+        lectures = list(course.lectures().order_by("pk"))
+        models.CompletedLesson.objects.create(
+            course=course, user=self.student, variant_item=lectures[0]
+        )
+        for index, lecture in enumerate(lectures[:2]):
+            models.LessonPlayback.objects.create(
+                user=self.student,
+                variant_item=lecture,
+                position=30 * (index + 1),
+                reported_at=timezone.now() + timedelta(seconds=index),
+            )
+        if number % 2:
+            models.Review.objects.create(
+                user=self.student, course=course, review="Great", rating=5
+            )
+        return enrollment
+
+    def test_dashboard_query_count_does_not_grow_with_enrollments(self):
+        """Test the dashboard stays within its query budget for any number of enrollments."""
+        with self.assertNumQueries(3):
+            response = APIClient().get(f"/api/v1/student/dashboard/{self.student.id}/")
+
+        assert response.status_code == 200
+        assert len(response.data) == 4
+        entry = response.data[0]
+        assert entry["course"]["teacher"] == "Jane Smith"
+        assert entry["progress"] == {"completed_lessons": 1, "percent": 16.7}
+        assert entry["last_viewed"]["title"] == "Lecture 1"
+        assert entry["last_viewed"]["position"] == 60
+        assert sorted(bool(entry["review"]) for entry in response.data) == [
+            False,
+            False,
+            True,
+            True,
+        ]
+
+        self.enrollments.extend(self.enroll(number) for number in range(4, 8))
+        with self.assertNumQueries(3):
+            response = APIClient().get(f"/api/v1/student/dashboard/{self.student.id}/")
+        assert len(response.data) == 8
+
+    def test_curriculum_is_loaded_per_course(self):
+        """Test one course's curriculum is loaded with the student's completion state."""
+        enrollment = self.enrollments[0]
+        url = (
+            f"/api/v1/student/curriculum/{self.student.id}/{enrollment.enrollment_id}/"
+        )
+        with self.assertNumQueries(5):
+            response = APIClient().get(url)
+
+        assert response.status_code == 200
+        assert [section["title"] for section in response.data] == [
+            "Section 0",
+            "Section 1",
+        ]
+        items = response.data[0]["items"]
+        assert [item["completed"] for item in items] == [True, False, False]
+        assert [item["position"] for item in items] == [30, 60, None]
+
+        missing = f"/api/v1/student/curriculum/{self.student.id}/000000/"
+        assert APIClient().get(missing).status_code == 404
+
+
+class QuestionAnswerThreadTest(TestCase):
+    """Test cases for the paginated Q&A thread endpoints and course Q&A summary."""
+
+    def setUp(self):
+        self.users = [
+            User.objects.create(email=f"user{i}@example.com", username=f"user{i}")
+            for i in range(5)
+        ]
+        teacher = models.Teacher.objects.create(
+            user=self.users[0], full_name="Jane Smith"
+        )
+        self.course = models.Course.objects.create(teacher=teacher, title="Python")
+        start = timezone.now()
+        self.threads = []
+        for i in range(25):
+            thread = models.QuestionAnswer.objects.create(
+                course=self.course,
+                user=self.users[i % 5],
+                title=f"Question {i}",
+                date=start + timedelta(minutes=i),
+            )
+            self.threads.append(thread)
+        for i in range(7):
+            models.QuestionAnswerMessage.objects.create(
+                course=self.course,
+                question=self.threads[-1],
+                user=self.users[i % 5],
+                message=f"Message {i}",
+                date=start + timedelta(hours=1, minutes=i),
+            )
+
+    def test_thread_pages_batch_profiles(self):
+        """Test a page of threads costs two queries and cursors walk every thread once."""
+        url = f"/api/v1/course/question-answer-list/{self.course.course_id}/"
+        with self.assertNumQueries(2):
+            response = APIClient().get(url)
+
+        assert response.status_code == 200
+        first = response.data["results"]
+        assert len(first) == 20
+        assert first[0]["title"] == "Question 24"
+        assert first[0]["message_count"] == 7
+        assert first[0]["profile"]["full_name"] == self.users[4].profile.full_name
+
+        second = APIClient().get(response.data["next"]).data["results"]
+        titles = [thread["title"] for thread in first + second]
+        assert titles == [f"Question {i}" for i in range(24, -1, -1)]
+
+        mine = APIClient().get(url, {"user_id": self.users[1].id}).data["results"]
+        assert [thread["title"] for thread in mine] == [
+            "Question 21",
+            "Question 16",
+            "Question 11",
+            "Question 6",
+            "Question 1",
+        ]
+
+    def test_message_pages_are_keyset_paginated(self):
+        """Test messages are paged oldest first with cursors and batched profiles."""
+        url = f"/api/v1/course/question-answer/{self.threads[-1].question_answer_id}/messages/"
+        with self.assertNumQueries(2):
+            response = APIClient().get(url, {"page_size": 4})
+
+        assert [m["message"] for m in response.data["results"]] == [
+            f"Message {i}" for i in range(4)
+        ]
+        response = APIClient().get(response.data["next"])
+        assert [m["message"] for m in response.data["results"]] == [
+            f"Message {i}" for i in range(4, 7)
+        ]
+        assert response.data["next"] is None
+
+    def test_cursors_walk_threads_sharing_a_timestamp(self):
+        """Test cursors neither repeat nor skip threads posted at the same instant."""
+        moment = timezone.now() + timedelta(days=1)
+        tied = [
+            models.QuestionAnswer.objects.create(
+                course=self.course, user=self.users[0], title=f"Tied {i}", date=moment
+            )
+            for i in range(12)
+        ]
+        url = f"/api/v1/course/question-answer-list/{self.course.course_id}/"
+        response = APIClient().get(url, {"page_size": 5})
+        seen = [thread["title"] for thread in response.data["results"]]
+        # A thread posted between pages must not shift the ones still to come.
+        models.QuestionAnswer.objects.create(
+            course=self.course, user=self.users[0], title="Late", date=moment
+        )
+        while response.data["next"]:
+            response = APIClient().get(response.data["next"])
+            seen += [thread["title"] for thread in response.data["results"]]
+
+        assert seen[:12] == [thread.title for thread in reversed(tied)]
+        assert seen[12:] == [f"Question {i}" for i in range(24, -1, -1)]
+
+        previous = APIClient().get(url, {"page_size": 5})
+        previous = APIClient().get(
+            APIClient().get(previous.data["next"]).data["previous"]
+        )
+        assert [thread["title"] for thread in previous.data["results"]] == ["Late"] + [
+            thread.title for thread in reversed(tied[-4:])
+        ]
+
+    def test_summary_follows_posts_and_deletes(self):
+        """Test the course Q&A summary counts threads and messages as they change."""
+        url = f"/api/v1/course/qa-summary/{self.course.course_id}/"
+        data = APIClient().get(url).data
+        assert data["question_count"] == 25
+        assert data["message_count"] == 7
+
+        self.threads[-1].delete()
+        data = APIClient().get(url).data
+        assert data["question_count"] == 24
+        assert data["message_count"] == 0
+
+        self.course.delete()
+        assert not models.CourseQASummary.objects.exists()
+
+    def test_enrollment_payload_omits_course_threads(self):
+        """Test enrollments no longer embed every thread of the course."""
+        order_item = models.CartOrderItem.objects.create(
+            order=models.CartOrder.objects.create(student=self.users[1]),
+            course=self.course,
+            teacher=self.course.teacher,
+        )
+        enrollment = models.EnrolledCourse.objects.create(
+            course=self.course, user=self.users[1], order_item=order_item
+        )
+
+        assert "question_answer" not in EnrolledCourseSerializer(enrollment).data
+        assert enrollment.question_answer().count() == 5
+
+
+class NoteSearchTest(TestCase):
+    """Test cases for the note search index and the note listing endpoint."""
+
+    def setUp(self):
+        self.user = User.objects.create(email="student@example.com", username="student")
+        self.other = User.objects.create(email="other@example.com", username="other")
+        teacher = models.Teacher.objects.create(user=self.user, full_name="Jane Smith")
+        self.python = models.Course.objects.create(teacher=teacher, title="Python")
+        self.django = models.Course.objects.create(teacher=teacher, title="Django")
+
+    def add_note(self, course, title, text, user=None):
+        return models.Note.objects.create(
+            user=user or self.user, course=course, title=title, note=text
+        )
+
+    def search(self, **params):
+        return APIClient().get(f"/api/v1/student/notes/{self.user.id}/", params).data
+
+    def test_index_follows_save_and_delete(self):
+        """Test notes are re-indexed when their text changes and unindexed on delete."""
+        note = self.add_note(self.python, "Loops", "A for loop iterates over a list.")
+        assert set(note.tokens.values_list("token", flat=True)) == {
+            "loops",
+            "loop",
+            "iterates",
+            "over",
+            "list",
+        }
+
+        with self.assertNumQueries(1):
+            note.save()
+
+        note.note = "Generators yield values lazily."
+        note.save()
+        assert api_models_search(self.user, "loop") == []
+        assert api_models_search(self.user, "lazily generators") == [note.note_id]
+
+        note.delete()
+        assert not models.NoteToken.objects.exists()
+
+    def test_search_ranks_scopes_and_highlights(self):
+        """Test search requires every term, ranks by frequency and stays within the user and course."""
+        once = self.add_note(self.python, "Decorators", "A decorator wraps a function.")
+        twice = self.add_note(
+            self.python,
+            "Wrapping",
+            "Decorator syntax: the decorator wraps the function.",
+        )
+        self.add_note(self.python, "Functions", "A function returns a value.")
+        view = self.add_note(
+            self.django, "Views", "A view decorator wraps the view function."
+        )
+        self.add_note(self.python, "Decorators", "decorator wraps", user=self.other)
+
+        with self.assertNumQueries(2):
+            data = self.search(q="Decorator WRAPS")
+        # Ties on term frequency are broken by date, newest first.
+        assert [note["note_id"] for note in data["results"]] == [
+            twice.note_id,
+            view.note_id,
+            once.note_id,
+        ]
+        assert (
+            "<mark>decorator</mark> <mark>wraps</mark>" in data["results"][2]["snippet"]
+        )
+
+        data = self.search(q="decorator wraps", course_id=self.django.course_id)
+        assert [note["title"] for note in data["results"]] == ["Views"]
+        assert self.search(q="the")["count"] == 0
+        assert self.search(q="decorator", course_id="000000")["count"] == 0
+
+    def test_listing_is_paginated_and_enrollments_omit_notes(self):
+        """Test notes are listed newest first in pages and are not embedded in enrollments."""
+        for number in range(25):
+            self.add_note(self.python, f"Note {number}", "Text")
+
+        data = self.search(course_id=self.python.course_id)
+        assert data["count"] == 25
+        assert len(data["results"]) == 20
+        assert data["results"][0]["title"] == "Note 24"
+        assert data["results"][0]["snippet"] == "Text"
+
+        order_item = models.CartOrderItem.objects.create(
+            order=models.CartOrder.objects.create(student=self.user),
+            course=self.python,
+            teacher=self.python.teacher,
+        )
+        enrollment = models.EnrolledCourse.objects.create(
+            course=self.python, user=self.user, order_item=order_item
+        )
+        assert "note" not in EnrolledCourseSerializer(enrollment).data
+
+    def test_rebuild_command(self):
+        """Test the rebuild command restores a wiped index."""
+        note = self.add_note(self.python, "Sets", "Sets drop duplicates.")
+        models.NoteToken.objects.all().delete()
+
+        call_command("rebuild_note_index", stdout=StringIO())
+
+        assert api_models_search(self.user, "duplicates") == [note.note_id]
+
+
+def api_models_search(user, query):
+    return list(models.search_notes(user.id, query).values_list("note_id", flat=True))
+
+
+class CertificateTest(TestCase):
+    """Test cases for background certificate rendering and verification."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.settings_override = override_settings(
+            MEDIA_ROOT=media_root,
+            CERTIFICATE_SIZE=(600, 424),
+            CERTIFICATE_VERIFY_URL="https://example.com/verify/{certificate_id}",
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        certificates.template.cache_clear()
+        self.addCleanup(certificates.template.cache_clear)
+        cache.clear()
+
+        user = User.objects.create(email="teacher@example.com", username="teacher")
+        self.teacher = models.Teacher.objects.create(user=user, full_name="Jane Smith")
+        self.course = models.Course.objects.create(teacher=self.teacher, title="Django")
+        variant = models.Variant.objects.create(course=self.course, title="Intro")
+        self.items = [
+            models.VariantItem.objects.create(variant=variant, title=f"Lecture {i}")
+            for i in range(2)
+        ]
+        self.order = models.CartOrder.objects.create()
+
+    def enroll(self, name):
+        student = User.objects.create(
+            email=f"{name}@example.com", username=name, full_name=name.title()
+        )
+        order_item = models.CartOrderItem.objects.create(
+            order=self.order, course=self.course, teacher=self.teacher
+        )
+        models.EnrolledCourse.objects.create(
+            course=self.course,
+            user=student,
+            teacher=self.teacher,
+            order_item=order_item,
+        )
+        return student
+
+    def test_completing_course_issues_and_renders_certificate(self):
+        """Test the last completed lecture issues one certificate, rendered by a job."""
+        student = self.enroll("ada")
+        models.CompletedLesson.objects.create(
+            course=self.course, user=student, variant_item=self.items[0]
+        )
+        assert not models.Certificate.objects.exists()
+
+        models.CompletedLesson.objects.create(
+            course=self.course, user=student, variant_item=self.items[1]
+        )
+        assert models.Certificate.objects.filter(user=student).count() == 1
+        assert jobs.run_pending(kinds=["render_certificate"]) == 1
+
+        certificate = models.Certificate.objects.get(user=student)
+        assert (
+            certificate.image.name == f"certificates/{certificate.certificate_id}.png"
+        )
+        with certificate.image.open("rb") as image_file:
+            assert Image.open(image_file).size == (600, 424)
+        with certificate.pdf.open("rb") as pdf_file:
+            assert pdf_file.read(5) == b"%PDF-"
+
+        # Completing again (e.g. after un-completing a lecture) issues nothing new.
+        models.CompletedLesson.objects.filter(variant_item=self.items[1]).delete()
+        models.CompletedLesson.objects.create(
+            course=self.course, user=student, variant_item=self.items[1]
+        )
+        assert models.Certificate.objects.filter(user=student).count() == 1
+        assert not Job.objects.filter(status="Pending").exists()
+
+    def test_generate_certificates_renders_a_cohort(self):
+        """Test the command issues certificates for every graduate and renders them."""
+        graduates = [self.enroll(name) for name in ("ada", "grace", "alan")]
+        dropout = self.enroll("bob")
+        completed = [
+            models.CompletedLesson(course=self.course, user=student, variant_item=item)
+            for student in graduates
+            for item in self.items
+        ]
+        completed.append(
+            models.CompletedLesson(
+                course=self.course, user=dropout, variant_item=self.items[0]
+            )
+        )
+        # bulk_create bypasses the completion signals, as an import would.
+        models.CompletedLesson.objects.bulk_create(completed)
+        models.rebuild_enrollment_progress(models.EnrolledCourse.objects.all())
+        assert not models.Certificate.objects.exists()
+
+        call_command(
+            "generate_certificates",
+            self.course.course_id,
+            "--render",
+            stdout=StringIO(),
+        )
+
+        certificates_by_user = {
+            certificate.user_id: certificate
+            for certificate in models.Certificate.objects.all()
+        }
+        assert set(certificates_by_user) == {student.id for student in graduates}
+        assert all(certificate.pdf for certificate in certificates_by_user.values())
+
+    def test_verify_is_cached(self):
+        """Test verification is served from the cache and reflects the finished render."""
+        student = self.enroll("ada")
+        certificate = models.Certificate.objects.create(
+            course=self.course, user=student
+        )
+        client = APIClient()
+        url = f"/api/v1/certificate/verify/{certificate.certificate_id}/"
+
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.data["student"] == "Ada"
+        assert response.data["course"] == "Django"
+        assert response.data["teacher"] == "Jane Smith"
+        assert response.data["pdf"] is None
+        with self.assertNumQueries(0):
+            assert client.get(url).status_code == 200
+
+        jobs.run_pending(kinds=["render_certificate"])
+        response = client.get(url)
+        assert response.data["pdf"].startswith("/media/certificates/")
+
+        assert client.get("/api/v1/certificate/verify/000000/").status_code == 404
+        with self.assertNumQueries(0):
+            assert client.get("/api/v1/certificate/verify/000000/").status_code == 404
+
+
+class TeacherStatsTest(TestCase):
+    """Test cases for the teachers' daily revenue and enrollment rollups."""
+
+    def setUp(self):
+        self.student = User.objects.create(
+            email="student@example.com", username="student"
+        )
+        user = User.objects.create(email="teacher@example.com", username="teacher")
+        self.teacher = models.Teacher.objects.create(user=user, full_name="Jane Smith")
+        self.courses = [
+            models.Course.objects.create(teacher=self.teacher, title=f"Course {number}")
+            for number in range(2)
+        ]
+        self.today = timezone.localdate()
+
+    def order(self, prices, days_ago=0, paid=True):
+        date = timezone.now() - timedelta(days=days_ago)
+        order = models.CartOrder.objects.create(student=self.student, date=date)
+        for course, price in zip(self.courses, prices):
+            item = models.CartOrderItem.objects.create(
+                order=order, course=course, teacher=self.teacher, total=price, date=date
+            )
+            models.EnrolledCourse.objects.create(
+                course=course,
+                user=self.student,
+                teacher=self.teacher,
+                order_item=item,
+                date=date,
+            )
+        if paid:
+            order.payment_status = "Paid"
+            order.save()
+        return order
+
+    def stats(self):
+        return sorted(
+            models.TeacherDailyStats.objects.filter(
+                Q(sales__gt=0) | Q(students__gt=0)
+            ).values_list("course_id", "day", "revenue", "sales", "students")
+        )
+
+    def test_rollups_follow_payments_and_match_rebuild(self):
+        """Test paying, reverting and adding items keep rollups equal to a full rebuild."""
+        self.order(["10.00", "20.00"])
+        self.order(["5.50"], days_ago=3)
+        unpaid = self.order(["99.00"], paid=False)
+        refunded = self.order(["7.00"])
+        refunded.payment_status = "Failed"
+        refunded.save()
+
+        today = models.TeacherDailyStats.objects.get(
+            course=self.courses[0], day=self.today
+        )
+        assert today.revenue == Decimal("10.00")
+        assert today.sales == 1
+        assert today.students == 3
+
+        # An item added to a paid order counts without another status change.
+        paid = models.CartOrder.objects.filter(payment_status="Paid").first()
+        models.CartOrderItem.objects.create(
+            order=paid, course=self.courses[1], teacher=self.teacher, total="1.00"
+        )
+        unpaid.payment_status = "Paid"
+        unpaid.save()
+
+        incremental = self.stats()
+        call_command("rebuild_teacher_stats", stdout=StringIO())
+        assert self.stats() == incremental
+
+        # Reconciling repairs changes that bypassed the signals.
+        models.CartOrder.objects.filter(pk=unpaid.pk).update(payment_status="Failed")
+        call_command("rebuild_teacher_stats", "--days", "2", stdout=StringIO())
+        today = models.TeacherDailyStats.objects.get(
+            course=self.courses[0], day=self.today
+        )
+        assert today.revenue == Decimal("10.00")
+        assert today.sales == 1
+
+    def test_rebuild_corrects_rows_in_place(self):
+        """Test a rebuild updates drifted rows without replacing them and recreates missing ones."""
+        self.order(["10.00"])
+        self.order(["5.00"], days_ago=3)
+        row = models.TeacherDailyStats.objects.get(
+            course=self.courses[0], day=self.today
+        )
+        models.TeacherDailyStats.objects.filter(pk=row.pk).update(revenue=0, sales=9)
+        models.TeacherDailyStats.objects.filter(day__lt=self.today).delete()
+
+        written = models.rebuild_teacher_stats()
+
+        assert written == 2
+        rebuilt = models.TeacherDailyStats.objects.get(
+            course=self.courses[0], day=self.today
+        )
+        assert rebuilt.pk == row.pk
+        assert (rebuilt.revenue, rebuilt.sales) == (Decimal("10.00"), 1)
+        assert models.TeacherDailyStats.objects.filter(day__lt=self.today).count() == 1
+        assert models.rebuild_teacher_stats() == 0
+
+    def test_stats_endpoint_sums_rollups(self):
+        """Test the endpoint returns range totals and series from a single query."""
+        self.order(["10.00", "20.00"])
+        self.order(["5.00", "1.00"], days_ago=3)
+        self.order(["40.00"], days_ago=40)
+        client = APIClient()
+        url = f"/api/v1/teacher/stats/{self.teacher.id}/"
+
+        with self.assertNumQueries(1):
+            response = client.get(url)
+        assert response.status_code == 200
+        assert Decimal(response.data["revenue"]) == Decimal("36.00")
+        assert response.data["sales"] == 4
+        assert response.data["students"] == 4
+        assert [period["period"] for period in response.data["periods"]] == [
+            str(self.today - timedelta(days=3)),
+            str(self.today),
+        ]
+
+        start = self.today - timedelta(days=60)
+        response = client.get(
+            url,
+            {
+                "start": str(start),
+                "interval": "month",
+                "course_id": self.courses[0].course_id,
+            },
+        )
+        assert Decimal(response.data["revenue"]) == Decimal("55.00")
+        assert response.data["sales"] == 3
+        assert all(
+            period["period"].endswith("-01") for period in response.data["periods"]
+        )
+
+        assert client.get(url, {"start": "2024-02-30"}).status_code == 400
+        assert (
+            client.get(url, {"start": str(self.today + timedelta(days=1))}).status_code
+            == 400
+        )
+        assert client.get(url, {"start": "2000-01-01"}).status_code == 400
+
+
+class TeacherStudentListTest(TestCase):
+    """Test cases for the deduplicated, cursor-paginated teacher roster."""
+
+    def setUp(self):
+        user = User.objects.create(email="teacher@example.com", username="teacher")
+        self.teacher = models.Teacher.objects.create(user=user, full_name="Jane Smith")
+        user = User.objects.create(email="other@example.com", username="other")
+        other = models.Teacher.objects.create(user=user, full_name="John Doe")
+        self.courses = [
+            models.Course.objects.create(teacher=self.teacher, title=f"Course {number}")
+            for number in range(3)
+        ]
+        other_course = models.Course.objects.create(teacher=other, title="Other course")
+        self.order = models.CartOrder.objects.create()
+
+        self.students = [
+            User.objects.create(
+                email=f"student{number}@example.com",
+                username=f"student{number}",
+                full_name=f"Student {number}",
+            )
+            for number in range(3)
+        ]
+        now = timezone.now()
+        # Student 0 bought every course, student 1 one course, student 2 only
+        # another teacher's course.
+        for days_ago, course in zip((10, 5, 1), self.courses):
+            self.enroll(self.students[0], course, now - timedelta(days=days_ago))
+        self.enroll(self.students[1], self.courses[1], now - timedelta(days=3))
+        self.enroll(self.students[2], other_course, now)
+
+    def enroll(self, student, course, date):
+        order_item = models.CartOrderItem.objects.create(
+            order=self.order, course=course, teacher=course.teacher
+        )
+        models.EnrolledCourse.objects.create(
+            course=course,
+            user=student,
+            teacher=course.teacher,
+            order_item=order_item,
+            date=date,
+        )
+
+    def test_roster_lists_each_student_once_with_courses(self):
+        """Test students appear once with their courses, newest buyer first, in three queries."""
+        with self.assertNumQueries(3):
+            response = APIClient().get(f"/api/v1/teacher/students/{self.teacher.id}/")
+
+        assert response.status_code == 200
+        students = response.data["results"]
+        assert [student["user_id"] for student in students] == [
+            self.students[1].id,
+            self.students[0].id,
+        ]
+        assert students[1]["course_count"] == 3
+        assert [course["title"] for course in students[1]["courses"]] == [
+            "Course 0",
+            "Course 1",
+            "Course 2",
+        ]
+        assert students[0]["profile"]["user"] == self.students[1].id
+
+    def test_roster_is_cursor_paginated(self):
+        """Test cursor pages walk the roster without repeating students."""
+        client = APIClient()
+        first = client.get(
+            f"/api/v1/teacher/students/{self.teacher.id}/", {"page_size": 1}
+        ).data
+        second = client.get(first["next"]).data
+
+        assert [first["results"][0]["user_id"], second["results"][0]["user_id"]] == [
+            self.students[1].id,
+            self.students[0].id,
+        ]
+        assert second["next"] is None
+
+    def test_roster_rows_follow_enrollments(self):
+        """Test the roster keeps the first purchase and count as enrollments come and go."""
+        roster = models.TeacherStudent.objects.get(
+            teacher=self.teacher, user=self.students[0]
+        )
+        first = models.EnrolledCourse.objects.filter(user=self.students[0]).order_by(
+            "date"
+        )
+        assert roster.course_count == 3
+        assert roster.first_purchase == first[0].date
+
+        first[0].delete()
+        roster.refresh_from_db()
+        assert roster.course_count == 2
+        assert roster.first_purchase == first[0].date
+
+        models.EnrolledCourse.objects.filter(user=self.students[1]).delete()
+        assert not models.TeacherStudent.objects.filter(user=self.students[1]).exists()
+        assert not models.TeacherStudent.objects.filter(
+            teacher=self.teacher, user=self.students[2]
+        ).exists()
+
+    def test_roster_pages_students_sharing_a_first_purchase(self):
+        """Test cursors walk students who bought at the same instant once each."""
+        moment = timezone.now()
+        buyers = [
+            User.objects.create(
+                email=f"buyer{number}@example.com", username=f"buyer{number}"
+            )
+            for number in range(5)
+        ]
+        for buyer in buyers:
+            self.enroll(buyer, self.courses[0], moment)
+
+        client = APIClient()
+        response = client.get(
+            f"/api/v1/teacher/students/{self.teacher.id}/", {"page_size": 2}
+        )
+        seen = [student["user_id"] for student in response.data["results"]]
+        while response.data["next"]:
+            response = client.get(response.data["next"])
+            seen += [student["user_id"] for student in response.data["results"]]
+
+        assert seen == [buyer.id for buyer in reversed(buyers)] + [
+            self.students[1].id,
+            self.students[0].id,
+        ]
+
+    def test_teacher_serializer_does_not_inline_roster(self):
+        """Test teacher payloads no longer embed the order items of every student."""
+        assert "students" not in TeacherSerializer(self.teacher).data
+
+
+class NotificationCounterTest(TestCase):
+    """Test cases for notification fan-out and the maintained unread counters."""
+
+    def setUp(self):
+        self.student = User.objects.create(
+            email="student@example.com", username="student"
+        )
+        user = User.objects.create(email="teacher@example.com", username="teacher")
+        self.teacher = models.Teacher.objects.create(user=user, full_name="Jane Smith")
+        self.courses = [
+            models.Course.objects.create(teacher=self.teacher, title=f"Course {number}")
+            for number in range(2)
+        ]
+
+    def unread(self):
+        return (
+            models.unread_count(user_id=self.student.id),
+            models.unread_count(teacher_id=self.teacher.id),
+        )
+
+    def test_orders_reviews_and_questions_fan_out(self):
+        """Test paid orders, reviews and questions notify and count for their recipients."""
+        order = models.CartOrder.objects.create(student=self.student)
+        for course in self.courses:
+            models.CartOrderItem.objects.create(
+                order=order, course=course, teacher=self.teacher
+            )
+        order.payment_status = "Paid"
+        with CaptureQueriesContext(connection) as queries:
+            order.save()
+        inserts = [
+            query
+            for query in queries.captured_queries
+            if query["sql"].startswith('INSERT INTO "api_notification"')
+        ]
+        assert len(inserts) == 1
+        assert self.unread() == (1, 2)
+
+        models.Review.objects.create(
+            course=self.courses[0], user=self.student, review="Great", rating=5
+        )
+        models.QuestionAnswer.objects.create(
+            course=self.courses[0], user=self.student, title="How?"
+        )
+        assert self.unread() == (1, 4)
+        assert set(
+            models.Notification.objects.filter(teacher=self.teacher).values_list(
+                "type", flat=True
+            )
+        ) == {"New Order", "New Review", "New Course Question"}
+
+        # Saving a notification as seen (or deleting an unseen one) updates the badge.
+        notification = models.Notification.objects.filter(user=self.student).get()
+        notification.seen = True
+        notification.save()
+        models.Notification.objects.filter(type="New Review").get().delete()
+        assert self.unread() == (0, 3)
+
+    def test_mark_all_seen_and_endpoints(self):
+        """Test badges are one query, mark-all-seen resets them, and lists are cursor paginated."""
+        moment = timezone.now()
+        models.notify(
+            [
+                models.Notification(
+                    user=self.student, type="Course Published", date=moment
+                )
+                for _ in range(3)
+            ]
+        )
+        client = APIClient()
+        url = f"/api/v1/student/notifications/{self.student.id}/"
+
+        with self.assertNumQueries(1):
+            assert client.get(f"{url}unread/").data == {"unread": 3}
+
+        page = client.get(url, {"page_size": 2}).data
+        assert len(page["results"]) == 2
+        rest = client.get(page["next"]).data["results"]
+        ids = [notification["id"] for notification in page["results"] + rest]
+        assert ids == sorted(
+            models.Notification.objects.filter(user=self.student).values_list(
+                "id", flat=True
+            ),
+            reverse=True,
+        )
+
+        response = client.post(f"{url}seen/")
+        assert response.data["seen"] == 3
+        assert client.get(f"{url}unread/").data == {"unread": 0}
+        assert client.get(url, {"unseen": 1}).data["results"] == []
+
+        teacher_url = f"/api/v1/teacher/notifications/{self.teacher.id}/unread/"
+        assert client.get(teacher_url).data == {"unread": 0}
+
+
+class ReviewModerationTest(TestCase):
+    """Test cases for bulk review moderation and the stored course ratings."""
+
+    def setUp(self):
+        self.student = User.objects.create(
+            email="student@example.com", username="student"
+        )
+        user = User.objects.create(email="teacher@example.com", username="teacher")
+        self.teacher = models.Teacher.objects.create(user=user, full_name="Jane Smith")
+        self.courses = [
+            models.Course.objects.create(teacher=self.teacher, title=f"Course {number}")
+            for number in range(20)
+        ]
+
+    def test_single_review_changes_update_ratings(self):
+        """Test saving and deleting a review refresh its course's rating."""
+        course = self.courses[0]
+        review = models.Review.objects.create(
+            course=course, user=self.student, review="Good", rating=4, active=True
+        )
+        models.Review.objects.create(
+            course=course, user=self.student, review="Meh", rating=2
+        )
+        course.refresh_from_db()
+        assert (course.rating_count(), course.average_rating()) == (1, 4)
+
+        review.rating = 5
+        review.save()
+        course.refresh_from_db()
+        assert course.average_rating() == 5
+
+        review.delete()
+        course.refresh_from_db()
+        assert (course.rating_count(), course.average_rating()) == (0, None)
+
+    def test_bulk_moderation_is_constant_queries(self):
+        """Test moderating thousands of reviews is one UPDATE and one grouped rating refresh."""
+        models.Review.objects.bulk_create(
+            models.Review(
+                course=self.courses[number % 20],
+                user=self.student,
+                review=f"Review {number}",
+                rating=number % 5 + 1,
+            )
+            for number in range(3000)
+        )
+        review_ids = list(models.Review.objects.values_list("id", flat=True))
+        client = APIClient()
+        client.force_authenticate(self.teacher.user)
+
+        with self.assertNumQueries(6):
+            response = client.post(
+                "/api/v1/review/moderate/",
+                {"review_ids": review_ids, "action": "approve"},
+                format="json",
+            )
+        assert response.data["updated"] == 3000
+        course = models.Course.objects.get(pk=self.courses[0].pk)
+        assert course.rating_count() == 150
+        assert course.average_rating() == 1
+
+        rejected = models.Review.objects.filter(course=self.courses[0]).values_list(
+            "id", flat=True
+        )
+        client.post(
+            "/api/v1/review/moderate/",
+            {"review_ids": list(rejected), "action": "reject", "reply": "Spam"},
+            format="json",
+        )
+        course.refresh_from_db()
+        assert course.rating_count() == 0
+        assert models.Review.objects.filter(reply="Spam").count() == 150
+        assert models.Course.objects.get(pk=self.courses[1].pk).rating_count() == 150
+
+    def test_admin_reply_action_asks_for_the_reply(self):
+        """Test the admin reply action shows a form, then replies to the selection."""
+        reviews = [
+            models.Review.objects.create(
+                course=course, user=self.student, review="Good", rating=4
+            )
+            for course in self.courses[:2]
+        ]
+        staff = User.objects.create(
+            email="staff@example.com",
+            username="staff",
+            is_staff=True,
+            is_superuser=True,
+        )
+        self.client.force_login(staff)
+        url = "/admin/api/review/"
+        selection = {
+            "action": "reply_reviews",
+            "_selected_action": [review.pk for review in reviews],
+        }
+
+        response = self.client.post(url, selection)
+        assert response.status_code == 200
+        assert 'name="reply"' in response.content.decode()
+        assert not models.Review.objects.exclude(reply=None).exists()
+
+        response = self.client.post(
+            url, {**selection, "apply": "1", "reply": "Thanks!"}
+        )
+        assert response.status_code == 302
+        assert models.Review.objects.filter(reply="Thanks!").count() == 2
+
+    def test_moderation_is_scoped_and_validated(self):
+        """Test only teachers and staff moderate, teachers only their courses, and bad input is a 400."""
+        review = models.Review.objects.create(
+            course=self.courses[0], user=self.student, review="Good", rating=4
+        )
+        payload = {"review_ids": [review.id], "action": "approve"}
+        url = "/api/v1/review/moderate/"
+        client = APIClient()
+        assert client.post(url, payload, format="json").status_code == 403
+
+        client.force_authenticate(self.student)
+        assert client.post(url, payload, format="json").status_code == 403
+
+        other = User.objects.create(email="other@example.com", username="other")
+        models.Teacher.objects.create(user=other, full_name="John Doe")
+        client.force_authenticate(other)
+        assert client.post(url, payload, format="json").data["updated"] == 0
+
+        client.force_authenticate(self.teacher.user)
+        response = client.post(
+            url, {"review_ids": ["x"], "action": "approve"}, format="json"
+        )
+        assert response.status_code == 400
+        assert "review_ids" in response.data
+        response = client.post(
+            url, {"review_ids": [review.id], "action": "reply"}, format="json"
+        )
+        assert response.status_code == 400
+        assert "reply" in response.data
+        response = client.post(
+            url, {"review_ids": [review.id], "action": "delete"}, format="json"
+        )
+        assert response.status_code == 400
+
+        staff = User.objects.create(
+            email="staff@example.com", username="staff", is_staff=True
+        )
+        client.force_authenticate(staff)
+        assert client.post(url, payload, format="json").data["updated"] == 1
+        course = models.Course.objects.get(pk=self.courses[0].pk)
+        assert (course.rating_count(), course.average_rating()) == (1, 4)
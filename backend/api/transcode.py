@@ -0,0 +1,278 @@
+import os
+import re
+import subprocess
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+
+from api.media import local_copy
+
+try:
+    import resource
+except ImportError:  # Not available on Windows.
+    resource = None
+
+
+class TranscodeError(Exception):
+    """Raised when a lecture file cannot be packaged for streaming."""
+
+
+class NotAVideoError(TranscodeError):
+    """Raised when a lecture file has no video stream (slides, PDFs, audio)."""
+
+
+def ffmpeg_exe():
+    import imageio_ffmpeg
+
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def limit_resources():
+    """
+    Caps the CPU time of an ffmpeg child process and lowers its priority.
+
+    Runs in the child between fork and exec, so a runaway encode is killed by the
+    kernel once it has used `HLS_CPU_SECONDS_LIMIT` seconds of CPU.
+    """
+    limit = settings.HLS_CPU_SECONDS_LIMIT
+    resource.setrlimit(resource.RLIMIT_CPU, (limit, limit))
+    os.nice(10)
+
+
+def run_ffmpeg(arguments):
+    """
+    Runs the bundled ffmpeg binary with the per-job resource limits.
+
+    Args:
+        arguments (list): Arguments after the executable.
+
+    Returns:
+        CompletedProcess: The finished process.
+    """
+    try:
+        result = subprocess.run(
+            [ffmpeg_exe(), "-hide_banner", "-nostdin", *arguments],
+            capture_output=True,
+            text=True,
+            preexec_fn=limit_resources if resource else None,
+            timeout=settings.HLS_CPU_SECONDS_LIMIT * 4,
+        )
+    except subprocess.TimeoutExpired:
+        raise TranscodeError("ffmpeg timed out.")
+
+    return result
+
+
+def inspect(path):
+    """
+    Reads the video height, duration and audio presence of a file from ffmpeg's stream summary.
+
+    Args:
+        path (str): Path of the media file.
+
+    Returns:
+        dict: {"height": int, "duration": float, "audio": bool}.
+    """
+    stderr = run_ffmpeg(["-i", path]).stderr
+    video = re.search(r"Stream #.*?Video: .*?, (\d{2,5})x(\d{2,5})", stderr)
+    if not video:
+        raise NotAVideoError(f"'{path}' has no video stream.")
+    duration = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", stderr)
+    hours, minutes, seconds = duration.groups() if duration else (0, 0, 0)
+
+    return {
+        "height": int(video.group(2)),
+        "duration": int(hours) * 3600 + int(minutes) * 60 + float(seconds),
+        "audio": bool(re.search(r"Stream #.*?Audio:", stderr)),
+    }
+
+
+def renditions_for(height):
+    """
+    Returns the ladder rungs worth encoding for a source `height` pixels tall.
+
+    Rungs taller than the source are dropped (upscaling only wastes bandwidth);
+    the smallest rung is always kept.
+
+    Args:
+        height (int): Height of the source video.
+
+    Returns:
+        list: (height, video kbit/s) tuples from `HLS_RENDITIONS`.
+    """
+    ladder = sorted(settings.HLS_RENDITIONS)
+    renditions = [rung for rung in ladder if rung[0] <= height]
+
+    return renditions or ladder[:1]
+
+
+def encode_hls(source, output_dir, streams):
+    """
+    Encodes every rendition in one ffmpeg run, decoding the source only once.
+
+    Segments start on fixed keyframes so players can switch renditions at any
+    segment boundary. Writes `master.m3u8` plus one `<height>p/` playlist and
+    segment set per rendition into `output_dir`.
+
+    Args:
+        source (str): Path of the source video.
+        output_dir (str): Directory receiving the playlists and segments.
+        streams (dict): The result of `inspect(source)`.
+    """
+    renditions = renditions_for(streams["height"])
+    segment = settings.HLS_SEGMENT_SECONDS
+
+    split = f"[0:v]split={len(renditions)}" + "".join(
+        f"[v{index}]" for index in range(len(renditions))
+    )
+    scales = [
+        f"[v{index}]scale=-2:{height}[v{index}out]"
+        for index, (height, _) in enumerate(renditions)
+    ]
+    arguments = [
+        "-y",
+        "-i",
+        source,
+        "-threads",
+        str(settings.HLS_FFMPEG_THREADS),
+        "-filter_complex",
+        ";".join([split, *scales]),
+    ]
+    stream_map = []
+    for index, (height, bitrate) in enumerate(renditions):
+        arguments += [
+            "-map",
+            f"[v{index}out]",
+            f"-c:v:{index}",
+            "libx264",
+            f"-b:v:{index}",
+            f"{bitrate}k",
+            f"-maxrate:v:{index}",
+            f"{int(bitrate * 1.1)}k",
+            f"-bufsize:v:{index}",
+            f"{bitrate * 2}k",
+        ]
+        entry = f"v:{index}"
+        if streams["audio"]:
+            arguments += [
+                "-map",
+                "0:a:0",
+                f"-c:a:{index}",
+                "aac",
+                f"-b:a:{index}",
+                "96k",
+            ]
+            entry += f",a:{index}"
+        stream_map.append(f"{entry},name:{height}p")
+
+    arguments += [
+        "-preset",
+        "veryfast",
+        "-profile:v",
+        "main",
+        "-pix_fmt",
+        "yuv420p",
+        "-force_key_frames",
+        f"expr:gte(t,n_forced*{segment})",
+        "-sc_threshold",
+        "0",
+        "-f",
+        "hls",
+        "-hls_time",
+        str(segment),
+        "-hls_playlist_type",
+        "vod",
+        "-hls_segment_filename",
+        os.path.join(output_dir, "%v", "segment_%04d.ts"),
+        "-master_pl_name",
+        "master.m3u8",
+        "-var_stream_map",
+        " ".join(stream_map),
+        os.path.join(output_dir, "%v", "index.m3u8"),
+    ]
+
+    result = run_ffmpeg(arguments)
+    if result.returncode != 0:
+        raise TranscodeError(result.stderr[-2000:])
+
+
+def extract_poster(source, path, duration):
+    """
+    Writes a JPEG poster frame taken a little into the video.
+
+    Args:
+        source (str): Path of the source video.
+        path (str): Path of the JPEG to write.
+        duration (float): Duration of the video in seconds.
+    """
+    offset = min(duration * 0.1, 5.0)
+    result = run_ffmpeg(
+        [
+            "-y",
+            "-ss",
+            f"{offset:.2f}",
+            "-i",
+            source,
+            "-frames:v",
+            "1",
+            "-vf",
+            f"scale=-2:min(ih\\,{max(height for height, _ in settings.HLS_RENDITIONS)})",
+            "-q:v",
+            "4",
+            path,
+        ]
+    )
+    if result.returncode != 0 or not os.path.exists(path):
+        raise TranscodeError(result.stderr[-2000:])
+
+
+def package(field_file, content_hash):
+    """
+    Builds the HLS ladder and poster of a lecture file in its storage.
+
+    Output is stored under `hls/<content_hash>/`, so identical uploads share one
+    package and a package that already exists is not encoded again. The master
+    playlist is stored last, so its presence means the package is complete.
+
+    Args:
+        field_file (FieldFile): The stored lecture video.
+        content_hash (str): SHA-256 of the video.
+
+    Returns:
+        dict: {"manifest": storage name of master.m3u8, "poster": storage name of the poster}.
+
+    Raises:
+        NotAVideoError: If the file has no video stream.
+        TranscodeError: If ffmpeg fails.
+    """
+    storage = field_file.storage
+    prefix = f"hls/{content_hash}"
+    names = {"manifest": f"{prefix}/master.m3u8", "poster": f"{prefix}/poster.jpg"}
+    if all(storage.exists(name) for name in names.values()):
+        return names
+
+    with tempfile.TemporaryDirectory() as workdir, local_copy(
+        storage, field_file.name
+    ) as source:
+        streams = inspect(source)
+        output_dir = os.path.join(workdir, "hls")
+        encode_hls(source, output_dir, streams)
+        extract_poster(
+            source, os.path.join(output_dir, "poster.jpg"), streams["duration"]
+        )
+
+        relative_paths = sorted(
+            os.path.relpath(os.path.join(directory, filename), output_dir)
+            for directory, _, filenames in os.walk(output_dir)
+            for filename in filenames
+        )
+        relative_paths.remove("master.m3u8")
+        for relative_path in [*relative_paths, "master.m3u8"]:
+            name = f"{prefix}/{relative_path.replace(os.sep, '/')}"
+            if storage.exists(name):
+                storage.delete(name)
+            with open(os.path.join(output_dir, relative_path), "rb") as output:
+                storage.save(name, File(output))
+
+    return names
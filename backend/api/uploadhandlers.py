@@ -0,0 +1,40 @@
+import hashlib
+
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler,
+    TemporaryFileUploadHandler,
+)
+
+
+class ContentHashMixin:
+    """
+    Computes the SHA-256 of an upload while it streams through the handler.
+
+    The hex digest is attached to the resulting file as `content_hash`, which
+    `VariantItem.save` uses to look up cached media metadata.
+    """
+
+    def new_file(self, *args, **kwargs):
+        self.hasher = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        data = super().receive_data_chunk(raw_data, start)
+        if data is None:
+            # This handler stored the chunk, so it is the one that sees every byte.
+            self.hasher.update(raw_data)
+        return data
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.content_hash = self.hasher.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(ContentHashMixin, MemoryFileUploadHandler):
+    """Keeps small uploads in memory and records their content hash."""
+
+
+class HashingTemporaryFileUploadHandler(ContentHashMixin, TemporaryFileUploadHandler):
+    """Streams large uploads to a temporary file and records their content hash."""
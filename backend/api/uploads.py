@@ -0,0 +1,292 @@
+import base64
+import binascii
+import hashlib
+import io
+import os
+import shutil
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, transaction
+
+from api import models as api_models
+
+
+class UploadError(Exception):
+    """Raised when a chunk or an upload is invalid; `status` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+READ_SIZE = 64 * 1024
+
+
+def parse_checksum(header):
+    """
+    Parses an `Upload-Checksum: sha256 <digest>` header.
+
+    The digest may be base64 (as in the tus protocol) or hex encoded.
+
+    Args:
+        header (str): The header value.
+
+    Returns:
+        str: The hex SHA-256 digest.
+    """
+    algorithm, _, digest = (header or "").strip().partition(" ")
+    if algorithm.lower() != "sha256" or not digest:
+        raise UploadError("Upload-Checksum must be 'sha256 <digest>'.")
+
+    digest = digest.strip()
+    if len(digest) == 64:
+        return digest.lower()
+    try:
+        return base64.b64decode(digest, validate=True).hex()
+    except (binascii.Error, ValueError):
+        raise UploadError("Upload-Checksum digest is not valid base64 or hex.")
+
+
+def create_session(user, filename, size, chunk_size=None):
+    """
+    Starts a resumable upload.
+
+    The upload may be at most `CHUNKED_UPLOAD_MAX_SIZE` bytes in at most
+    `CHUNKED_UPLOAD_MAX_CHUNKS` chunks, each between
+    `CHUNKED_UPLOAD_MIN_CHUNK_SIZE` (or the whole file, if smaller) and
+    `CHUNKED_UPLOAD_MAX_CHUNK_SIZE` bytes.
+
+    Args:
+        user (User): The user starting the upload; only they can send its chunks.
+        filename (str): The original file name.
+        size (int): Total size in bytes.
+        chunk_size (int, optional): Defaults to `CHUNKED_UPLOAD_CHUNK_SIZE`.
+
+    Returns:
+        UploadSession: The new session.
+    """
+    chunk_size = chunk_size or settings.CHUNKED_UPLOAD_CHUNK_SIZE
+    if size <= 0:
+        raise UploadError("size must be positive.")
+    if size > settings.CHUNKED_UPLOAD_MAX_SIZE:
+        raise UploadError(
+            f"size must be at most {settings.CHUNKED_UPLOAD_MAX_SIZE} bytes.",
+            status=413,
+        )
+    minimum = min(settings.CHUNKED_UPLOAD_MIN_CHUNK_SIZE, size)
+    if not minimum <= chunk_size <= settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE:
+        raise UploadError(
+            f"chunk_size must be between {minimum} and {settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE}."
+        )
+    if -(-size // chunk_size) > settings.CHUNKED_UPLOAD_MAX_CHUNKS:
+        raise UploadError(
+            f"chunk_size must be at least {-(-size // settings.CHUNKED_UPLOAD_MAX_CHUNKS)} "
+            f"to send {size} bytes in {settings.CHUNKED_UPLOAD_MAX_CHUNKS} chunks."
+        )
+
+    return api_models.UploadSession.objects.create(
+        user=user,
+        filename=os.path.basename(filename),
+        size=size,
+        chunk_size=chunk_size,
+    )
+
+
+def write_chunk(session, index, stream, length, checksum):
+    """
+    Streams one chunk to disk, verifying its length and SHA-256.
+
+    Chunks may arrive in any order and may be re-sent; a verified chunk replaces
+    any earlier copy atomically. Only `READ_SIZE` bytes are held in memory.
+
+    Args:
+        session (UploadSession): The upload.
+        index (int): Zero-based chunk position.
+        stream (file): The request body stream.
+        length (int): The Content-Length of the request.
+        checksum (str): Expected hex SHA-256 of the chunk.
+
+    Returns:
+        UploadChunk: The recorded chunk.
+    """
+    if session.status != "Uploading":
+        raise UploadError("The upload is already complete.", status=409)
+    if not 0 <= index < session.chunk_count():
+        raise UploadError(
+            f"Chunk index must be between 0 and {session.chunk_count() - 1}."
+        )
+    if length != session.chunk_length(index):
+        raise UploadError(
+            f"Chunk {index} must be {session.chunk_length(index)} bytes, got {length}."
+        )
+
+    os.makedirs(session.part_dir(), exist_ok=True)
+    temporary_path = f"{session.part_path(index)}.{uuid.uuid4().hex}.tmp"
+    digest = hashlib.sha256()
+    received = 0
+    try:
+        with open(temporary_path, "wb") as part:
+            while received < length:
+                data = stream.read(min(READ_SIZE, length - received))
+                if not data:
+                    break
+                digest.update(data)
+                part.write(data)
+                received += len(data)
+
+        if received != length:
+            raise UploadError(f"Chunk {index} ended after {received} bytes.")
+        if digest.hexdigest() != checksum:
+            # 460 is the tus protocol's "Checksum Mismatch" status.
+            raise UploadError(f"Chunk {index} does not match its checksum.", status=460)
+
+        os.replace(temporary_path, session.part_path(index))
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+    try:
+        with transaction.atomic():
+            chunk, _ = api_models.UploadChunk.objects.update_or_create(
+                session=session,
+                index=index,
+                defaults={"size": length, "checksum": checksum},
+            )
+    except IntegrityError:
+        # A concurrent retry of the same chunk recorded it first.
+        chunk = api_models.UploadChunk.objects.get(session=session, index=index)
+
+    return chunk
+
+
+def missing_chunks(session):
+    """
+    Returns the chunks that have not been received yet, as ranges.
+
+    Args:
+        session (UploadSession): The upload.
+
+    Returns:
+        list: Sorted `[first, last]` index ranges, both inclusive.
+    """
+    missing = []
+    expected = 0
+    for index in session.chunks.order_by("index").values_list("index", flat=True):
+        if index > expected:
+            missing.append([expected, index - 1])
+        expected = index + 1
+    if expected < session.chunk_count():
+        missing.append([expected, session.chunk_count() - 1])
+
+    return missing
+
+
+class ChunkedUploadFile(io.RawIOBase):
+    """
+    Reads the received chunks of an upload back as one continuous stream.
+
+    Args:
+        paths (list): Chunk file paths in order.
+        size (int): Total size in bytes.
+    """
+
+    def __init__(self, paths, size):
+        super().__init__()
+        self.paths = list(paths)
+        self.size = size
+        self.current = None
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while True:
+            if self.current is None:
+                if not self.paths:
+                    return 0
+                self.current = open(self.paths.pop(0), "rb")
+            read = self.current.readinto(buffer)
+            if read:
+                return read
+            self.current.close()
+            self.current = None
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+            self.current = None
+        super().close()
+
+
+def assemble(session):
+    """
+    Returns the received chunks as one `File` carrying its SHA-256.
+
+    The chunks are hashed in one streaming pass before anything is written, so
+    `VariantItem.save` can reuse an identical stored file instead of storing the
+    upload again; otherwise the storage backend copies the chunks in order.
+
+    Args:
+        session (UploadSession): A fully received upload.
+
+    Returns:
+        File: An unsaved file named after the original upload, with `content_hash` set.
+    """
+    missing = missing_chunks(session)
+    if missing:
+        raise UploadError(f"Chunk ranges not received yet: {missing}", status=409)
+
+    paths = [session.part_path(index) for index in range(session.chunk_count())]
+    digest = hashlib.sha256()
+    stream = ChunkedUploadFile(paths, session.size)
+    with stream:
+        while data := stream.read(READ_SIZE):
+            digest.update(data)
+
+    file = File(ChunkedUploadFile(paths, session.size), name=session.filename)
+    file.content_hash = digest.hexdigest()
+
+    return file
+
+
+def finalize(session, target):
+    """
+    Stores a fully received upload as the `file` of a VariantItem or Course.
+
+    Args:
+        session (UploadSession): A fully received upload.
+        target (Model): The VariantItem or Course receiving the file.
+
+    Returns:
+        Model: The saved target.
+    """
+    if session.status != "Uploading":
+        raise UploadError("The upload is already complete.", status=409)
+
+    file = assemble(session)
+    try:
+        target.file = file
+        target.save()
+    finally:
+        file.close()
+
+    session.status = "Complete"
+    session.file = target.file.name
+    session.content_hash = file.content_hash
+    session.save(update_fields=["status", "file", "content_hash"])
+    discard_parts(session)
+
+    return target
+
+
+def discard_parts(session):
+    """
+    Deletes the received chunks of an upload from disk and the database.
+
+    Args:
+        session (UploadSession): The upload.
+    """
+    shutil.rmtree(session.part_dir(), ignore_errors=True)
+    session.chunks.all().delete()
@@ -18,6 +18,50 @@ urlpatterns = [
     path("course/category/", api_views.CategoryListAPIView.as_view()),
     path("course/course-list/", api_views.CourseListAPIView.as_view()),
     path("course/course-detail/<slug>/", api_views.CourseDetailAPIView.as_view()),
+    path(
+        "course/curriculum-import/<course_id>/",
+        api_views.CurriculumImportAPIView.as_view(),
+    ),
+    path("course/upload/", api_views.UploadSessionCreateAPIView.as_view()),
+    path("course/upload/<upload_id>/", api_views.UploadSessionAPIView.as_view()),
+    path(
+        "course/upload/<upload_id>/chunk/<int:index>/",
+        api_views.UploadChunkAPIView.as_view(),
+    ),
+    path(
+        "course/upload/<upload_id>/finalize/",
+        api_views.UploadFinalizeAPIView.as_view(),
+    ),
+    path(
+        "course/question-answer-list/<course_id>/",
+        api_views.QuestionAnswerListAPIView.as_view(),
+    ),
+    path(
+        "course/question-answer/<question_answer_id>/messages/",
+        api_views.QuestionAnswerMessageListAPIView.as_view(),
+    ),
+    path("course/qa-summary/<course_id>/", api_views.CourseQASummaryAPIView.as_view()),
+    path(
+        "certificate/verify/<certificate_id>/",
+        api_views.CertificateVerifyAPIView.as_view(),
+    ),
+    path("teacher/stats/<teacher_id>/", api_views.TeacherStatsAPIView.as_view()),
+    path(
+        "teacher/notifications/<teacher_id>/",
+        api_views.NotificationListAPIView.as_view(recipient="teacher"),
+    ),
+    path(
+        "teacher/notifications/<teacher_id>/unread/",
+        api_views.NotificationUnreadAPIView.as_view(recipient="teacher"),
+    ),
+    path(
+        "teacher/notifications/<teacher_id>/seen/",
+        api_views.NotificationMarkAllSeenAPIView.as_view(recipient="teacher"),
+    ),
+    path(
+        "teacher/students/<teacher_id>/", api_views.TeacherStudentListAPIView.as_view()
+    ),
+    path("review/moderate/", api_views.ReviewModerateAPIView.as_view()),
     path("course/cart/", api_views.CartAPIView.as_view()),
     path("course/cart-list/<cart_id>/", api_views.CartListAPIView.as_view()),
     path(
@@ -25,4 +69,31 @@ urlpatterns = [
         api_views.CartItemDeleteAPIView.as_view(),
     ),
     path("cart/stats/<cart_id>/", api_views.CartStatsAPIView.as_view()),
+    path(
+        "student/course-progress/<user_id>/",
+        api_views.StudentCourseProgressAPIView.as_view(),
+    ),
+    path("student/dashboard/<user_id>/", api_views.StudentDashboardAPIView.as_view()),
+    path(
+        "student/curriculum/<user_id>/<enrollment_id>/",
+        api_views.StudentCurriculumAPIView.as_view(),
+    ),
+    path("student/notes/<user_id>/", api_views.NoteSearchAPIView.as_view()),
+    path(
+        "student/notifications/<user_id>/", api_views.NotificationListAPIView.as_view()
+    ),
+    path(
+        "student/notifications/<user_id>/unread/",
+        api_views.NotificationUnreadAPIView.as_view(),
+    ),
+    path(
+        "student/notifications/<user_id>/seen/",
+        api_views.NotificationMarkAllSeenAPIView.as_view(),
+    ),
+    path("student/playback/", api_views.LessonHeartbeatAPIView.as_view()),
+    path(
+        "student/playback/<user_id>/<variant_item_id>/",
+        api_views.LessonPlaybackAPIView.as_view(),
+    ),
+    path("student/lessons-complete/", api_views.LessonBulkCompleteAPIView.as_view()),
 ]
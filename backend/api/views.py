@@ -1,20 +1,37 @@
 from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Max, OuterRef, Prefetch, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncMonth
 from django.shortcuts import render
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 from rest_framework import generics, status
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 
+import json
+from datetime import timedelta
 from random import randint
 from decimal import Decimal
 
 from api import models as api_models
 from userauths.models import User, Profile
 from api import serializer as api_serializer
+from api.curriculum import CurriculumImportError, import_curriculum, read_archive
+from api.emails import send_templated_email
+from api import playback, uploads
+from api.notes import query_terms
+from api.pagination import (
+    NotePagination,
+    NotificationPagination,
+    QuestionAnswerMessagePagination,
+    QuestionAnswerPagination,
+    TeacherStudentPagination,
+)
 
 
 class MyTokenObtainPairView(TokenObtainPairView):
@@ -78,24 +95,19 @@ class PasswordResetEmailVerifyAPIView(generics.RetrieveAPIView):
 
             user.refresh_token = refresh_token
             user.otp = generate_random_otp()
-            user.save()
+            user.save(update_fields=["refresh_token", "otp"])
 
             link = f"http://localhost:5173/create-new-password/?otp={user.otp}&uuidb64={uuidb64}&refresh_token={refresh_token}"
 
             context = {"link": link, "username": user.username}
 
-            html_body = render_to_string("email/password_reset.html", context)
-
-            msg = EmailMultiAlternatives(
+            send_templated_email(
+                "email/password_reset.html",
                 subject="Password Rest Email",
-                body="",
-                from_email=settings.FROM_EMAIL,
                 to=[user.email],
+                context=context,
             )
 
-            msg.attach_alternative(html_body, "text/html")
-            msg.send()
-
         return user
 
 
@@ -123,7 +135,7 @@ class PasswordChangeAPIView(generics.CreateAPIView):
         if user:
             user.set_password(password)
             user.otp = ""
-            user.save()
+            user.save(update_fields=["password", "otp"])
 
             return Response(
                 {"message": "Password Changed Successfully"},
@@ -313,3 +325,971 @@ class CartStatsAPIView(generics.RetrieveAPIView):
 
     def calculate_total(self, cart_item: api_models.Cart) -> float:
         return cart_item.total
+
+
+class CurriculumImportAPIView(generics.CreateAPIView):
+    """
+    API view for importing a whole course curriculum in one request.
+
+    Accepts a multipart upload with either an `archive` ZIP (containing
+    `manifest.json` and the lecture files) or a `manifest` JSON field plus one
+    file field per lecture, named as the manifest references it. Only the
+    course's teacher and staff users may import. Lectures are probed by
+    background jobs after the response.
+
+    Args:
+        generics (type): The base class for generic views.
+
+    Returns:
+        Response: Counts of the created variants and lectures and of queued probes.
+    """
+
+    serializer_class = api_serializer.VariantSerializer
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def create(self, request, *args, **kwargs):
+        course = (
+            api_models.Course.objects.filter(course_id=self.kwargs["course_id"])
+            .select_related("teacher")
+            .first()
+        )
+        if course is None:
+            return Response(
+                {"message": "Course Does Not Exists"}, status=status.HTTP_404_NOT_FOUND
+            )
+        if not request.user.is_staff and course.teacher.user_id != request.user.id:
+            return Response(
+                {"message": "Only The Course Teacher Can Import Its Curriculum"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        try:
+            if "archive" in request.FILES:
+                manifest, files = read_archive(request.FILES["archive"])
+            else:
+                manifest = json.loads(request.data.get("manifest", ""))
+                files = dict(request.FILES.items())
+            result = import_curriculum(course, manifest, files)
+        except (CurriculumImportError, ValueError) as error:
+            return Response({"message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(result, status=status.HTTP_201_CREATED)
+
+
+class UploadSessionCreateAPIView(generics.CreateAPIView):
+    """
+    API view for starting a resumable chunked upload.
+
+    Expects `filename` and `size`, and optionally `chunk_size`. The response
+    tells the client how many chunks to send to `UploadChunkAPIView`. The
+    session belongs to the requesting user; nobody else can send its chunks or
+    finalize it.
+
+    Args:
+        generics (type): The base class for generic views.
+
+    Returns:
+        Response: The new upload session.
+    """
+
+    serializer_class = api_serializer.UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def create(self, request, *args, **kwargs):
+        try:
+            session = uploads.create_session(
+                request.user,
+                request.data["filename"],
+                int(request.data["size"]),
+                int(request.data["chunk_size"])
+                if request.data.get("chunk_size")
+                else None,
+            )
+        except (KeyError, ValueError, TypeError):
+            return Response(
+                {"message": "filename and size are required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except uploads.UploadError as error:
+            return Response({"message": str(error)}, status=error.status)
+
+        return Response(
+            self.get_serializer(session).data, status=status.HTTP_201_CREATED
+        )
+
+
+class UploadSessionAPIView(generics.RetrieveAPIView):
+    """
+    API view for reading the state of an upload, so an interrupted client knows which chunks to resend.
+
+    Args:
+        generics (type): The base class for generic views.
+
+    Returns:
+        Response: The upload session with its `missing` chunk ranges.
+    """
+
+    serializer_class = api_serializer.UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+    lookup_field = "upload_id"
+
+    def get_queryset(self):
+        return api_models.UploadSession.objects.filter(user=self.request.user)
+
+
+class UploadChunkAPIView(generics.UpdateAPIView):
+    """
+    API view for receiving one chunk of an upload as the raw request body.
+
+    The body is streamed to disk without being buffered by Django. Clients send
+    `Upload-Checksum: sha256 <digest>`; chunks can be sent in any order, in
+    parallel, and retried.
+
+    Args:
+        generics (type): The base class for generic views.
+
+    Returns:
+        Response: The index and checksum of the stored chunk.
+    """
+
+    serializer_class = api_serializer.UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+    http_method_names = ["put", "options"]
+
+    def update(self, request, *args, **kwargs):
+        session = api_models.UploadSession.objects.filter(
+            upload_id=self.kwargs["upload_id"], user=request.user
+        ).first()
+        if session is None:
+            return Response(
+                {"message": "Upload Does Not Exists"}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        try:
+            chunk = uploads.write_chunk(
+                session,
+                int(self.kwargs["index"]),
+                request.stream,
+                int(request.headers.get("Content-Length") or 0),
+                uploads.parse_checksum(request.headers.get("Upload-Checksum")),
+            )
+        except uploads.UploadError as error:
+            return Response({"message": str(error)}, status=error.status)
+
+        return Response({"index": chunk.index, "checksum": chunk.checksum})
+
+
+class UploadFinalizeAPIView(generics.CreateAPIView):
+    """
+    API view for assembling a fully received upload into a lecture or course file.
+
+    Expects either `variant_item_id` or `course_id`. Only the teacher of the
+    target's course (or staff) can attach files to it.
+
+    Args:
+        generics (type): The base class for generic views.
+
+    Returns:
+        Response: The completed upload session.
+    """
+
+    serializer_class = api_serializer.UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def create(self, request, *args, **kwargs):
+        session = api_models.UploadSession.objects.filter(
+            upload_id=self.kwargs["upload_id"], user=request.user
+        ).first()
+        if "variant_item_id" in request.data:
+            target = (
+                api_models.VariantItem.objects.filter(
+                    variant_item_id=request.data["variant_item_id"]
+                )
+                .select_related("variant__course__teacher")
+                .first()
+            )
+            course = target.variant.course if target else None
+        else:
+            target = course = (
+                api_models.Course.objects.filter(
+                    course_id=request.data.get("course_id")
+                )
+                .select_related("teacher")
+                .first()
+            )
+        if session is None or target is None:
+            return Response(
+                {"message": "Upload Or Target Does Not Exists"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        if not request.user.is_staff and course.teacher.user_id != request.user.id:
+            return Response(
+                {"message": "Only The Course Teacher Can Upload Its Files"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        try:
+            uploads.finalize(session, target)
+        except uploads.UploadError as error:
+            return Response({"message": str(error)}, status=error.status)
+
+        return Response(
+            self.get_serializer(session).data, status=status.HTTP_201_CREATED
+        )
+
+
+class StudentCourseProgressAPIView(generics.ListAPIView):
+    """
+    API view listing a student's completion progress for every enrolled course.
+
+    Progress is read from the denormalized EnrollmentProgress rows, so the whole
+    list costs one query however many courses the student is enrolled in.
+
+    Args:
+        generics (type): The base class for generic views.
+
+    Returns:
+        Response: One entry per enrollment with completed lessons and percentage.
+    """
+
+    serializer_class = api_serializer.EnrollmentProgressSerializer
+    permission_classes = [AllowAny]
+
+    def get_queryset(self):
+        user_id = self.kwargs["user_id"]
+        return (
+            api_models.EnrollmentProgress.objects.filter(
+                enrolled_course__user_id=user_id
+            )
+            .select_related("enrolled_course__course")
+            .order_by("-enrolled_course__date")
+        )
+
+
+class LessonHeartbeatAPIView(generics.CreateAPIView):
+    """
+    API view receiving periodic playback position reports from the video player.
+
+    Reports are buffered in the cache and written to LessonPlayback in batches
+    by `manage.py flush_playback`, so this view does not touch the database.
+    An optional `timestamp` (Unix seconds) orders reports that arrive out of order.
+
+    Args:
+        generics (type): The base class for generic views.
+
+    Returns:
+        Response: 202 once the report is buffered.
+    """
+
+    serializer_class = api_serializer.LessonPlaybackSerializer
+    permission_classes = [AllowAny]
+
+    def create(self, request, *args, **kwargs):
+        try:
+            user_id = int(request.data["user_id"])
+            variant_item_id = int(request.data["variant_item_id"])
+            position = float(request.data["position"])
+            timestamp = request.data.get("timestamp")
+            reported_at = float(timestamp) if timestamp is not None else None
+        except (KeyError, TypeError, ValueError):
+            return Response(
+                {"message": "user_id, variant_item_id and position are required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if position < 0:
+            return Response(
+                {"message": "position must not be negative"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        playback.record_heartbeat(user_id, variant_item_id, position, reported_at)
+
+        return Response(
+            {"message": "Position Recorded"}, status=status.HTTP_202_ACCEPTED
+        )
+
+
+class LessonPlaybackAPIView(generics.RetrieveAPIView):
+    """
+    API view returning where a user left off in a lecture, including buffered reports.
+
+    Args:
+        generics (type): The base class for generic views.
+
+    Returns:
+        Response: The playback position in seconds (0 if never played).
+    """
+
+    serializer_class = api_serializer.LessonPlaybackSerializer
+    permission_classes = [AllowAny]
+
+    def retrieve(self, request, *args, **kwargs):
+        position = playback.buffered_position(
+            self.kwargs["user_id"], self.kwargs["variant_item_id"]
+        )
+
+        return Response({"position": position or 0})
+
+
+class LessonBulkCompleteAPIView(generics.CreateAPIView):
+    """
+    API view marking several lectures of a course as completed at once.
+
+    Lectures that are already completed or do not belong to the course are
+    skipped. The new rows are inserted with one `bulk_create` and the
+    enrollment progress is recounted once.
+
+    Args:
+        generics (type): The base class for generic views.
+
+    Returns:
+        Response: The number of newly completed lectures and the enrollment's total.
+    """
+
+    serializer_class = api_serializer.CompletedLessonSerializer
+    permission_classes = [AllowAny]
+
+    def create(self, request, *args, **kwargs):
+        user = User.objects.filter(id=request.data.get("user_id")).first()
+        course = api_models.Course.objects.filter(
+            id=request.data.get("course_id")
+        ).first()
+        if user is None or course is None:
+            return Response(
+                {"message": "User or Course Does Not Exists"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        variant_item_ids = set(
+            course.lectures()
+            .filter(id__in=request.data.get("variant_item_ids", []))
+            .exclude(completedlesson__user=user)
+            .values_list("id", flat=True)
+        )
+        api_models.CompletedLesson.objects.bulk_create(
+            [
+                api_models.CompletedLesson(
+                    course=course, user=user, variant_item_id=variant_item_id
+                )
+                for variant_item_id in variant_item_ids
+            ],
+            ignore_conflicts=True,
+        )
+        # bulk_create skips the signals that keep progress current.
+        enrollments = api_models.EnrolledCourse.objects.filter(course=course, user=user)
+        api_models.rebuild_enrollment_progress(enrollments)
+        api_models.issue_certificates(course.pk, [user.pk])
+
+        return Response(
+            {
+                "message": "Lessons Completed",
+                "completed": len(variant_item_ids),
+                "completed_lessons": course.completedlesson_set.filter(
+                    user=user
+                ).count(),
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class StudentDashboardAPIView(generics.ListAPIView):
+    """
+    API view for a student's dashboard: enrollments with progress, last viewed lecture and review.
+
+    The whole list is built from three queries regardless of the number of
+    enrollments: the enrollments with their course, teacher and progress (which
+    also picks the id of the most recently watched lecture of each course),
+    the LessonPlayback rows of those lectures, and the student's reviews.
+    Curricula are not included; `StudentCurriculumAPIView` loads one course's
+    on demand.
+
+    Args:
+        generics (type): The base class for generic views.
+
+    Returns:
+        Response: One dashboard entry per enrollment, newest first.
+    """
+
+    serializer_class = api_serializer.StudentDashboardSerializer
+    permission_classes = [AllowAny]
+
+    def get_queryset(self):
+        user_id = self.kwargs["user_id"]
+        last_viewed = api_models.LessonPlayback.objects.filter(
+            user_id=user_id, variant_item__variant__course=OuterRef("course")
+        ).order_by("-reported_at")
+
+        return (
+            api_models.EnrolledCourse.objects.filter(user_id=user_id)
+            .select_related("course__teacher", "progress")
+            .annotate(last_viewed_id=Subquery(last_viewed.values("pk")[:1]))
+            .order_by("-date")
+        )
+
+    def list(self, request, *args, **kwargs):
+        enrollments = list(self.get_queryset())
+
+        playbacks = api_models.LessonPlayback.objects.select_related(
+            "variant_item"
+        ).in_bulk({enrollment.last_viewed_id for enrollment in enrollments} - {None})
+        reviews = {
+            review.course_id: review
+            for review in api_models.Review.objects.filter(
+                user_id=self.kwargs["user_id"],
+                course_id__in={enrollment.course_id for enrollment in enrollments},
+            ).only("course_id", "rating", "active")
+        }
+        for enrollment in enrollments:
+            enrollment.last_viewed = playbacks.get(enrollment.last_viewed_id)
+            enrollment.student_review = reviews.get(enrollment.course_id)
+
+        serializer = self.get_serializer(enrollments, many=True)
+        return Response(serializer.data)
+
+
+class StudentCurriculumAPIView(generics.RetrieveAPIView):
+    """
+    API view loading one enrolled course's curriculum with the student's completion state.
+
+    Sections and their lectures are fetched with one prefetch, and the
+    student's completed lessons and playback positions with one query each.
+
+    Args:
+        generics (type): The base class for generic views.
+
+    Returns:
+        Response: The course sections, each with its lectures.
+    """
+
+    serializer_class = api_serializer.CurriculumSectionSerializer
+    permission_classes = [AllowAny]
+
+    def retrieve(self, request, *args, **kwargs):
+        enrollment = (
+            api_models.EnrolledCourse.objects.filter(
+                user_id=self.kwargs["user_id"],
+                enrollment_id=self.kwargs["enrollment_id"],
+            )
+            .only("course_id", "user_id")
+            .first()
+        )
+        if enrollment is None:
+            return Response(
+                {"message": "Enrollment Does Not Exists"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        sections = (
+            api_models.Variant.objects.filter(course_id=enrollment.course_id)
+            .prefetch_related(
+                Prefetch(
+                    "variant_items",
+                    queryset=api_models.VariantItem.objects.order_by("date", "pk"),
+                )
+            )
+            .order_by("date", "pk")
+        )
+        completed = set(
+            api_models.CompletedLesson.objects.filter(
+                user_id=enrollment.user_id, course_id=enrollment.course_id
+            ).values_list("variant_item_id", flat=True)
+        )
+        positions = dict(
+            api_models.LessonPlayback.objects.filter(
+                user_id=enrollment.user_id,
+                variant_item__variant__course_id=enrollment.course_id,
+            ).values_list("variant_item_id", "position")
+        )
+
+        serializer = self.get_serializer(
+            sections,
+            many=True,
+            context={
+                **self.get_serializer_context(),
+                "completed": completed,
+                "positions": positions,
+            },
+        )
+        return Response(serializer.data)
+
+
+def profiles_for(rows, attribute="user_id"):
+    """
+    Loads the profiles of the authors of `rows` with one `IN` query.
+
+    Args:
+        rows (list): Model instances with a user id.
+        attribute (str, optional): The attribute holding the user id (default: "user_id").
+
+    Returns:
+        dict: {user_id: Profile}.
+    """
+    user_ids = {getattr(row, attribute) for row in rows} - {None}
+    if not user_ids:
+        return {}
+
+    return {
+        profile.user_id: profile
+        for profile in Profile.objects.filter(user_id__in=user_ids)
+    }
+
+
+class QuestionAnswerListAPIView(generics.ListAPIView):
+    """
+    API view listing a course's Q&A threads, newest first, with cursor pagination.
+
+    Pass `?user_id=` to list only that student's threads. Each page costs
+    one query for the threads (with message counts and last activity
+    annotated) and one for the authors' profiles.
+
+    Args:
+        generics (type): The base class for generic views.
+
+    Returns:
+        Response: A page of threads with `next` and `previous` cursor links.
+    """
+
+    serializer_class = api_serializer.QuestionAnswerThreadSerializer
+    permission_classes = [AllowAny]
+    pagination_class = QuestionAnswerPagination
+
+    def get_queryset(self):
+        queryset = api_models.QuestionAnswer.objects.filter(
+            course__course_id=self.kwargs["course_id"]
+        )
+        user_id = self.request.query_params.get("user_id")
+        if user_id:
+            queryset = queryset.filter(user_id=user_id)
+
+        return queryset.annotate(
+            message_count=Count("questionanswermessage"),
+            last_activity=Coalesce(Max("questionanswermessage__date"), "date"),
+        )
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(
+            page,
+            many=True,
+            context={**self.get_serializer_context(), "profiles": profiles_for(page)},
+        )
+        return self.get_paginated_response(serializer.data)
+
+
+class QuestionAnswerMessageListAPIView(generics.ListAPIView):
+    """
+    API view listing the messages of one Q&A thread, oldest first, with cursor pagination.
+
+    Args:
+        generics (type): The base class for generic views.
+
+    Returns:
+        Response: A page of messages with `next` and `previous` cursor links.
+    """
+
+    serializer_class = api_serializer.QuestionAnswerThreadMessageSerializer
+    permission_classes = [AllowAny]
+    pagination_class = QuestionAnswerMessagePagination
+
+    def get_queryset(self):
+        return api_models.QuestionAnswerMessage.objects.filter(
+            question__question_answer_id=self.kwargs["question_answer_id"]
+        )
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(
+            page,
+            many=True,
+            context={**self.get_serializer_context(), "profiles": profiles_for(page)},
+        )
+        return self.get_paginated_response(serializer.data)
+
+
+class CourseQASummaryAPIView(generics.RetrieveAPIView):
+    """
+    API view returning a course's Q&A counters and last activity.
+
+    Args:
+        generics (type): The base class for generic views.
+
+    Returns:
+        Response: The question and message counts and the time of the latest post.
+    """
+
+    serializer_class = api_serializer.CourseQASummarySerializer
+    permission_classes = [AllowAny]
+
+    def get_object(self):
+        summary = api_models.CourseQASummary.objects.filter(
+            course__course_id=self.kwargs["course_id"]
+        ).first()
+        return summary or api_models.CourseQASummary()
+
+
+class NoteSearchAPIView(generics.ListAPIView):
+    """
+    API view listing or searching a student's notes, optionally within one course.
+
+    Without `?q=` the notes are listed newest first. With it, only notes
+    containing every term are returned, ranked by the NoteToken inverted index
+    (see `api_models.search_notes`), with the terms highlighted in the snippets.
+    Filter by course with `?course_id=`.
+
+    Args:
+        generics (type): The base class for generic views.
+
+    Returns:
+        Response: A page of notes with snippets.
+    """
+
+    serializer_class = api_serializer.NoteSearchSerializer
+    permission_classes = [AllowAny]
+    pagination_class = NotePagination
+
+    def get_queryset(self):
+        user_id = self.kwargs["user_id"]
+        query = self.request.query_params.get("q", "")
+        course_id = self.request.query_params.get("course_id")
+        course_pk = None
+        if course_id:
+            course_pk = (
+                api_models.Course.objects.filter(course_id=course_id)
+                .values_list("pk", flat=True)
+                .first()
+            )
+            if course_pk is None:
+                return api_models.Note.objects.none()
+
+        if query.strip():
+            queryset = api_models.search_notes(user_id, query, course_pk)
+        else:
+            queryset = api_models.Note.objects.filter(user_id=user_id).order_by(
+                "-date", "-pk"
+            )
+            if course_pk is not None:
+                queryset = queryset.filter(course_id=course_pk)
+
+        return queryset.select_related("course").only(
+            "note_id", "title", "note", "date", "course__course_id"
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["terms"] = query_terms(self.request.query_params.get("q", ""))
+        return context
+
+
+class CertificateVerifyAPIView(generics.RetrieveAPIView):
+    """
+    Public API view confirming that a certificate id was issued.
+
+    Looks the certificate up by its unique `certificate_id` and caches the
+    result (including unknown ids, briefly) so repeated checks of a shared
+    certificate do not reach the database. File URLs are built per request
+    since signed URLs expire.
+
+    Args:
+        generics (type): The base class for generic views.
+
+    Returns:
+        Response: The student, course, teacher and date, and the rendered files once available.
+    """
+
+    serializer_class = api_serializer.CertificateVerifySerializer
+    permission_classes = [AllowAny]
+
+    def retrieve(self, request, *args, **kwargs):
+        certificate_id = self.kwargs["certificate_id"]
+        key = api_models.certificate_cache_key(certificate_id)
+        data = cache.get(key)
+        if data is None:
+            certificate = (
+                api_models.Certificate.objects.filter(certificate_id=certificate_id)
+                .select_related("course__teacher", "user")
+                .first()
+            )
+            data = {}
+            timeout = 60
+            if certificate is not None and certificate.user is not None:
+                data = {
+                    "certificate_id": certificate.certificate_id,
+                    "student": certificate.user.full_name,
+                    "course": certificate.course.title,
+                    "course_id": certificate.course.course_id,
+                    "teacher": (
+                        certificate.course.teacher.full_name
+                        if certificate.course.teacher
+                        else ""
+                    ),
+                    "date": certificate.date,
+                    "image": certificate.image.name or None,
+                    "pdf": certificate.pdf.name or None,
+                }
+                timeout = settings.CERTIFICATE_CACHE_SECONDS
+            cache.set(key, data, timeout)
+
+        if not data:
+            return Response(
+                {"message": "Certificate Does Not Exist"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        return Response(self.get_serializer(data).data)
+
+
+class TeacherStatsAPIView(generics.RetrieveAPIView):
+    """
+    API view returning a teacher's revenue, sales and new students over a date range.
+
+    Reads the TeacherDailyStats rollups, so the cost depends on the number of
+    days (and courses) in the range, not on the number of orders. Query
+    parameters: `start` and `end` (YYYY-MM-DD, default: the last 30 days),
+    `course_id` to limit to one course, and `interval` ("day" or "month";
+    daily series are limited to `TEACHER_STATS_MAX_DAYS` days).
+
+    Args:
+        generics (type): The base class for generic views.
+
+    Returns:
+        Response: The totals of the range and one entry per day or month with activity.
+    """
+
+    serializer_class = api_serializer.TeacherStatsPeriodSerializer
+    permission_classes = [AllowAny]
+
+    def retrieve(self, request, *args, **kwargs):
+        params = request.query_params
+        try:
+            end = parse_date(params["end"]) if "end" in params else timezone.localdate()
+            start = (
+                parse_date(params["start"])
+                if "start" in params
+                else end and end - timedelta(days=29)
+            )
+        except ValueError:
+            start = end = None
+        interval = params.get("interval", "day")
+        if not start or not end or start > end or interval not in ("day", "month"):
+            return Response(
+                {"message": "Invalid Date Range"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if interval == "day" and (end - start).days >= settings.TEACHER_STATS_MAX_DAYS:
+            return Response(
+                {"message": "Date Range Too Long, Use interval=month"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        rows = api_models.TeacherDailyStats.objects.filter(
+            teacher_id=self.kwargs["teacher_id"], day__range=(start, end)
+        )
+        if params.get("course_id"):
+            rows = rows.filter(course__course_id=params["course_id"])
+        period = TruncMonth("day") if interval == "month" else F("day")
+        periods = list(
+            rows.annotate(period=period)
+            .values("period")
+            .annotate(
+                revenue=Sum("revenue"), sales=Sum("sales"), students=Sum("students")
+            )
+            .order_by("period")
+        )
+
+        return Response(
+            {
+                "start": start,
+                "end": end,
+                "interval": interval,
+                "revenue": sum((row["revenue"] for row in periods), Decimal("0.00")),
+                "sales": sum(row["sales"] for row in periods),
+                "students": sum(row["students"] for row in periods),
+                "periods": self.get_serializer(periods, many=True).data,
+            }
+        )
+
+
+class TeacherStudentListAPIView(generics.ListAPIView):
+    """
+    API view listing a teacher's students once each, with cursor pagination.
+
+    Students are read from the maintained TeacherStudent roster with a keyset
+    on (first_purchase, user) served by its index; one more query loads their
+    profiles and one their enrolled courses, for the whole page. Most recent
+    first purchase first.
+
+    Args:
+        generics (type): The base class for generic views.
+
+    Returns:
+        Response: A page of students with `next` and `previous` cursor links.
+    """
+
+    serializer_class = api_serializer.TeacherStudentSerializer
+    permission_classes = [AllowAny]
+    pagination_class = TeacherStudentPagination
+
+    def get_queryset(self):
+        return (
+            api_models.TeacherStudent.objects.filter(
+                teacher_id=self.kwargs["teacher_id"]
+            )
+            .select_related("user")
+            .only("user_id", "first_purchase", "course_count", "user__full_name")
+        )
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        enrollments = {}
+        for enrollment in (
+            api_models.EnrolledCourse.objects.filter(
+                teacher_id=self.kwargs["teacher_id"],
+                user_id__in=[student.user_id for student in page],
+            )
+            .order_by("date")
+            .values(
+                "user_id", "enrollment_id", "date", "course__course_id", "course__title"
+            )
+        ):
+            enrollments.setdefault(enrollment["user_id"], []).append(
+                {
+                    "enrollment_id": enrollment["enrollment_id"],
+                    "course_id": enrollment["course__course_id"],
+                    "title": enrollment["course__title"],
+                    "date": enrollment["date"],
+                }
+            )
+        serializer = self.get_serializer(
+            page,
+            many=True,
+            context={
+                **self.get_serializer_context(),
+                "profiles": profiles_for(page),
+                "enrollments": enrollments,
+            },
+        )
+        return self.get_paginated_response(serializer.data)
+
+
+class NotificationListAPIView(generics.ListAPIView):
+    """
+    API view listing a student's or teacher's notifications, newest first.
+
+    Pass `?unseen=1` to list only unseen notifications. Pages are keyset
+    paginated on `(date, id)`, served by the (recipient, date, id) and
+    (recipient, seen, date, id) indexes.
+
+    Attributes:
+        recipient (str): "user" or "teacher", set per URL in `as_view()`.
+
+    Returns:
+        Response: A page of notifications with `next` and `previous` cursor links.
+    """
+
+    serializer_class = api_serializer.NotificationSerializer
+    permission_classes = [AllowAny]
+    pagination_class = NotificationPagination
+    recipient = "user"
+
+    def get_queryset(self):
+        queryset = api_models.Notification.objects.filter(
+            **{f"{self.recipient}_id": self.kwargs[f"{self.recipient}_id"]}
+        )
+        if self.request.query_params.get("unseen"):
+            queryset = queryset.filter(seen=False)
+
+        return queryset
+
+
+class NotificationUnreadAPIView(generics.RetrieveAPIView):
+    """
+    API view returning the unread notification badge of a student or teacher.
+
+    Reads the maintained NotificationCounter row, so the cost does not grow
+    with the number of notifications.
+
+    Attributes:
+        recipient (str): "user" or "teacher", set per URL in `as_view()`.
+
+    Returns:
+        Response: {"unread": count}.
+    """
+
+    permission_classes = [AllowAny]
+    recipient = "user"
+
+    def retrieve(self, request, *args, **kwargs):
+        recipient_id = self.kwargs[f"{self.recipient}_id"]
+        return Response(
+            {
+                "unread": api_models.unread_count(
+                    **{f"{self.recipient}_id": recipient_id}
+                )
+            }
+        )
+
+
+class NotificationMarkAllSeenAPIView(generics.CreateAPIView):
+    """
+    API view marking all notifications of a student or teacher as seen.
+
+    Attributes:
+        recipient (str): "user" or "teacher", set per URL in `as_view()`.
+
+    Returns:
+        Response: The number of notifications that were marked as seen.
+    """
+
+    permission_classes = [AllowAny]
+    recipient = "user"
+
+    def create(self, request, *args, **kwargs):
+        recipient_id = self.kwargs[f"{self.recipient}_id"]
+        seen = api_models.mark_all_seen(**{f"{self.recipient}_id": recipient_id})
+        return Response(
+            {"message": "Notifications Seen", "seen": seen}, status=status.HTTP_200_OK
+        )
+
+
+class ReviewModerateAPIView(generics.CreateAPIView):
+    """
+    API view approving, rejecting or replying to many reviews at once.
+
+    Expects `review_ids`, an `action` ("approve", "reject" or "reply") and an
+    optional `reply`. Staff users may moderate any review; teachers only the
+    reviews of their own courses, and other users are refused. The reviews
+    are updated with one UPDATE and the ratings of the affected courses
+    refreshed in one statement (see `api_models.moderate_reviews`).
+
+    Args:
+        generics (type): The base class for generic views.
+
+    Returns:
+        Response: The number of reviews updated.
+    """
+
+    serializer_class = api_serializer.ReviewModerationSerializer
+    permission_classes = [IsAuthenticated]
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        reviews = api_models.Review.objects.filter(id__in=data["review_ids"])
+        if not request.user.is_staff:
+            teacher = api_models.Teacher.objects.filter(user=request.user).first()
+            if teacher is None:
+                return Response(
+                    {"message": "Only Teachers Can Moderate Reviews"},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+            reviews = reviews.filter(course__teacher=teacher)
+
+        updated = api_models.moderate_reviews(
+            reviews, data["action"], data.get("reply")
+        )
+        return Response(
+            {"message": "Reviews Moderated", "updated": updated},
+            status=status.HTTP_200_OK,
+        )
@@ -182,6 +182,39 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# https://docs.djangoproject.com/en/4.2/topics/auth/passwords/
+#
+# New passwords use PASSWORD_HASHER ("scrypt", "argon2" or "pbkdf2"); the other
+# hashers stay listed so existing hashes still verify, and Django re-hashes them
+# with the preferred hasher and cost on the next successful login. Use
+# `python manage.py benchmark_password_hashers` to pick costs for this hardware.
+
+PASSWORD_HASHER = env("PASSWORD_HASHER", "scrypt")
+
+PASSWORD_HASHER_COSTS = {
+    "scrypt": {
+        "work_factor": env.int("SCRYPT_WORK_FACTOR", 2**14),
+        "block_size": env.int("SCRYPT_BLOCK_SIZE", 8),
+        "parallelism": env.int("SCRYPT_PARALLELISM", 1),
+    },
+    "argon2": {
+        "time_cost": env.int("ARGON2_TIME_COST", 2),
+        "memory_cost": env.int("ARGON2_MEMORY_COST", 65536),
+        "parallelism": env.int("ARGON2_PARALLELISM", 1),
+    },
+}
+
+_PASSWORD_HASHERS = {
+    "scrypt": "userauths.hashers.TunedScryptPasswordHasher",
+    "argon2": "userauths.hashers.TunedArgon2PasswordHasher",
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+}
+
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    hasher for name, hasher in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+]
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
@@ -205,6 +238,142 @@ STATIC_ROOT = BASE_DIR / "templates"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Where FileFields are stored: "local" (MEDIA_ROOT), "signed-local" (MEDIA_ROOT
+# with expiring signed URLs, an offline stand-in for S3) or "s3" (any
+# S3-compatible bucket, so app servers need no shared disk). With "s3", file
+# URLs are presigned and clients download directly from the bucket.
+MEDIA_STORAGE = env("MEDIA_STORAGE", "local")
+MEDIA_URL_EXPIRY = env.int("MEDIA_URL_EXPIRY", 3600)
+MEDIA_S3_MULTIPART_THRESHOLD = env.int("MEDIA_S3_MULTIPART_THRESHOLD", 64 * 1024 * 1024)
+MEDIA_S3_MULTIPART_CHUNKSIZE = env.int("MEDIA_S3_MULTIPART_CHUNKSIZE", 16 * 1024 * 1024)
+MEDIA_S3_MAX_CONCURRENCY = env.int("MEDIA_S3_MAX_CONCURRENCY", 8)
+
+_MEDIA_STORAGES = {
+    "local": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "signed-local": {"BACKEND": "core.storage.SignedFileSystemStorage"},
+    "s3": {
+        "BACKEND": "core.storage_s3.MediaS3Storage",
+        "OPTIONS": {
+            "bucket_name": env("AWS_STORAGE_BUCKET_NAME", None),
+            "endpoint_url": env("AWS_S3_ENDPOINT_URL", None),
+            "region_name": env("AWS_S3_REGION_NAME", None),
+            "querystring_expire": MEDIA_URL_EXPIRY,
+            "file_overwrite": False,
+        },
+    },
+}
+
+STORAGES = {
+    "default": _MEDIA_STORAGES[MEDIA_STORAGE],
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+# The default LocMemCache is per process; use a shared cache (e.g.
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache with
+# CACHE_LOCATION=redis://...) when running several web workers.
+CACHES = {
+    "default": {
+        "BACKEND": env(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": env("CACHE_LOCATION", ""),
+    }
+}
+
+# How `core.views.serve_media` delivers files: "django" streams them itself
+# (Range requests, sendfile where the WSGI server supports it), while
+# "x-accel-redirect" (nginx) and "x-sendfile" (Apache/lighttpd) hand the
+# transfer to the fronting proxy. With nginx, MEDIA_ACCEL_REDIRECT_PREFIX must
+# match an `internal` location aliased to MEDIA_ROOT.
+MEDIA_SERVE_MODE = env("MEDIA_SERVE_MODE", "django")
+MEDIA_ACCEL_REDIRECT_PREFIX = env("MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+
+# Media paths whose names change whenever their content does, so browsers may
+# cache them for a year without revalidating.
+MEDIA_IMMUTABLE_PREFIXES = ("derivatives/", "hls/")
+
+# Width buckets (px) and encoder quality of the WebP/JPEG thumbnails generated
+# for course, teacher, category and profile images (see `api.images`).
+IMAGE_DERIVATIVE_WIDTHS = (160, 320, 640, 1280)
+IMAGE_DERIVATIVE_QUALITY = 80
+
+# HLS ladder built for each lecture by the "package_hls" job (see
+# `api.transcode`): (height px, video kbit/s) rungs, segment length, and the
+# ffmpeg threads and CPU-seconds limit of one job. Run several
+# `run_jobs --kind package_hls --processes N` workers to use more cores.
+HLS_RENDITIONS = ((360, 800), (540, 1400), (720, 2800))
+HLS_SEGMENT_SECONDS = 6
+HLS_FFMPEG_THREADS = env.int("HLS_FFMPEG_THREADS", 2)
+HLS_CPU_SECONDS_LIMIT = env.int("HLS_CPU_SECONDS_LIMIT", 3600)
+
+# Course certificates (see `api.certificates`), rendered by the
+# "render_certificate" job once a student completes every lecture. Fonts are
+# TrueType paths (Pillow's built-in font if unset). CERTIFICATE_VERIFY_URL is
+# printed on the certificate, with "{certificate_id}" replaced; verification
+# lookups are cached for CERTIFICATE_CACHE_SECONDS.
+CERTIFICATE_FONT = env("CERTIFICATE_FONT", None)
+CERTIFICATE_BOLD_FONT = env("CERTIFICATE_BOLD_FONT", None)
+CERTIFICATE_SIZE = (2000, 1414)
+CERTIFICATE_DPI = 200
+CERTIFICATE_VERIFY_URL = env("CERTIFICATE_VERIFY_URL", "")
+CERTIFICATE_CACHE_SECONDS = env.int("CERTIFICATE_CACHE_SECONDS", 3600)
+
+# Longest range (in days) of a daily series from the teacher stats endpoint;
+# longer ranges are requested by month.
+TEACHER_STATS_MAX_DAYS = 366
+
+# Resumable chunked uploads (see `api.uploads`): received chunks are kept on
+# local disk until the upload is finalized into the media storage.
+CHUNKED_UPLOAD_ROOT = env("CHUNKED_UPLOAD_ROOT", str(BASE_DIR / "uploads"))
+CHUNKED_UPLOAD_CHUNK_SIZE = env.int("CHUNKED_UPLOAD_CHUNK_SIZE", 8 * 1024 * 1024)
+CHUNKED_UPLOAD_MIN_CHUNK_SIZE = 256 * 1024
+CHUNKED_UPLOAD_MAX_CHUNK_SIZE = 64 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_CHUNKS = 10000
+CHUNKED_UPLOAD_MAX_SIZE = env.int("CHUNKED_UPLOAD_MAX_SIZE", 20 * 1024 * 1024 * 1024)
+CHUNKED_UPLOAD_EXPIRY_HOURS = env.int("CHUNKED_UPLOAD_EXPIRY_HOURS", 48)
+
+# Limits of the curriculum ZIP archives read by `api.curriculum.read_archive`.
+CURRICULUM_ARCHIVE_MAX_FILES = 1000
+CURRICULUM_ARCHIVE_MAX_SIZE = env.int(
+    "CURRICULUM_ARCHIVE_MAX_SIZE", 20 * 1024 * 1024 * 1024
+)
+CURRICULUM_MANIFEST_MAX_SIZE = 1024 * 1024
+
+# Background jobs (`core.jobs`) still "Running" this many seconds after their
+# attempt started are taken to be abandoned by a dead worker and claimed again.
+# Keep it above the longest job, e.g. HLS packaging of a long lecture.
+JOBS_VISIBILITY_TIMEOUT = env.int("JOBS_VISIBILITY_TIMEOUT", 60 * 60)
+
+# Server-sent events (`core.views.event_stream`, served by the ASGI app). The
+# in-process LocalBroker only reaches clients of the same worker; point
+# EVENTS_BROKER at a shared-bus implementation when running several.
+EVENTS_BROKER = env("EVENTS_BROKER", "core.events.LocalBroker")
+EVENTS_REPLAY_SIZE = 100
+EVENTS_REPLAY_SECONDS = 60
+EVENTS_REPLAY_CHANNELS = 10000
+EVENTS_QUEUE_SIZE = 100
+EVENTS_MAX_CHANNELS = 20
+EVENTS_KEEPALIVE_SECONDS = 15
+EVENTS_MAX_AGE_SECONDS = 300
+EVENTS_RETRY_MILLISECONDS = 3000
+
+# Playback heartbeats (see `api.playback`) are buffered in this cache alias and
+# written to the database by `manage.py flush_playback` every
+# PLAYBACK_FLUSH_INTERVAL seconds. Positions not flushed within
+# PLAYBACK_BUFFER_TIMEOUT seconds expire from the buffer. The alias must be a
+# cache shared by all processes; with a per-process one (the LocMemCache
+# default) heartbeats are written straight to the database, and
+# `check --deploy` warns with api.W001.
+PLAYBACK_CACHE = env("PLAYBACK_CACHE", "default")
+PLAYBACK_FLUSH_INTERVAL = env.int("PLAYBACK_FLUSH_INTERVAL", 10)
+PLAYBACK_FLUSH_BATCH_SIZE = 1000
+PLAYBACK_BUFFER_TIMEOUT = 24 * 60 * 60
+
+FILE_UPLOAD_HANDLERS = [
+    "api.uploadhandlers.HashingMemoryFileUploadHandler",
+    "api.uploadhandlers.HashingTemporaryFileUploadHandler",
+]
+
 AUTH_USER_MODEL = "userauths.User"
 
 ANYMAIL = {
@@ -215,6 +384,11 @@ ANYMAIL = {
 FROM_EMAIL = env("FROM_EMAIL")
 EMAIL_BACKEND = "anymail.backends.mailgun.EmailBackend"
 
+# Recipients per batch-send message (Mailgun accepts up to 1000) and the
+# placeholder syntax the provider uses for per-recipient merge variables.
+EMAIL_BATCH_SIZE = env.int("EMAIL_BATCH_SIZE", 1000)
+EMAIL_MERGE_FIELD_FORMAT = "%recipient.{}%"
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
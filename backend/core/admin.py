@@ -1,3 +1,11 @@
 from django.contrib import admin
 
-# Register your models here.
+from core.models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ["kind", "status", "attempts", "date", "finished"]
+    list_filter = ["status", "kind"]
+
+
+admin.site.register(Job, JobAdmin)
@@ -0,0 +1,195 @@
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+class LocalBroker:
+    """
+    In-process publish/subscribe broker for server-sent events.
+
+    Subscribers are asyncio queues on the event loop that serves the stream;
+    `publish()` may be called from any thread (sync views and signal handlers
+    run in a thread pool under ASGI) and hands events to the loop with
+    `call_soon_threadsafe`.
+
+    The last `EVENTS_REPLAY_SIZE` events of a channel are kept, so a
+    reconnecting client can resume from `Last-Event-ID`, only while the
+    channel has subscribers and for `EVENTS_REPLAY_SECONDS` after the last one
+    leaves; at most `EVENTS_REPLAY_CHANNELS` idle channels are kept, least
+    recently used first out. Events of channels nobody follows are not
+    retained at all.
+
+    Event ids are microseconds since the epoch, bumped to stay strictly
+    increasing, so ids from different processes are comparable (up to their
+    clock skew) when a client reconnects to another worker.
+
+    Events only reach clients connected to the same process, so this broker
+    suits a single ASGI worker and tests. Deployments with several workers set
+    `EVENTS_BROKER` to a class with the same `publish`/`subscribe`/`unsubscribe`
+    interface backed by a shared bus (e.g. Redis pub/sub).
+
+    Methods:
+        publish(channel, event, data): Sends an event to the channel's subscribers.
+        subscribe(channels, last_event_id=None): Returns a queue receiving the channels' events.
+        unsubscribe(queue): Stops delivering events to the queue.
+        connection_count(): Returns the number of subscribed queues.
+    """
+
+    def __init__(self, replay_size=None, queue_size=None):
+        self.replay_size = replay_size or settings.EVENTS_REPLAY_SIZE
+        self.queue_size = queue_size or settings.EVENTS_QUEUE_SIZE
+        self.last_id = 0
+        self.lock = threading.Lock()
+        self.subscribers = {}
+        self.history = {}
+        # Channels without subscribers whose history is kept for replay,
+        # oldest first, with the monotonic time their last subscriber left.
+        self.idle = OrderedDict()
+
+    def next_id(self):
+        self.last_id = max(self.last_id + 1, time.time_ns() // 1000)
+        return self.last_id
+
+    def evict_idle(self):
+        """Drops the history of channels idle for too long, or past the channel limit."""
+        expired = time.monotonic() - settings.EVENTS_REPLAY_SECONDS
+        while self.idle:
+            channel, since = next(iter(self.idle.items()))
+            if since > expired and len(self.idle) <= settings.EVENTS_REPLAY_CHANNELS:
+                break
+            del self.idle[channel]
+            self.history.pop(channel, None)
+
+    def publish(self, channel, event, data):
+        """
+        Sends an event to every subscriber of `channel`.
+
+        A subscriber whose queue is full (a client that stopped reading) misses
+        the event rather than holding up the publisher.
+
+        Args:
+            channel (str): e.g. "user:12" or "course:3".
+            event (str): The event type, sent as the SSE `event` field.
+            data (dict): JSON-serializable payload.
+
+        Returns:
+            int: The event id.
+        """
+        with self.lock:
+            message = (self.next_id(), event, json.dumps(data, default=str))
+            if channel in self.idle:
+                self.idle.move_to_end(channel)
+            self.evict_idle()
+            history = self.history.get(channel)
+            if history is not None:
+                history.append(message)
+            subscribers = list(self.subscribers.get(channel, ()))
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, message)
+            except RuntimeError:  # The subscriber's loop has closed.
+                pass
+
+        return message[0]
+
+    @staticmethod
+    def _deliver(queue, message):
+        if not queue.full():
+            queue.put_nowait(message)
+
+    def subscribe(self, channels, last_event_id=None):
+        """
+        Registers a queue for the events of `channels` on the running event loop.
+
+        Args:
+            channels (list): Channel names to receive.
+            last_event_id (int, optional): Replay retained events newer than this id.
+
+        Returns:
+            asyncio.Queue: Receives (id, event, data) tuples.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(self.queue_size)
+        queue.channels = tuple(channels)
+        with self.lock:
+            missed = []
+            for channel in queue.channels:
+                self.subscribers.setdefault(channel, set()).add((loop, queue))
+                self.idle.pop(channel, None)
+                self.history.setdefault(channel, deque(maxlen=self.replay_size))
+                if last_event_id is not None:
+                    missed.extend(
+                        message
+                        for message in self.history.get(channel, ())
+                        if message[0] > last_event_id
+                    )
+        for message in sorted(missed)[-self.queue_size :]:
+            queue.put_nowait(message)
+
+        return queue
+
+    def unsubscribe(self, queue):
+        with self.lock:
+            for channel in queue.channels:
+                subscribers = self.subscribers.get(channel)
+                if subscribers is None:
+                    continue
+                subscribers = {entry for entry in subscribers if entry[1] is not queue}
+                if subscribers:
+                    self.subscribers[channel] = subscribers
+                else:
+                    del self.subscribers[channel]
+                    self.idle[channel] = time.monotonic()
+            self.evict_idle()
+
+    def connection_count(self):
+        with self.lock:
+            return len(
+                {
+                    id(queue)
+                    for entries in self.subscribers.values()
+                    for _, queue in entries
+                }
+            )
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Returns the process-wide broker configured by `EVENTS_BROKER`."""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(settings.EVENTS_BROKER)()
+        return _broker
+
+
+def reset_broker():
+    """Drops the process-wide broker, e.g. after `EVENTS_BROKER` changed in tests."""
+    global _broker
+    with _broker_lock:
+        _broker = None
+
+
+def publish(channel, event, data):
+    """
+    Publishes an event once the current transaction commits.
+
+    Subscribers may react by fetching the new rows, so they must not be told
+    about rows that are not visible yet (or that are rolled back).
+
+    Args:
+        channel (str): e.g. "user:12" or "course:3".
+        event (str): The event type.
+        data (dict): JSON-serializable payload.
+    """
+    transaction.on_commit(lambda: get_broker().publish(channel, event, data))
@@ -0,0 +1,183 @@
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.models import Job
+
+
+HANDLERS = {}
+
+
+def register(kind):
+    """
+    Registers a function as the handler for a job kind.
+
+    Handlers receive the job payload as keyword arguments. Apps register their
+    handlers in a `tasks` module imported from `AppConfig.ready()`.
+
+    Args:
+        kind (str): The job kind handled by the decorated function.
+
+    Returns:
+        function: The decorator.
+    """
+
+    def decorator(func):
+        HANDLERS[kind] = func
+        return func
+
+    return decorator
+
+
+def enqueue(kind, unique=False, **payload):
+    """
+    Adds a job to the queue.
+
+    Args:
+        kind (str): A registered job kind.
+        unique (bool, optional): Skip the insert if the same job is already pending.
+        **payload: Keyword arguments for the handler; must be JSON serializable.
+
+    Returns:
+        Job: The queued (or already pending) job.
+    """
+    if unique:
+        job = Job.objects.filter(kind=kind, payload=payload, status="Pending").first()
+        if job:
+            return job
+
+    return Job.objects.create(kind=kind, payload=payload)
+
+
+def enqueue_many(kind, payloads):
+    """
+    Adds one job per payload to the queue with a single insert.
+
+    Args:
+        kind (str): A registered job kind.
+        payloads (list): Keyword-argument dicts for the handler.
+
+    Returns:
+        list: The queued jobs.
+    """
+    return Job.objects.bulk_create(
+        [Job(kind=kind, payload=payload) for payload in payloads]
+    )
+
+
+def claim(kinds=None, max_attempts=3):
+    """
+    Marks the oldest pending job as running and returns it.
+
+    Jobs are claimed one at a time, right before they run, so a job never waits
+    behind others while counted as running. Rows are locked with SKIP LOCKED
+    where the database supports it, so several workers can poll the same queue
+    without picking up the same job.
+
+    A job still "Running" `JOBS_VISIBILITY_TIMEOUT` seconds after its attempt
+    started is assumed to belong to a worker that died: it is claimed again,
+    counting as another attempt, or marked "Failed" once it has been attempted
+    `max_attempts` times.
+
+    Args:
+        kinds (list, optional): Only claim jobs of these kinds.
+        max_attempts (int, optional): Attempts before a stale job is marked "Failed".
+            Defaults to 3.
+
+    Returns:
+        Job: The claimed job, or None if there is nothing to run.
+    """
+    now = timezone.now()
+    timeout = settings.JOBS_VISIBILITY_TIMEOUT
+    stale = Q(status="Running", started__lt=now - timedelta(seconds=timeout))
+    with transaction.atomic():
+        queryset = Job.objects.select_for_update(skip_locked=True)
+        if kinds:
+            queryset = queryset.filter(kind__in=kinds)
+
+        abandoned = list(
+            queryset.filter(stale, attempts__gte=max_attempts).values_list(
+                "id", flat=True
+            )
+        )
+        Job.objects.filter(id__in=abandoned).update(
+            status="Failed",
+            finished=now,
+            error=f"No result after {timeout} seconds; "
+            "the worker running the last attempt is assumed to have died.",
+        )
+
+        job = (
+            queryset.filter(Q(status="Pending") | stale)
+            .exclude(id__in=abandoned)
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.status = "Running"
+        job.started = now
+        job.attempts += 1
+        job.save(update_fields=["status", "started", "attempts"])
+
+    return job
+
+
+def run(job, max_attempts=3):
+    """
+    Runs a claimed job and records the outcome.
+
+    Failed jobs go back to "Pending" until they have been attempted
+    `max_attempts` times. A handler that outlives `JOBS_VISIBILITY_TIMEOUT`
+    may have been claimed again by another worker; the outcome is then
+    dropped, as the row belongs to the newer attempt.
+
+    Args:
+        job (Job): A job returned by `claim()`.
+        max_attempts (int, optional): Attempts before a job is marked "Failed". Defaults to 3.
+
+    Returns:
+        bool: True if the handler completed without raising.
+    """
+    try:
+        HANDLERS[job.kind](**job.payload)
+    except Exception:
+        status = "Pending" if job.attempts < max_attempts else "Failed"
+        error = traceback.format_exc()
+    else:
+        status, error = "Done", None
+
+    finished = timezone.now()
+    owned = Job.objects.filter(
+        pk=job.pk, status="Running", attempts=job.attempts
+    ).update(status=status, error=error, finished=finished)
+    if owned:
+        job.status, job.error, job.finished = status, error, finished
+
+    return error is None
+
+
+def run_pending(kinds=None, limit=None):
+    """
+    Claims and runs pending jobs until the queue is empty.
+
+    Args:
+        kinds (list, optional): Only run jobs of these kinds.
+        limit (int, optional): Stop after this many jobs.
+
+    Returns:
+        int: The number of jobs run.
+    """
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim(kinds)
+        if job is None:
+            break
+        run(job)
+        processed += 1
+
+    return processed
@@ -0,0 +1,106 @@
+import asyncio
+import statistics
+import time
+import tracemalloc
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+
+from core.events import get_broker
+
+
+class Command(BaseCommand):
+    """
+    Measures how many idle server-sent event connections one ASGI worker holds.
+
+    Opens `--connections` streams against the ASGI application in-process (no
+    server or sockets, so the numbers are the application's own cost), reports
+    the memory held per idle connection, then publishes `--events` events to a
+    channel every connection subscribes to and reports the fan-out latency
+    until the last connection has received each one.
+
+    Example:
+        python manage.py benchmark_event_stream --connections 2000 --events 20
+    """
+
+    help = "Benchmark server-sent event connection density and fan-out latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--connections", type=int, default=1000)
+        parser.add_argument("--events", type=int, default=20)
+
+    def handle(self, *args, **options):
+        asyncio.run(self.run(options["connections"], options["events"]))
+
+    async def run(self, connections, events):
+        application = get_asgi_application()
+        broker = get_broker()
+        received = [0] * connections
+        arrived = asyncio.Event()
+        disconnect = asyncio.Event()
+
+        async def connection(index):
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": "/api/v1/events/",
+                "raw_path": b"/api/v1/events/",
+                "query_string": f"channel=course:0&channel=user:{index}".encode(),
+                "headers": [(b"host", b"testserver")],
+                "client": ("127.0.0.1", 10000 + index),
+                "server": ("testserver", 80),
+            }
+            request_sent = False
+
+            async def receive():
+                nonlocal request_sent
+                if not request_sent:
+                    request_sent = True
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                await disconnect.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                if message["type"] == "http.response.body" and b"data:" in message.get(
+                    "body", b""
+                ):
+                    received[index] += 1
+                    arrived.set()
+
+            await application(scope, receive, send)
+
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(connection(index)) for index in range(connections)]
+        while broker.connection_count() < connections:
+            await asyncio.sleep(0.01)
+        connect_seconds = time.perf_counter() - started
+        per_connection = (tracemalloc.get_traced_memory()[0] - baseline) / connections
+        tracemalloc.stop()
+
+        latencies = []
+        for number in range(1, events + 1):
+            sent = time.perf_counter()
+            broker.publish("course:0", "benchmark", {"number": number})
+            while min(received) < number:
+                arrived.clear()
+                await arrived.wait()
+            latencies.append(time.perf_counter() - sent)
+
+        disconnect.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.stdout.write(
+            f"connections {connections}  connect {connect_seconds:6.2f} s  "
+            f"memory {per_connection / 1024:6.1f} KiB/connection"
+        )
+        self.stdout.write(
+            f"fan-out to all  p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+            f"max {max(latencies) * 1000:7.1f} ms"
+        )
@@ -0,0 +1,91 @@
+import random
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def fetch(url, size, range_bytes):
+    """
+    Requests one random byte range of `url` the way a video player seeks.
+
+    Args:
+        url (str): The media URL.
+        size (int): Size of the file in bytes.
+        range_bytes (int): Bytes requested per seek; 0 fetches the whole file.
+
+    Returns:
+        tuple: (seconds to the first byte, total seconds, bytes received).
+    """
+    request = urllib.request.Request(url)
+    if range_bytes:
+        start = random.randrange(max(size - range_bytes, 1))
+        request.add_header("Range", f"bytes={start}-{start + range_bytes - 1}")
+
+    started = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        received = len(response.read(1))
+        first_byte = time.perf_counter() - started
+        while chunk := response.read(64 * 1024):
+            received += len(chunk)
+
+    return first_byte, time.perf_counter() - started, received
+
+
+class Command(BaseCommand):
+    """
+    Load-tests a media URL with concurrent viewers seeking through the file.
+
+    Each of `--concurrency` threads issues random `Range` requests (or whole-file
+    downloads with `--range-bytes 0`) and the seek latency (time to first byte)
+    and aggregate throughput are reported. Run it against the same server with
+    different `MEDIA_SERVE_MODE` settings, or before and after a change, to
+    compare how many viewers a worker sustains.
+
+    Example:
+        python manage.py benchmark_media_serving http://localhost:8000/media/course-file/intro.mp4 --concurrency 32
+    """
+
+    help = "Benchmark concurrent ranged downloads of a media URL."
+
+    def add_arguments(self, parser):
+        parser.add_argument("url")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--range-bytes", type=int, default=1024 * 1024)
+
+    def handle(self, *args, **options):
+        url = options["url"]
+        try:
+            with urllib.request.urlopen(
+                urllib.request.Request(url, method="HEAD")
+            ) as response:
+                size = int(response.headers["Content-Length"])
+                accepts_ranges = response.headers.get("Accept-Ranges") == "bytes"
+        except (OSError, TypeError, ValueError) as error:
+            raise CommandError(f"Cannot read {url}: {error}")
+        if options["range_bytes"] and not accepts_ranges:
+            self.stderr.write("The server does not advertise Range support.")
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            results = list(
+                pool.map(
+                    lambda _: fetch(url, size, options["range_bytes"]),
+                    range(options["requests"]),
+                )
+            )
+        wall_time = time.perf_counter() - started
+
+        first_bytes = sorted(result[0] for result in results)
+        received = sum(result[2] for result in results)
+        p99 = first_bytes[min(len(first_bytes) - 1, int(len(first_bytes) * 0.99))]
+
+        self.stdout.write(
+            f"{len(results) / wall_time:8.1f} requests/s  "
+            f"{received / wall_time / 1024 / 1024:8.1f} MiB/s  "
+            f"seek p50 {statistics.median(first_bytes) * 1000:7.1f} ms  "
+            f"p99 {p99 * 1000:7.1f} ms"
+        )
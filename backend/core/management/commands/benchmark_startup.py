@@ -0,0 +1,112 @@
+import json
+import re
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Modules that should only be loaded by the job worker, never by web workers.
+HEAVY_MODULES = ("moviepy", "numpy", "imageio", "imageio_ffmpeg", "PIL.Image")
+
+STARTUP_SCRIPT = """
+import json, resource, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": len(sys.modules),
+    "heavy": [name for name in %r if name in sys.modules],
+}))
+""" % (
+    HEAVY_MODULES,
+)
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure_startup(importtime=False):
+    """
+    Starts a fresh interpreter that sets up Django and loads the URLconf, as a worker does.
+
+    Args:
+        importtime (bool, optional): Run with `-X importtime` and return its report.
+
+    Returns:
+        tuple: (result dict from `STARTUP_SCRIPT`, `-X importtime` stderr or "").
+    """
+    flags = ["-X", "importtime"] if importtime else []
+    result = subprocess.run(
+        [sys.executable, *flags, "-c", STARTUP_SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=settings.BASE_DIR,
+    )
+
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def top_level_imports(report, limit):
+    """
+    Returns the slowest top-level imports from a `-X importtime` report.
+
+    Args:
+        report (str): The stderr of a `-X importtime` run.
+        limit (int): How many imports to return.
+
+    Returns:
+        list: (cumulative microseconds, module name) tuples, slowest first.
+    """
+    imports = []
+    for line in report.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match and len(match.group(3)) == 1:
+            imports.append((int(match.group(2)), match.group(4)))
+
+    return sorted(imports, reverse=True)[:limit]
+
+
+class Command(BaseCommand):
+    """
+    Measures web worker cold-start time and memory.
+
+    Each run starts a new interpreter, calls `django.setup()` and loads the URL
+    patterns, then reports the wall time, peak RSS and module count. The slowest
+    top-level imports come from `python -X importtime`, and the command exits with
+    an error if a module from `HEAVY_MODULES` was loaded, so it can guard CI.
+
+    Example:
+        python manage.py benchmark_startup --runs 5 --top 15
+    """
+
+    help = "Benchmark Django startup time and per-worker memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--top", type=int, default=10)
+
+    def handle(self, *args, **options):
+        runs = [measure_startup()[0] for _ in range(options["runs"])]
+        result, report = measure_startup(importtime=True)
+
+        seconds = [run["seconds"] for run in runs]
+        self.stdout.write(
+            f"startup  median {statistics.median(seconds) * 1000:7.1f} ms  "
+            f"min {min(seconds) * 1000:7.1f} ms  "
+            f"rss {result['rss_kib'] / 1024:6.1f} MiB  "
+            f"modules {result['modules']}"
+        )
+        for microseconds, module in top_level_imports(report, options["top"]):
+            self.stdout.write(f"  {microseconds / 1000:8.1f} ms  {module}")
+
+        if result["heavy"]:
+            raise CommandError(
+                f"Heavy modules loaded at startup: {', '.join(result['heavy'])}"
+            )
@@ -0,0 +1,72 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    """
+    Background worker that runs queued jobs.
+
+    With `--processes N` the worker forks N processes that poll the queue
+    independently, e.g. to spread CPU-bound transcoding jobs across cores.
+    Each process claims one job at a time.
+
+    Example:
+        python manage.py run_jobs --kind probe_media --sleep 2
+        python manage.py run_jobs --kind package_hls --processes 4
+    """
+
+    help = "Run queued background jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kind",
+            action="append",
+            dest="kinds",
+            help="Only run jobs of this kind (repeatable).",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Exit once the queue is empty."
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when the queue is empty (default: 1).",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Worker processes to fork (default: 1).",
+        )
+
+    def handle(self, *args, **options):
+        if options["processes"] <= 1:
+            return self.work(options)
+
+        # Children must open their own database connections.
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        processes = [
+            context.Process(target=self.work, args=(options,))
+            for _ in range(options["processes"])
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+    def work(self, options):
+        while True:
+            processed = jobs.run_pending(kinds=options["kinds"])
+            if processed:
+                self.stdout.write(f"Ran {processed} jobs.")
+            if options["once"]:
+                break
+            if not processed:
+                time.sleep(options["sleep"])
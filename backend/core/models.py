@@ -1,3 +1,131 @@
 from django.db import models
+from django.db.models.base import DEFERRED
+from django.utils import timezone
 
-# Create your models here.
+
+class TrackedFieldsMixin:
+    """
+    Remembers the database values of selected fields so saves can tell what changed.
+
+    Attributes:
+        tracked_fields (tuple): Names of the model fields whose loaded values are kept.
+
+    Methods:
+        from_db(db, field_names, values): Loads the instance and stores its tracked values.
+        save(*args, **kwargs): Saves the instance and resets the stored values.
+        changed_fields(): Returns the tracked field names that differ from the stored values.
+        has_changed(*fields): Returns True if any of the given tracked fields changed.
+
+    Note:
+        - Instances that were never loaded from or saved to the database report every
+          tracked field as changed.
+        - Fields deferred by `only()`/`defer()` and not assigned since are never reported
+          as changed; loading them later records their database value.
+        - File fields are compared by their stored name.
+    """
+
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        instance._tracked_values = {
+            name: loaded[cls._meta.get_field(name).attname]
+            for name in cls.tracked_fields
+            if loaded.get(cls._meta.get_field(name).attname, DEFERRED) is not DEFERRED
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.reset_tracked_fields()
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using, fields, **kwargs)
+        # Also reached when a deferred field is first read.
+        tracked_values = getattr(self, "_tracked_values", {})
+        for name in self._loaded_tracked_fields():
+            if fields is None or {name, self._meta.get_field(name).attname} & set(
+                fields
+            ):
+                tracked_values[name] = self._tracked_value(name)
+        self._tracked_values = tracked_values
+
+    def reset_tracked_fields(self):
+        self._tracked_values = {
+            name: self._tracked_value(name) for name in self._loaded_tracked_fields()
+        }
+
+    def _loaded_tracked_fields(self):
+        deferred = self.get_deferred_fields()
+        return [
+            name
+            for name in self.tracked_fields
+            if self._meta.get_field(name).attname not in deferred
+        ]
+
+    def _tracked_value(self, name):
+        value = getattr(self, self._meta.get_field(name).attname)
+        return getattr(value, "name", value)
+
+    def changed_fields(self):
+        tracked_values = getattr(self, "_tracked_values", {})
+        return {
+            name
+            for name in self._loaded_tracked_fields()
+            if name not in tracked_values
+            or tracked_values[name] != self._tracked_value(name)
+        }
+
+    def has_changed(self, *fields):
+        return bool(self.changed_fields().intersection(fields or self.tracked_fields))
+
+
+JOB_STATUS = (
+    ("Pending", "Pending"),
+    ("Running", "Running"),
+    ("Done", "Done"),
+    ("Failed", "Failed"),
+)
+
+
+class Job(models.Model):
+    """
+    Represents a unit of background work picked up by the `run_jobs` worker.
+
+    Args:
+        models (module): The Django models module.
+
+    Attributes:
+        kind (CharField): The registered handler name (see `core.jobs.register`).
+        payload (JSONField): Keyword arguments passed to the handler.
+        status (CharField): The job status (choices: "Pending", "Running", "Done", "Failed").
+        attempts (PositiveIntegerField): How many times the job has been started.
+        error (TextField): The traceback of the last failure (nullable).
+        date (DateTimeField): The creation date of the job (default: current time).
+        started (DateTimeField): When the last attempt started (nullable).
+        finished (DateTimeField): When the job finished (nullable).
+
+    Methods:
+        __str__(): Returns the kind and status of the job.
+
+    Meta:
+        ordering = ['date']
+    """
+
+    kind = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(choices=JOB_STATUS, default="Pending", max_length=20)
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(null=True, blank=True)
+    date = models.DateTimeField(default=timezone.now)
+    started = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["date"]
+        indexes = [models.Index(fields=["status", "kind", "date"])]
+
+    def __str__(self):
+        return f"{self.kind} ({self.status})"
@@ -0,0 +1,100 @@
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+
+SIGNATURE_SALT = "core.storage.media-url"
+
+
+def is_public(name):
+    """
+    Returns True for content-addressed media that may be fetched without a signature.
+
+    HLS playlists reference their segments by relative URL and image derivatives
+    are shared between rows, so they are served unsigned (see
+    `MEDIA_IMMUTABLE_PREFIXES`); everything else is only reachable through an
+    expiring URL.
+
+    Args:
+        name (str): The storage name.
+
+    Returns:
+        bool: True if the name is under a public prefix.
+    """
+    return name.startswith(tuple(settings.MEDIA_IMMUTABLE_PREFIXES))
+
+
+def sign(name, expires):
+    return salted_hmac(SIGNATURE_SALT, f"{name}:{expires}").hexdigest()
+
+
+def signed_query(name):
+    """
+    Returns the `expires` and `signature` query string authorizing a file.
+
+    Expiry times are rounded up to `MEDIA_URL_EXPIRY` so a file keeps the same
+    URL (and stays in browser caches) for a while.
+
+    Args:
+        name (str): The storage name.
+
+    Returns:
+        str: The URL-encoded query string.
+    """
+    window = settings.MEDIA_URL_EXPIRY
+    expires = (int(time.time()) // window + 2) * window
+    return urlencode({"expires": expires, "signature": sign(name, expires)})
+
+
+def verify_signature(name, params):
+    """
+    Checks the query parameters of a `/media/` request against the file name.
+
+    Shared by every media storage, so `core.views.serve_media` applies the same
+    check whether it streams the file or redirects to the storage.
+
+    Args:
+        name (str): The storage name.
+        params (QueryDict): The request's query parameters.
+
+    Returns:
+        bool: True for public files and unexpired, valid signatures.
+    """
+    if is_public(name):
+        return True
+    try:
+        expires = int(params.get("expires", ""))
+    except ValueError:
+        return False
+
+    return expires >= time.time() and constant_time_compare(
+        params.get("signature", ""), sign(name, expires)
+    )
+
+
+class SignedFileSystemStorage(FileSystemStorage):
+    """
+    Local-disk storage that hands out expiring, signed URLs like S3 presigned URLs.
+
+    It is the offline stand-in for `core.storage_s3.MediaS3Storage`: `url()`
+    returns `MEDIA_URL` links carrying `expires` and `signature` parameters,
+    which `core.views.serve_media` checks with `verify_url()` (see
+    `signed_query` and `verify_signature`).
+
+    Methods:
+        url(name): Returns a signed URL for the file.
+        verify_url(name, params): Returns True if the query parameters authorize the file.
+    """
+
+    def url(self, name):
+        url = super().url(name)
+        if is_public(name):
+            return url
+
+        return f"{url}?{signed_query(name)}"
+
+    def verify_url(self, name, params):
+        return verify_signature(name, params)
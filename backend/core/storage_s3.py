@@ -0,0 +1,47 @@
+from boto3.s3.transfer import TransferConfig
+from django.conf import settings
+from storages.backends.s3 import S3Storage
+
+from core.storage import is_public, verify_signature
+
+
+class MediaS3Storage(S3Storage):
+    """
+    S3-compatible media storage with parallel multipart uploads and presigned reads.
+
+    Files larger than `MEDIA_S3_MULTIPART_THRESHOLD` are uploaded in
+    `MEDIA_S3_MULTIPART_CHUNKSIZE` parts by up to `MEDIA_S3_MAX_CONCURRENCY`
+    threads. `url()` returns presigned GET URLs so clients download straight
+    from the bucket, except for public content-addressed prefixes (see
+    `core.storage.is_public`), which the bucket policy must allow anonymous
+    reads on.
+
+    Requests for private files through Django's `/media/` route are checked
+    with `verify_url()`, the same signature check as
+    `core.storage.SignedFileSystemStorage`, before being redirected to a
+    presigned URL.
+
+    Methods:
+        url(name, parameters=None, expire=None, http_method=None): Returns a presigned or public URL.
+        verify_url(name, params): Returns True if the query parameters authorize the file.
+    """
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.transfer_config = TransferConfig(
+            multipart_threshold=settings.MEDIA_S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=settings.MEDIA_S3_MULTIPART_CHUNKSIZE,
+            max_concurrency=settings.MEDIA_S3_MAX_CONCURRENCY,
+            use_threads=True,
+        )
+
+    def url(self, name, parameters=None, expire=None, http_method=None):
+        url = super().url(name, parameters, expire, http_method)
+        if is_public(name) and self.querystring_auth and not self.custom_domain:
+            # The object path is the same, just without the signing query string.
+            return url.split("?", 1)[0]
+
+        return url
+
+    def verify_url(self, name, params):
+        return verify_signature(name, params)
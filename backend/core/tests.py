@@ -1,3 +1,393 @@
-from django.test import TestCase
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from userauths.models import User
+
+from api.models import Course, Notification, QuestionAnswer, Teacher
+from core import jobs
+from core.events import get_broker, reset_broker
+from core.management.commands.benchmark_startup import measure_startup
+from core.models import Job
+from core.storage import sign
+from core.storage_s3 import MediaS3Storage
+from core.views import parse_range_header
+
+
+class MediaServingTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        os.makedirs(os.path.join(self.media_root, "course-file"))
+        self.content = bytes(range(256)) * 40
+        with open(os.path.join(self.media_root, "course-file", "intro.mp4"), "wb") as f:
+            f.write(self.content)
+
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def get(self, path="/media/course-file/intro.mp4", **headers):
+        return self.client.get(path, **headers)
+
+    def test_parse_range_header(self):
+        """Test that ranges are clamped, merged and validated."""
+        assert parse_range_header("bytes=0-9", 100) == [(0, 9)]
+        assert parse_range_header("bytes=90-", 100) == [(90, 99)]
+        assert parse_range_header("bytes=-10", 100) == [(90, 99)]
+        assert parse_range_header("bytes=50-500", 100) == [(50, 99)]
+        assert parse_range_header("bytes=20-29,0-9,5-14", 100) == [(0, 14), (20, 29)]
+        assert parse_range_header("bytes=200-300", 100) == []
+        assert parse_range_header("bytes=9-0", 100) is None
+        assert parse_range_header("items=0-9", 100) is None
+        assert parse_range_header("bytes=" + ",".join(["0-1"] * 20), 100) is None
+
+    def test_full_file(self):
+        """Test that a request without Range returns the whole file with validators."""
+        response = self.get()
+
+        assert response.status_code == 200
+        assert b"".join(response.streaming_content) == self.content
+        assert response["Content-Length"] == str(len(self.content))
+        assert response["Content-Type"] == "video/mp4"
+        assert response["Accept-Ranges"] == "bytes"
+        assert response["ETag"]
+
+    def test_single_range(self):
+        """Test that a single range returns 206 with only the requested bytes."""
+        response = self.get(HTTP_RANGE="bytes=1000-1999")
+
+        assert response.status_code == 206
+        assert b"".join(response.streaming_content) == self.content[1000:2000]
+        assert response["Content-Length"] == "1000"
+        assert response["Content-Range"] == f"bytes 1000-1999/{len(self.content)}"
+
+    def test_multiple_ranges(self):
+        """Test that several ranges are returned as multipart/byteranges."""
+        response = self.get(HTTP_RANGE="bytes=0-9,-10")
+        body = b"".join(response.streaming_content)
+
+        assert response.status_code == 206
+        assert response["Content-Type"].startswith("multipart/byteranges; boundary=")
+        assert response["Content-Length"] == str(len(body))
+        assert self.content[:10] in body
+        assert self.content[-10:] in body
+        assert f"Content-Range: bytes 0-9/{len(self.content)}".encode() in body
+
+    def test_unsatisfiable_range(self):
+        """Test that a range past the end of the file returns 416."""
+        response = self.get(HTTP_RANGE=f"bytes={len(self.content)}-")
+
+        assert response.status_code == 416
+        assert response["Content-Range"] == f"bytes */{len(self.content)}"
+
+    def test_conditional_requests(self):
+        """Test If-None-Match and If-Range against the file's ETag."""
+        etag = self.get()["ETag"]
+
+        assert self.get(HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        response = self.get(HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=etag)
+        assert response.status_code == 206
+
+        response = self.get(HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+        assert response.status_code == 200
+        assert b"".join(response.streaming_content) == self.content
+
+    def test_missing_and_traversal(self):
+        """Test that missing files and paths outside MEDIA_ROOT return 404."""
+        assert self.get("/media/course-file/missing.mp4").status_code == 404
+        assert self.get("/media/course-file").status_code == 404
+        assert self.get("/media/../settings.py").status_code == 404
+
+    def test_proxy_handoff(self):
+        """Test that the X-Accel-Redirect and X-Sendfile modes delegate the transfer."""
+        with override_settings(
+            MEDIA_SERVE_MODE="x-accel-redirect",
+            MEDIA_ACCEL_REDIRECT_PREFIX="/protected-media/",
+        ):
+            response = self.get(HTTP_RANGE="bytes=0-9")
+        assert response.status_code == 200
+        assert response["X-Accel-Redirect"] == "/protected-media/course-file/intro.mp4"
+        assert response.content == b""
+
+        with override_settings(MEDIA_SERVE_MODE="x-sendfile"):
+            response = self.get()
+        assert response["X-Sendfile"] == os.path.join(
+            self.media_root, "course-file", "intro.mp4"
+        )
+
+
+class JobQueueTest(TestCase):
+    def test_jobs_of_dead_workers_are_reclaimed_or_failed(self):
+        """Test stale running jobs are claimed again until they run out of attempts."""
+        long_ago = timezone.now() - timedelta(seconds=7200)
+        orphaned = Job.objects.create(
+            kind="noop", status="Running", attempts=1, started=long_ago
+        )
+        exhausted = Job.objects.create(
+            kind="noop", status="Running", attempts=3, started=long_ago
+        )
+        busy = Job.objects.create(
+            kind="noop", status="Running", attempts=1, started=timezone.now()
+        )
+
+        with override_settings(JOBS_VISIBILITY_TIMEOUT=3600):
+            claimed = jobs.claim(["noop"])
+            assert jobs.claim(["noop"]) is None
+
+        assert claimed.pk == orphaned.pk
+        assert claimed.attempts == 2
+        exhausted.refresh_from_db()
+        assert exhausted.status == "Failed"
+        assert "3600 seconds" in exhausted.error
+        busy.refresh_from_db()
+        assert (busy.status, busy.attempts) == ("Running", 1)
+
+    def test_outcome_of_a_reclaimed_job_is_dropped(self):
+        """Test a worker that outlived the visibility timeout does not overwrite the newer attempt."""
+        job = jobs.enqueue("noop")
+        slow = jobs.claim(["noop"])
+        Job.objects.filter(pk=job.pk).update(
+            started=timezone.now() - timedelta(seconds=7200)
+        )
+        with override_settings(JOBS_VISIBILITY_TIMEOUT=3600):
+            reclaimed = jobs.claim(["noop"])
+        assert reclaimed.attempts == 2
+
+        with mock.patch.dict(jobs.HANDLERS, noop=mock.Mock()):
+            assert jobs.run(slow)
+            job.refresh_from_db()
+            assert (job.status, job.attempts) == ("Running", 2)
+
+            assert jobs.run(reclaimed)
+        job.refresh_from_db()
+        assert job.status == "Done"
+
+
+class StartupTest(TestCase):
+    def test_media_stack_is_not_imported_at_startup(self):
+        """Test that setting up Django and loading the URLconf skips the video and image stack."""
+        result, _ = measure_startup()
+
+        assert result["heavy"] == []
+
+
+class MediaStorageTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+
+    def storages(self, backend, **options):
+        return override_settings(
+            MEDIA_ROOT=self.media_root,
+            STORAGES={
+                "default": {"BACKEND": backend, "OPTIONS": options},
+                "staticfiles": {
+                    "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+                },
+            },
+        )
+
+    def test_signed_local_urls(self):
+        """Test that the filesystem stand-in only serves private files through valid signed URLs."""
+        with self.storages("core.storage.SignedFileSystemStorage"):
+            name = default_storage.save("course-file/intro.mp4", ContentFile(b"video"))
+            default_storage.save("hls/abc/master.m3u8", ContentFile(b"#EXTM3U"))
+            url = default_storage.url(name)
+
+            assert "signature=" in url
+            assert self.client.get(url).status_code == 200
+            assert self.client.get(url.split("?")[0]).status_code == 403
+            assert (
+                self.client.get(url.replace("signature=", "signature=x")).status_code
+                == 403
+            )
+            assert (
+                default_storage.url("hls/abc/master.m3u8")
+                == "/media/hls/abc/master.m3u8"
+            )
+            assert self.client.get("/media/hls/abc/master.m3u8").status_code == 200
+
+            with mock.patch("core.storage.time.time", return_value=time.time() + 86400):
+                assert self.client.get(url).status_code == 403
+
+    def test_s3_presigned_urls_and_redirect(self):
+        """Test that S3 storage presigns private files, tunes multipart uploads and verifies redirects."""
+        # Constructed directly: overriding STORAGES on Django 4.2 drops the
+        # default backend's OPTIONS.
+        with override_settings(MEDIA_S3_MULTIPART_CHUNKSIZE=8 * 1024 * 1024):
+            storage = MediaS3Storage(
+                bucket_name="media",
+                endpoint_url="http://localhost:9000",
+                region_name="us-east-1",
+                access_key="test",
+                secret_key="test",
+            )
+        assert storage.transfer_config.multipart_chunksize == 8 * 1024 * 1024
+        assert storage.transfer_config.use_threads
+
+        prefix = "http://localhost:9000/media/course-file/intro.mp4?"
+        url = storage.url("course-file/intro.mp4")
+        assert url.startswith(prefix)
+        assert "Signature" in url
+        assert "Signature" not in storage.url("hls/abc/master.m3u8")
+
+        name = "course-file/intro.mp4"
+        with mock.patch("core.views.default_storage", storage):
+            unsigned = self.client.get(f"/media/{name}")
+            expires = int(time.time()) + 60
+            signed = self.client.get(
+                f"/media/{name}?expires={expires}&signature={sign(name, expires)}"
+            )
+            public = self.client.get("/media/hls/abc/master.m3u8")
+        assert unsigned.status_code == 403
+        assert signed.status_code == 302
+        assert signed["Location"].startswith(prefix)
+        assert public.status_code == 302
+
+
+class EventStreamTest(TestCase):
+    def setUp(self):
+        reset_broker()
+        self.addCleanup(reset_broker)
+        self.user = User.objects.create(
+            email="subscriber@example.com", username="subscriber"
+        )
+        self.token = str(AccessToken.for_user(self.user))
+
+    async def read_event(self, stream):
+        chunk = ""
+        while "data:" not in chunk:
+            chunk = await asyncio.wait_for(anext(stream), 5)
+            chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        return dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+
+    async def test_stream_delivers_and_replays_channel_events(self):
+        """Test subscribers receive their channels' events and can resume from Last-Event-ID."""
+        broker = get_broker()
+        with override_settings(EVENTS_MAX_AGE_SECONDS=0.5):
+            channel = f"user:{self.user.pk}"
+            response = await self.async_client.get(
+                "/api/v1/events/",
+                {"channel": ["course:1", channel], "token": self.token},
+            )
+            assert response.status_code == 200
+            assert response["Content-Type"] == "text/event-stream"
+            stream = aiter(response.streaming_content)
+            assert (await anext(stream)).startswith(b"retry:")
+
+            broker.publish("course:2", "qa.question", {"title": "Elsewhere"})
+            first = broker.publish("course:1", "qa.question", {"title": "Hello"})
+            notification = broker.publish(
+                channel, "notification", {"type": "New Order"}
+            )
+
+            event = await self.read_event(stream)
+            assert event == {
+                "id": str(first),
+                "event": "qa.question",
+                "data": '{"title": "Hello"}',
+            }
+            assert (await self.read_event(stream))["event"] == "notification"
+            # The stream ends at EVENTS_MAX_AGE_SECONDS and unsubscribes.
+            assert [chunk async for chunk in stream] == []
+            assert broker.connection_count() == 0
+
+            response = await self.async_client.get(
+                "/api/v1/events/",
+                {"channel": channel, "token": self.token},
+                headers={"Last-Event-ID": "0"},
+            )
+            chunks = [chunk async for chunk in response.streaming_content]
+        assert chunks[1].startswith(
+            f"id: {notification}\nevent: notification\n".encode()
+        )
+        assert len(chunks) == 2
+
+    async def test_history_is_kept_only_for_followed_channels(self):
+        """Test unfollowed channels keep no history and idle channels are evicted."""
+        broker = get_broker()
+        before = time.time_ns() // 1000
+        broker.publish("course:1", "qa.question", {"title": "Unheard"})
+        assert broker.history == {}
+
+        queue = broker.subscribe(["course:1", "course:2"])
+        ids = [broker.publish("course:1", "qa.question", {"n": n}) for n in range(3)]
+        assert before <= ids[0] < ids[1] < ids[2]
+        broker.unsubscribe(queue)
+        assert len(broker.history["course:1"]) == 3
+
+        with override_settings(EVENTS_REPLAY_CHANNELS=1):
+            broker.publish("course:1", "qa.question", {"n": 3})
+        assert list(broker.history) == ["course:1"]
+        with override_settings(EVENTS_REPLAY_SECONDS=0):
+            broker.publish("course:1", "qa.question", {"n": 4})
+        assert broker.history == {}
+
+    def test_wsgi_requests_are_refused(self):
+        """Test the stream is only served by the ASGI application."""
+        assert (
+            self.client.get("/api/v1/events/", {"channel": "user:1"}).status_code == 501
+        )
+
+    async def test_rejects_unknown_channels(self):
+        """Test subscriptions to unknown or too many channels return 400."""
+        response = await self.async_client.get("/api/v1/events/", {"channel": "admin"})
+        assert response.status_code == 400
+        response = await self.async_client.get("/api/v1/events/")
+        assert response.status_code == 400
+
+    async def test_private_channels_need_their_owners_token(self):
+        """Test user and teacher channels are refused without the owner's token."""
+        other = await User.objects.acreate(email="other@example.com", username="other")
+        teacher = await Teacher.objects.acreate(user=other, full_name="Jane Smith")
+        url = "/api/v1/events/"
+        for params in (
+            {"channel": f"user:{self.user.pk}"},
+            {"channel": f"user:{self.user.pk}", "token": "invalid"},
+            {"channel": f"user:{other.pk}", "token": self.token},
+            {"channel": f"teacher:{teacher.pk}", "token": self.token},
+        ):
+            assert (await self.async_client.get(url, params)).status_code == 403
+
+        token = str(AccessToken.for_user(other))
+        with override_settings(EVENTS_MAX_AGE_SECONDS=0):
+            response = await self.async_client.get(
+                url, {"channel": [f"teacher:{teacher.pk}", "course:1"], "token": token}
+            )
+        assert response.status_code == 200
+
+    def test_new_rows_are_published_after_commit(self):
+        """Test notifications and Q&A posts are pushed to user, teacher and course channels."""
+        user = User.objects.create(email="student@example.com", username="student")
+        teacher = Teacher.objects.create(user=user, full_name="Jane Smith")
+        course = Course.objects.create(teacher=teacher, title="Python")
+        broker = get_broker()
+
+        with mock.patch.object(broker, "publish") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                Notification.objects.create(
+                    user=user, teacher=teacher, type="New Order"
+                )
+                QuestionAnswer.objects.create(course=course, user=user, title="Hi")
+                assert not publish.called
+
+        channels = [call.args[:2] for call in publish.call_args_list]
+        assert channels == [
+            ("user:%d" % user.id, "notification"),
+            ("teacher:%d" % teacher.id, "notification"),
+            ("course:%d" % course.id, "qa.question"),
+            # The question also notifies the course's teacher.
+            ("teacher:%d" % teacher.id, "notification"),
+        ]
@@ -1,3 +1,409 @@
-from django.shortcuts import render
+import asyncio
+import mimetypes
+import os
+import re
+from urllib.parse import quote
 
-# Create your views here.
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+    HttpResponseNotAllowed,
+    HttpResponseRedirect,
+    StreamingHttpResponse,
+)
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import get_random_string
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.events import get_broker
+
+
+RANGE_RE = re.compile(r"^\s*(\d*)\s*-\s*(\d*)\s*$")
+
+MAX_RANGES = 16
+
+EVENT_CHANNEL_RE = re.compile(r"^(user|teacher|course):\d+$")
+
+# Streaming types missing from (or wrong in) the system mimetypes database.
+MEDIA_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t",
+    ".webp": "image/webp",
+}
+
+
+def parse_range_header(header, size):
+    """
+    Parses a `Range: bytes=...` header into inclusive byte ranges.
+
+    Overlapping and adjacent ranges are merged and at most `MAX_RANGES` are
+    accepted, so a request cannot make the server send the same bytes many times.
+
+    Args:
+        header (str): The raw Range header value.
+        size (int): Size of the file in bytes.
+
+    Returns:
+        list: Sorted (start, end) tuples, an empty list if no range is
+        satisfiable, or None if the header is malformed and must be ignored.
+    """
+    unit, _, specs = header.partition("=")
+    specs = specs.split(",")
+    if unit.strip().lower() != "bytes" or len(specs) > MAX_RANGES:
+        return None
+
+    ranges = []
+    for spec in specs:
+        match = RANGE_RE.match(spec)
+        if not match or match.groups() == ("", ""):
+            return None
+        first, last = match.groups()
+        if not first:
+            # Suffix range: the last N bytes.
+            if int(last) > 0 and size > 0:
+                ranges.append((max(size - int(last), 0), size - 1))
+            continue
+        if last and int(last) < int(first):
+            return None
+        if int(first) < size:
+            ranges.append((int(first), min(int(last), size - 1) if last else size - 1))
+
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+
+    return merged
+
+
+class RangeFile:
+    """
+    A read-only view of `length` bytes of an open file starting at `start`.
+
+    `fileno()` exposes the underlying descriptor, already positioned at
+    `start`, so WSGI servers with `wsgi.file_wrapper` support (gunicorn) send
+    the range with `os.sendfile`; other servers fall back to `read()`, which
+    stops at the end of the range.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def multipart_byteranges(path, ranges, size, content_type, boundary, block_size):
+    """
+    Yields a `multipart/byteranges` body for several ranges of a file.
+
+    Args:
+        path (str): Path of the file.
+        ranges (list): (start, end) tuples from `parse_range_header`.
+        size (int): Size of the file in bytes.
+        content_type (str): Content type of each part.
+        boundary (str): The multipart boundary.
+        block_size (int): Bytes read per chunk.
+
+    Yields:
+        bytes: Chunks of the response body.
+    """
+    with open(path, "rb") as file:
+        for start, end in ranges:
+            yield multipart_part_header(start, end, size, content_type, boundary)
+            file.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                data = file.read(min(block_size, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                yield data
+            yield b"\r\n"
+        yield f"--{boundary}--\r\n".encode()
+
+
+def multipart_part_header(start, end, size, content_type, boundary):
+    return (
+        f"--{boundary}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+    ).encode()
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serves a file from the media storage with HTTP Range and conditional request support.
+
+    Single ranges are answered with `206 Partial Content` and streamed with
+    zero-copy `sendfile` where the WSGI server supports it; multiple ranges use
+    `multipart/byteranges`. `ETag`/`Last-Modified` enable `304` responses and
+    `If-Range`. With `MEDIA_SERVE_MODE` set to "x-accel-redirect" or
+    "x-sendfile" the transfer is handed to the fronting proxy instead.
+
+    Storages with signed URLs (`core.storage.SignedFileSystemStorage` and
+    `core.storage_s3.MediaS3Storage`) are checked with `verify_url()` first,
+    and remote storages (S3) are then answered with a redirect to a presigned
+    URL so the bytes never pass through Django.
+
+    Args:
+        request (HttpRequest): The incoming GET or HEAD request.
+        path (str): The storage name of the file.
+
+    Returns:
+        HttpResponse: The file, a range of it, or a redirect for the client or proxy.
+    """
+    verify_url = getattr(default_storage, "verify_url", None)
+    if verify_url and not verify_url(path, request.GET):
+        return HttpResponseForbidden("Invalid or expired media URL.")
+
+    try:
+        full_path = default_storage.path(path)
+    except SuspiciousFileOperation:
+        raise Http404("File does not exist.")
+    except NotImplementedError:
+        return HttpResponseRedirect(default_storage.url(path))
+    try:
+        stat = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404("File does not exist.")
+    if not os.path.isfile(full_path):
+        raise Http404("File does not exist.")
+
+    size = stat.st_size
+    etag = f'"{int(stat.st_mtime):x}-{size:x}"'
+    last_modified = http_date(stat.st_mtime)
+    content_type = (
+        MEDIA_TYPES.get(os.path.splitext(full_path)[1].lower())
+        or mimetypes.guess_type(full_path)[0]
+        or "application/octet-stream"
+    )
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        response = build_media_response(
+            request, path, full_path, size, etag, content_type
+        )
+
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = last_modified
+    response.headers["Accept-Ranges"] = "bytes"
+    if path.startswith(tuple(settings.MEDIA_IMMUTABLE_PREFIXES)):
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+
+    return response
+
+
+def build_media_response(request, path, full_path, size, etag, content_type):
+    mode = settings.MEDIA_SERVE_MODE
+    if mode == "x-accel-redirect":
+        response = HttpResponse(content_type=content_type)
+        response.headers[
+            "X-Accel-Redirect"
+        ] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(path)
+        return response
+    if mode == "x-sendfile":
+        response = HttpResponse(content_type=content_type)
+        response.headers["X-Sendfile"] = full_path
+        return response
+
+    ranges = None
+    range_header = request.headers.get("Range")
+    if range_header and if_range_matches(request, etag, full_path):
+        ranges = parse_range_header(range_header, size)
+
+    if ranges == []:
+        response = HttpResponse(status=416)
+        response.headers["Content-Range"] = f"bytes */{size}"
+        return response
+
+    if not ranges:
+        return FileResponse(open(full_path, "rb"), content_type=content_type)
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        response = FileResponse(
+            RangeFile(open(full_path, "rb"), start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response.headers["Content-Length"] = end - start + 1
+        response.headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return response
+
+    boundary = get_random_string(24)
+    response = StreamingHttpResponse(
+        multipart_byteranges(
+            full_path, ranges, size, content_type, boundary, FileResponse.block_size
+        ),
+        status=206,
+        content_type=f"multipart/byteranges; boundary={boundary}",
+    )
+    response.headers["Content-Length"] = sum(
+        len(multipart_part_header(start, end, size, content_type, boundary))
+        + (end - start + 1)
+        + 2
+        for start, end in ranges
+    ) + len(f"--{boundary}--\r\n")
+    return response
+
+
+def if_range_matches(request, etag, full_path):
+    """
+    Returns True if a Range header should be honoured given `If-Range`.
+
+    Args:
+        request (HttpRequest): The incoming request.
+        etag (str): The current ETag of the file.
+        full_path (str): Path of the file.
+
+    Returns:
+        bool: False if `If-Range` names a different version of the file.
+    """
+    if_range = request.headers.get("If-Range")
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == etag
+
+    modified_since = parse_http_date_safe(if_range)
+    return (
+        modified_since is not None
+        and int(os.stat(full_path).st_mtime) <= modified_since
+    )
+
+
+async def event_stream(request):
+    """
+    Streams server-sent events for the channels in `?channel=` (repeatable).
+
+    Channels are "user:<id>", "teacher:<id>" and "course:<id>". The private
+    "user:" and "teacher:" channels need a JWT access token in `?token=`
+    (`EventSource` cannot send an Authorization header) and must belong to the
+    token's user; the token's short lifetime bounds how long it is useful if it
+    leaks into a log. An idle client
+    holds one open connection that costs a queue and a suspended coroutine,
+    with a comment line every `EVENTS_KEEPALIVE_SECONDS` to keep proxies from
+    closing it. Streams end after `EVENTS_MAX_AGE_SECONDS`; `EventSource`
+    reconnects with `Last-Event-ID` and the broker replays what was missed.
+
+    Requires an ASGI server: under WSGI each stream would hold a worker thread.
+
+    Args:
+        request (HttpRequest): The incoming GET request.
+
+    Returns:
+        StreamingHttpResponse: A `text/event-stream` response.
+    """
+    # `require_safe` does not wrap coroutines before Django 5.0.
+    if request.method not in ("GET", "HEAD"):
+        return HttpResponseNotAllowed(["GET", "HEAD"])
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse("Event streams require the ASGI application.", status=501)
+
+    channels = request.GET.getlist("channel")
+    if not channels or len(channels) > settings.EVENTS_MAX_CHANNELS:
+        return HttpResponseBadRequest(
+            f"Subscribe to between 1 and {settings.EVENTS_MAX_CHANNELS} channels."
+        )
+    if not all(EVENT_CHANNEL_RE.match(channel) for channel in channels):
+        return HttpResponseBadRequest("Unknown channel.")
+    private = {channel for channel in channels if not channel.startswith("course:")}
+    if private and not private <= await owned_channels(request.GET.get("token")):
+        return HttpResponseForbidden("Private channels need their owner's token.")
+    last_event_id = request.headers.get("Last-Event-ID") or request.GET.get(
+        "last_event_id"
+    )
+    last_event_id = int(last_event_id) if str(last_event_id).isdigit() else None
+
+    response = StreamingHttpResponse(
+        sse_messages(channels, last_event_id), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+async def owned_channels(token):
+    """
+    Returns the private channels the user of a JWT access token may follow.
+
+    Args:
+        token (str): The access token from the query string.
+
+    Returns:
+        set: The user's "user:" channel and one "teacher:" channel per teacher
+        profile, or an empty set for a missing, invalid or expired token or an
+        inactive user.
+    """
+    # `AccessToken(None)` would mint a new token instead of verifying one.
+    if not token:
+        return set()
+    try:
+        user_id = AccessToken(token)[jwt_settings.USER_ID_CLAIM]
+    except (TokenError, KeyError):
+        return set()
+    if not await get_user_model().objects.filter(pk=user_id, is_active=True).aexists():
+        return set()
+
+    teachers = apps.get_model("api", "Teacher").objects.filter(user_id=user_id)
+    return {f"user:{user_id}"} | {
+        f"teacher:{teacher_id}"
+        async for teacher_id in teachers.values_list("pk", flat=True)
+    }
+
+
+async def sse_messages(channels, last_event_id):
+    broker = get_broker()
+    queue = broker.subscribe(channels, last_event_id)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.EVENTS_MAX_AGE_SECONDS
+    try:
+        yield f"retry: {settings.EVENTS_RETRY_MILLISECONDS}\n\n"
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                event_id, event, data = await asyncio.wait_for(
+                    queue.get(), min(settings.EVENTS_KEEPALIVE_SECONDS, remaining)
+                )
+            except asyncio.TimeoutError:
+                if loop.time() < deadline:
+                    yield ": keepalive\n\n"
+                continue
+            yield f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+    finally:
+        broker.unsubscribe(queue)
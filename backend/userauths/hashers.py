@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, ScryptPasswordHasher
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """
+    Scrypt hasher whose cost is read from `settings.PASSWORD_HASHER_COSTS["scrypt"]`.
+
+    The algorithm name stays "scrypt", so hashes remain compatible with Django's
+    stock hasher and are re-hashed on the next login whenever the configured cost
+    changes (see `must_update`).
+    """
+
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_HASHER_COSTS["scrypt"]["work_factor"]
+
+    @property
+    def block_size(self):
+        return settings.PASSWORD_HASHER_COSTS["scrypt"]["block_size"]
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_HASHER_COSTS["scrypt"]["parallelism"]
+
+    @property
+    def maxmem(self):
+        # OpenSSL refuses to use more than 32 MiB unless told otherwise; scrypt
+        # needs 128 * N * r bytes, so leave headroom for the configured cost.
+        return 2 * 128 * self.work_factor * self.block_size
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2 hasher whose cost is read from `settings.PASSWORD_HASHER_COSTS["argon2"]`.
+
+    Requires the optional `argon2-cffi` package.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_HASHER_COSTS["argon2"]["time_cost"]
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_HASHER_COSTS["argon2"]["memory_cost"]
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_HASHER_COSTS["argon2"]["parallelism"]
@@ -0,0 +1,122 @@
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+from django.core.management.base import BaseCommand, CommandError
+
+
+HASHERS = {
+    "scrypt": ScryptPasswordHasher,
+    "argon2": Argon2PasswordHasher,
+    "pbkdf2": PBKDF2PasswordHasher,
+}
+
+
+def build_hasher(config):
+    """
+    Builds a hasher from a "name:param=value,..." string.
+
+    Args:
+        config (str): e.g. "scrypt:work_factor=32768,block_size=8" or "pbkdf2:iterations=600000".
+
+    Returns:
+        BasePasswordHasher: A hasher instance with the given cost parameters.
+    """
+    name, _, params = config.partition(":")
+    if name not in HASHERS:
+        raise CommandError(f"Unknown hasher '{name}', expected one of {list(HASHERS)}.")
+
+    hasher = HASHERS[name]()
+    for param in filter(None, params.split(",")):
+        key, _, value = param.partition("=")
+        if not hasattr(hasher, key):
+            raise CommandError(f"Hasher '{name}' has no parameter '{key}'.")
+        setattr(hasher, key, int(value))
+    if name == "scrypt":
+        hasher.maxmem = 2 * 128 * hasher.work_factor * hasher.block_size
+
+    return hasher
+
+
+def time_verifications(config, rounds):
+    """
+    Verifies a password `rounds` times with one hasher in the current process.
+
+    Args:
+        config (str): Hasher configuration accepted by `build_hasher`.
+        rounds (int): Number of verifications to time.
+
+    Returns:
+        list: The latency of each verification in seconds.
+    """
+    hasher = build_hasher(config)
+    encoded = hasher.encode("correct horse battery staple", hasher.salt())
+
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hasher.verify("correct horse battery staple", encoded)
+        timings.append(time.perf_counter() - started)
+
+    return timings
+
+
+class Command(BaseCommand):
+    """
+    Measures login hashing cost for one or more hasher settings.
+
+    Every configuration is verified `--rounds` times in each of `--processes`
+    worker processes (one per core), and the per-core throughput plus p50/p99
+    latency are reported so a cost can be chosen that fits the login budget.
+
+    Example:
+        python manage.py benchmark_password_hashers pbkdf2 scrypt:work_factor=32768 --processes 4
+    """
+
+    help = "Benchmark password verification throughput per core for hasher settings."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "configs",
+            nargs="*",
+            default=["pbkdf2", "scrypt", "scrypt:work_factor=32768"],
+            help='Hasher settings as "name:param=value,...".',
+        )
+        parser.add_argument("--rounds", type=int, default=20)
+        parser.add_argument("--processes", type=int, default=1)
+
+    def handle(self, *args, **options):
+        for config in options["configs"]:
+            try:
+                build_hasher(config).encode("probe", "probesalt123456")
+            except (ValueError, TypeError) as error:
+                self.stderr.write(f"{config}: skipped ({error})")
+                continue
+
+            processes = options["processes"]
+            started = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                results = list(
+                    pool.map(
+                        time_verifications,
+                        [config] * processes,
+                        [options["rounds"]] * processes,
+                    )
+                )
+            wall_time = time.perf_counter() - started
+
+            timings = sorted(timing for result in results for timing in result)
+            p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+            per_core = 1 / statistics.mean(timings)
+
+            self.stdout.write(
+                f"{config:<40} {per_core:8.1f} logins/s/core  "
+                f"{len(timings) / wall_time:8.1f} logins/s total  "
+                f"p50 {statistics.median(timings) * 1000:7.1f} ms  "
+                f"p99 {p99 * 1000:7.1f} ms"
+            )
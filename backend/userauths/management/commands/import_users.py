@@ -0,0 +1,221 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models.functions import Lower
+
+from userauths.models import User, Profile
+
+
+def _setup_worker(settings_module):
+    """
+    Configures Django inside a pool worker started with the "spawn" method.
+
+    Args:
+        settings_module (str): The settings module of the parent process.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    django.setup()
+
+
+def read_rows(path, file_format):
+    """
+    Streams user rows from a CSV or NDJSON file one dict at a time.
+
+    Args:
+        path (str): Path of the file to read.
+        file_format (str): Either "csv" or "ndjson".
+
+    Yields:
+        dict: A single row keyed by column name.
+    """
+    with open(path, newline="", encoding="utf-8") as handle:
+        if file_format == "csv":
+            yield from csv.DictReader(handle)
+        else:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def unique_value(value, taken, max_length):
+    """
+    Returns `value`, suffixed with "-2", "-3", ... until it is not in `taken`.
+
+    Args:
+        value (str): The preferred value.
+        taken (set): Values already in use; the returned value is added to it.
+        max_length (int): Maximum length of the database column.
+
+    Returns:
+        str: A value that is unique within `taken`.
+    """
+    candidate = value[:max_length]
+    counter = 1
+    while candidate in taken:
+        counter += 1
+        suffix = f"-{counter}"
+        candidate = value[: max_length - len(suffix)] + suffix
+    taken.add(candidate)
+
+    return candidate
+
+
+class Command(BaseCommand):
+    """
+    Bulk imports users and their profiles from a CSV or NDJSON file.
+
+    Rows are streamed in chunks. For every chunk the username and full name
+    conflicts are resolved in memory, passwords are hashed in a process pool
+    and `User`/`Profile` rows are inserted with `bulk_create`, so no per-user
+    save or signal runs.
+
+    Example:
+        python manage.py import_users partners.csv --chunk-size 2000 --workers 8
+    """
+
+    help = "Bulk import users and profiles from a CSV or NDJSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or NDJSON file with one user per row.")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "ndjson"],
+            help="Input format. Defaults to the file extension.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Rows hashed and inserted per batch (default: 1000).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Password hashing processes; 0 hashes in this process (default: CPU count).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or (
+            "csv" if path.lower().endswith(".csv") else "ndjson"
+        )
+        if not os.path.exists(path):
+            raise CommandError(f"File '{path}' does not exist.")
+
+        # Incoming emails are lowercased, so existing ones are compared lowercased too.
+        emails = set(User.objects.values_list(Lower("email"), flat=True).iterator())
+        usernames = set(User.objects.values_list("username", flat=True).iterator())
+        full_names = set(User.objects.values_list("full_name", flat=True).iterator())
+
+        pool = None
+        if options["workers"] > 0:
+            pool = ProcessPoolExecutor(
+                max_workers=options["workers"],
+                initializer=_setup_worker,
+                initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", ""),),
+            )
+
+        imported = skipped = 0
+        started = time.perf_counter()
+        rows = read_rows(path, file_format)
+
+        try:
+            while True:
+                chunk = list(islice(rows, options["chunk_size"]))
+                if not chunk:
+                    break
+
+                users, profiles, passwords = [], [], []
+                for row in chunk:
+                    email = (row.get("email") or "").strip().lower()
+                    if not email or "@" not in email or email in emails:
+                        skipped += 1
+                        continue
+                    emails.add(email)
+
+                    email_username, _ = email.split("@", 1)
+                    username = unique_value(
+                        row.get("username") or email_username, usernames, 50
+                    )
+                    full_name = unique_value(
+                        row.get("full_name") or email_username, full_names, 100
+                    )
+
+                    users.append(
+                        User(email=email, username=username, full_name=full_name)
+                    )
+                    profiles.append(
+                        Profile(
+                            full_name=full_name,
+                            country=row.get("country") or None,
+                            about=row.get("about") or None,
+                        )
+                    )
+                    passwords.append(row.get("password") or None)
+
+                if not users:
+                    continue
+
+                if pool:
+                    hashes = pool.map(
+                        make_password,
+                        passwords,
+                        chunksize=max(1, len(passwords) // (options["workers"] * 4)),
+                    )
+                else:
+                    hashes = map(make_password, passwords)
+                for user, password_hash in zip(users, hashes):
+                    user.password = password_hash
+
+                self.insert_chunk(users, profiles)
+
+                imported += len(users)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"Imported {imported} users ({imported / elapsed:.1f} rows/s)"
+                )
+        finally:
+            if pool:
+                pool.shutdown()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {imported} users, skipped {skipped} rows in {elapsed:.2f}s "
+                f"({imported / elapsed if elapsed else 0:.1f} rows/s)"
+            )
+        )
+
+    @transaction.atomic
+    def insert_chunk(self, users, profiles):
+        """
+        Inserts one chunk of users followed by their profiles.
+
+        Args:
+            users (list): Unsaved `User` instances with hashed passwords.
+            profiles (list): Unsaved `Profile` instances in the same order as `users`.
+        """
+        User.objects.bulk_create(users)
+
+        if not connection.features.can_return_rows_from_bulk_insert:
+            ids = dict(
+                User.objects.filter(
+                    email__in=[user.email for user in users]
+                ).values_list("email", "id")
+            )
+            for user in users:
+                user.pk = ids[user.email]
+
+        for user, profile in zip(users, profiles):
+            profile.user = user
+
+        Profile.objects.bulk_create(profiles)
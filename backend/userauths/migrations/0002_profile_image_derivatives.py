@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("userauths", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="image_derivatives",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -2,8 +2,10 @@ from django.db import models
 from django.db.models.signals import post_save
 from django.contrib.auth.models import AbstractUser
 
+from core.models import TrackedFieldsMixin
 
-class User(AbstractUser):
+
+class User(TrackedFieldsMixin, AbstractUser):
     """
     Custom user model with required data fields.
 
@@ -20,6 +22,7 @@ class User(AbstractUser):
     Class Variables:
         USERNAME_FIELD (str): Specifies the field used for authentication (here, 'email').
         REQUIRED_FIELDS (list): List of fields required during user registration (here, 'username').
+        tracked_fields (tuple): Fields the profile is derived from; the profile is only re-saved when one changes.
 
     Methods:
         __str__(): Returns a string representation of the user (email address).
@@ -39,6 +42,8 @@ class User(AbstractUser):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username"]
 
+    tracked_fields = ("username", "full_name")
+
     def __str__(self):
         return self.email
 
@@ -63,7 +68,7 @@ class User(AbstractUser):
         super(User, self).save(*args, **kwargs)
 
 
-class Profile(models.Model):
+class Profile(TrackedFieldsMixin, models.Model):
     """
     Represents a user profile associated with the custom User model.
 
@@ -73,6 +78,7 @@ class Profile(models.Model):
     Attributes:
         user (User): A one-to-one relationship with the custom User model.
         image (FileField): An optional user profile image (stored in 'user_folder').
+        image_derivatives (JSONField): Resized copies of `image` by format and width (filled in by the api app).
         full_name (str): The user's full name (limited to 100 characters).
         country (str, optional): The user's country (limited to 100 characters).
         about (str, optional): A brief description about the user.
@@ -88,10 +94,13 @@ class Profile(models.Model):
         - The `about` field can be used for a bio or additional information.
     """
 
+    tracked_fields = ("image",)
+
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     image = models.FileField(
         upload_to="user_folder", default="default-user.jpg", null=True, blank=True
     )
+    image_derivatives = models.JSONField(default=dict, blank=True)
     full_name = models.CharField(max_length=100)
     country = models.CharField(max_length=100, null=True, blank=True)
     about = models.TextField(null=True, blank=True)
@@ -133,15 +142,28 @@ def create_user_profile(sender, instance, created, **kwargs):
         Profile.objects.create(user=instance)
 
 
-def save_user_profile(sender, instance, **kwargs):
+def save_user_profile(sender, instance, created=False, update_fields=None, **kwargs):
     """
-    Saves the user profile associated with the user instance.
+    Saves the user profile when a field it is derived from has changed.
+
+    Newly created users are skipped because `create_user_profile` has just written
+    their profile, and so are saves that only touch unrelated fields such as the
+    password, OTP or refresh token.
 
     Args:
         sender (str): The sender of the signal (usually the User model).
         instance (User): The user instance whose profile needs to be saved.
+        created (bool): Indicates whether the user was just created.
+        update_fields (frozenset, optional): The fields passed to `save()`, if any.
     """
-    instance.profile.save()
+    if created:
+        return
+    if update_fields is not None and not set(update_fields) & set(User.tracked_fields):
+        return
+    if not instance.has_changed(*User.tracked_fields):
+        return
+
+    instance.profile.save(update_fields=["full_name"])
 
 
 post_save.connect(create_user_profile, sender=User)
@@ -1,5 +1,9 @@
+import os
+import tempfile
+from io import StringIO
 from unittest.mock import Mock
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from userauths.models import User, Profile, save_user_profile
 
 
@@ -50,3 +54,61 @@ class UserAuthsModelTest(TestCase):
         save_user_profile(sender, instance)
 
         instance.profile.save.assert_called_once()
+
+    def test_save_user_profile_skips_unrelated_fields(self):
+        """Test that saving fields the profile does not depend on leaves the profile untouched."""
+        user = User.objects.create(email="test@example.com", username="test")
+        user = User.objects.get(pk=user.pk)
+
+        user.otp = "1234567"
+        with self.assertNumQueries(1):
+            user.save()
+
+        user.set_password("new-password-123")
+        with self.assertNumQueries(1):
+            user.save(update_fields=["password"])
+
+    def test_save_user_profile_syncs_on_username_change(self):
+        """Test that changing the username re-saves the derived profile."""
+        user = User.objects.create(email="test@example.com", username="test")
+        user = User.objects.get(pk=user.pk)
+
+        user.username = "renamed"
+        with self.assertNumQueries(3):
+            user.save()
+
+        with self.assertNumQueries(1):
+            user.save()
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ImportUsersCommandTest(TestCase):
+    """Test cases for the import_users management command."""
+
+    def test_import_users_resolves_conflicts_and_creates_profiles(self):
+        """Test importing a CSV skips duplicate emails, whatever their case, and suffixes clashing usernames."""
+        User.objects.create(email="jane@example.com", username="jane", full_name="Jane")
+        User.objects.create(email="Sam@Example.com", username="sam", full_name="Sam")
+
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, "w") as csv_file:
+            csv_file.write(
+                "email,full_name,password,country\n"
+                "jane@example.com,Jane Again,secret,UK\n"
+                "sam@example.com,Sam Again,secret,UK\n"
+                "jane@partner.org,Jane,secret,UK\n"
+                "john@partner.org,,secret,\n"
+            )
+        self.addCleanup(os.remove, path)
+
+        call_command("import_users", path, workers=0, stdout=StringIO())
+
+        imported = User.objects.get(email="jane@partner.org")
+        assert imported.username == "jane-2"
+        assert imported.full_name == "Jane-2"
+        assert imported.check_password("secret")
+        assert imported.profile.full_name == "Jane-2"
+        assert imported.profile.country == "UK"
+        assert User.objects.get(email="john@partner.org").profile.full_name == "john"
+        assert not User.objects.filter(full_name="Sam Again").exists()
+        assert User.objects.count() == 4